@@ -0,0 +1,228 @@
+import bisect
+import json
+import os
+
+
+class Card:
+    __slots__ = ("id", "text", "column", "rank")
+
+    def __init__(self, card_id, text, column, rank):
+        self.id = card_id
+        self.text = text
+        self.column = column
+        self.rank = rank
+
+    def to_json(self):
+        return {"id": self.id, "text": self.text, "column": self.column, "rank": self.rank}
+
+
+class ColumnOrder:
+    """The cards of one column, sorted by rank.
+
+    A card's position is found with a binary search on its rank, so moving a
+    card never has to scan the column for it."""
+
+    def __init__(self):
+        self.ranks = []
+        self.ids = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def index(self, card):
+        return bisect.bisect_left(self.ranks, card.rank)
+
+    def insert(self, index, card):
+        self.ranks.insert(index, card.rank)
+        self.ids.insert(index, card.id)
+
+    def pop(self, index):
+        self.ranks.pop(index)
+        return self.ids.pop(index)
+
+    def rank_at(self, index):
+        """A rank that sorts between the cards at index - 1 and index, or None
+        if the floats between them have run out."""
+        before = self.ranks[index - 1] if index > 0 else None
+        after = self.ranks[index] if index < len(self.ranks) else None
+        if before is None and after is None:
+            return 0.0
+        if before is None:
+            return after - 1.0
+        if after is None:
+            return before + 1.0
+        rank = (before + after) / 2
+        return rank if before < rank < after else None
+
+
+class Board:
+    """Kanban board model: cards with stable IDs in ordered columns.
+
+    Every change is written as one line (the changed card) to a JSON Lines log
+    next to the snapshot, so a move costs one small append no matter how many
+    cards the board holds. load() replays the log over the snapshot and
+    compacts them into a new snapshot once the log has grown large. close()
+    compacts earlier (close_compact_every entries), while nothing else is
+    waiting on the disk, but a short log is simply left for the next load.
+
+    Views subscribe with listen(callback); the callback gets
+    (event, card, old, new) where old and new are (column, index) or None.
+    """
+
+    def __init__(self, columns, filename="board.json", compact_every=1000, close_compact_every=100):
+        self.columns = list(columns)
+        self.filename = filename
+        self.log_file = os.path.splitext(filename)[0] + ".jsonl"
+        self.compact_every = compact_every
+        self.close_compact_every = close_compact_every
+        self.cards = {}  # id -> Card
+        self.order = {column: ColumnOrder() for column in self.columns}
+        self.next_id = 1
+        self.listeners = []
+        self.log = None
+        self.log_entries = 0
+
+    def listen(self, callback):
+        self.listeners.append(callback)
+
+    def _notify(self, event, card, old, new):
+        for callback in self.listeners:
+            callback(event, card, old, new)
+
+    # --- Changes ---
+    def add(self, text, column=None):
+        column = column or self.columns[0]
+        order = self.order[column]
+        card = Card(self.next_id, text, column, order.rank_at(len(order)))
+        self.next_id += 1
+        self.cards[card.id] = card
+        order.insert(len(order), card)
+        self._write(card.to_json())
+        self._notify("add", card, None, (column, len(order) - 1))
+        return card
+
+    def move(self, card_id, column, index=None):
+        """Moves a card to position index (None = the end) of column. The index
+        counts the cards that are in the column without the moved card."""
+        card = self.cards[card_id]
+        source = self.order[card.column]
+        old = (card.column, source.index(card))
+        source.pop(old[1])
+
+        target = self.order[column]
+        index = len(target) if index is None else max(0, min(index, len(target)))
+        rank = target.rank_at(index)
+        if rank is None:
+            self._renumber(column)
+            rank = target.rank_at(index)
+        card.column, card.rank = column, rank
+        target.insert(index, card)
+        self._write(card.to_json())
+        self._notify("move", card, old, (column, index))
+
+    def remove(self, card_id):
+        card = self.cards.pop(card_id)
+        order = self.order[card.column]
+        old = (card.column, order.index(card))
+        order.pop(old[1])
+        self._write({"id": card.id, "deleted": True})
+        self._notify("remove", card, old, None)
+
+    def _renumber(self, column):
+        """Spreads the ranks of a column out again (only needed after many
+        inserts at the same spot); writes every card of that column."""
+        order = self.order[column]
+        order.ranks = [float(i) for i in range(len(order))]
+        for card_id, rank in zip(order.ids, order.ranks):
+            card = self.cards[card_id]
+            card.rank = rank
+            self._write(card.to_json())
+
+    # --- Reading ---
+    def texts(self, column):
+        return [self.cards[card_id].text for card_id in self.order[column].ids]
+
+    def card_at(self, column, index):
+        return self.cards[self.order[column].ids[index]]
+
+    # --- Persistence ---
+    def _write(self, entry):
+        if self.log is None:
+            self.log = open(self.log_file, "a", encoding="utf-8")
+        self.log.write(json.dumps(entry) + "\n")
+        self.log.flush()
+        self.log_entries += 1
+
+    def load(self):
+        """Reads the snapshot and replays the log; compacts if the log is long."""
+        cards = {}
+        if os.path.exists(self.filename):
+            try:
+                with open(self.filename, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.next_id = data.get("next_id", 1)
+                for entry in data.get("cards", []):
+                    cards[entry["id"]] = entry
+            except (json.JSONDecodeError, KeyError, TypeError):
+                print("Error reading board, starting empty:", self.filename)
+
+        if os.path.exists(self.log_file):
+            good_offset = 0
+            with open(self.log_file, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    good_offset += len(line)
+                    self.log_entries += 1
+                    if entry.get("deleted"):
+                        cards.pop(entry["id"], None)
+                    else:
+                        cards[entry["id"]] = entry
+            # Half-written last line (crash while writing): cut it off, or the
+            # next change would be appended to it and lost on the next load
+            if good_offset != os.path.getsize(self.log_file):
+                print("Repaired incomplete line in board log:", self.log_file)
+                with open(self.log_file, "r+b") as f:
+                    f.truncate(good_offset)
+
+        for column in self.columns:
+            self.order[column] = ColumnOrder()
+        for entry in sorted(cards.values(), key=lambda e: e["rank"]):
+            column = entry["column"] if entry["column"] in self.order else self.columns[0]
+            card = Card(entry["id"], entry["text"], column, entry["rank"])
+            self.cards[card.id] = card
+            order = self.order[column]
+            if order.ranks and card.rank <= order.ranks[-1]:
+                card.rank = order.ranks[-1] + 1.0  # ranks within a column must be unique
+            order.insert(len(order), card)
+            self.next_id = max(self.next_id, card.id + 1)
+
+        if self.log_entries > self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """Writes all cards to a new snapshot (atomically) and empties the log."""
+        tmp_file = self.filename + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"next_id": self.next_id,
+                       "cards": [self.cards[card_id].to_json()
+                                 for column in self.columns for card_id in self.order[column].ids]}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.filename)
+        if self.log:
+            self.log.close()
+            self.log = None
+        open(self.log_file, "w").close()
+        self.log_entries = 0
+
+    def close(self):
+        if self.log_entries >= self.close_compact_every:
+            self.compact()
+        elif self.log:
+            self.log.close()
+            self.log = None
@@ -1,24 +1,73 @@
 import tkinter as tk
 
+from board import Board
+
+COLUMNS = ["Started", "Research", "In Progress", "Done"]
+
+# The board holds the cards; the listboxes only show them
+board = Board(COLUMNS, "board.json")
+listboxes = {}  # column -> Listbox
+
 def add_task():
     """Add a new task to the 'Started' section"""
     task = task_entry.get()
     if task:
-        started_list.insert(tk.END, task)
+        board.add(task, COLUMNS[0])
         task_entry.delete(0, tk.END)
 
+def on_board_change(event, card, old, new):
+    """Update only the rows that changed"""
+    if old:
+        listboxes[old[0]].delete(old[1])
+    if new:
+        listboxes[new[0]].insert(new[1], card.text)
+
 # Function to start dragging
 def on_drag_start(event):
     widget = event.widget
-    widget.drag_data = {"index": widget.nearest(event.y), "task": widget.get(widget.nearest(event.y))}
+    if widget.size() == 0:
+        widget.drag_data = {}
+        return
+    index = widget.nearest(event.y)
+    widget.drag_data = {"card": board.card_at(widget.column, index).id, "index": index}
+
+def drop_index(listbox, y):
+    """Position in listbox where a card dropped at y should go"""
+    if listbox.size() == 0:
+        return 0
+    index = listbox.nearest(y)
+    bbox = listbox.bbox(index)
+    if bbox and y > bbox[1] + bbox[3] / 2:
+        index += 1
+    return index
 
 # Function to drop item into another list
-def on_drop(event, source_list, target_list):
-    widget = source_list
-    if "task" in widget.drag_data:
-        task = widget.drag_data["task"]
-        target_list.insert(tk.END, task)
-        widget.delete(widget.drag_data["index"])
+def on_drop(event):
+    source = event.widget
+    drag_data = getattr(source, "drag_data", {})
+    source.drag_data = {}
+    if "card" not in drag_data:
+        return
+    # The release goes to the listbox where the drag started; find the one under the mouse
+    target = root.winfo_containing(event.x_root, event.y_root)
+    if not hasattr(target, "column"):
+        return
+    index = drop_index(target, event.y_root - target.winfo_rooty())
+    if target is source:
+        if index > drag_data["index"]:
+            index -= 1  # the card itself is taken out first
+        if index == drag_data["index"]:
+            return
+    board.move(drag_data["card"], target.column, index)
+
+def on_delete(event):
+    widget = event.widget
+    for index in reversed(widget.curselection()):
+        board.remove(board.card_at(widget.column, index).id)
+
+def on_close():
+    board.close()
+    root.destroy()
 
 root = tk.Tk()
 root.title("To-Do List")
@@ -34,23 +83,31 @@ add_button.pack()
 # Function to create draggable sections
 def create_section(title):
     frame = tk.Frame(root, relief=tk.RAISED, borderwidth=2)
-    frame.pack(side=tk.LEFT, padx=10, pady=10)
+    frame.pack(side=tk.LEFT, padx=10, pady=10, fill=tk.Y)
     label = tk.Label(frame, text=title, font=("Arial", 14))
     label.pack()
-    listbox = tk.Listbox(frame, width=40)
-    listbox.pack()
+    scrollbar = tk.Scrollbar(frame)
+    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    listbox = tk.Listbox(frame, width=40, yscrollcommand=scrollbar.set)
+    listbox.pack(fill=tk.Y, expand=True)
+    scrollbar.config(command=listbox.yview)
+    listbox.column = title
     listbox.bind("<ButtonPress-1>", on_drag_start)  # Click to start dragging
+    listbox.bind("<ButtonRelease-1>", on_drop)  # Drop on any section, also to reorder
+    listbox.bind("<Delete>", on_delete)
     return frame, listbox
 
 # Creating sections
-started_frame, started_list = create_section("Started")
-research_frame, research_list = create_section("Research")
-progress_frame, progress_list = create_section("In Progress")
-done_frame, done_list = create_section("Done")
+for column in COLUMNS:
+    frame, listboxes[column] = create_section(column)
 
-# Enable both click-to-move & drag-and-drop
-research_list.bind("<ButtonRelease-1>", lambda event: on_drop(event, started_list, research_list))
-progress_list.bind("<ButtonRelease-1>", lambda event: on_drop(event, research_list, progress_list))
-done_list.bind("<ButtonRelease-1>", lambda event: on_drop(event, progress_list, done_list))
+# Fill the sections once, then follow the changes
+board.load()
+for column in COLUMNS:
+    texts = board.texts(column)
+    if texts:
+        listboxes[column].insert(tk.END, *texts)
+board.listen(on_board_change)
 
-root.mainloop()
\ No newline at end of file
+root.protocol("WM_DELETE_WINDOW", on_close)
+root.mainloop()
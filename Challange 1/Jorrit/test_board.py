@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+from board import Board
+
+COLUMNS = ["To Do", "Doing", "Done"]
+
+
+class BoardTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.filename = os.path.join(tmp.name, "board.json")
+
+    def open(self, **kwargs):
+        board = Board(COLUMNS, self.filename, **kwargs)
+        board.load()
+        self.addCleanup(board.close)
+        return board
+
+    def test_round_trip(self):
+        board = self.open()
+        first, second = board.add("First"), board.add("Second")
+        board.move(first.id, "Doing")
+        board.remove(second.id)
+        board.add("Third", "Done")
+        board.close()
+        board = self.open()
+        self.assertEqual([board.texts(column) for column in COLUMNS], [[], ["First"], ["Third"]])
+
+    def test_move_between_cards(self):
+        board = self.open()
+        cards = [board.add(text) for text in "abcd"]
+        board.move(cards[3].id, "To Do", 1)
+        board.move(cards[0].id, "To Do", 3)
+        self.assertEqual(board.texts("To Do"), ["d", "b", "c", "a"])
+        board.close()
+        self.assertEqual(self.open().texts("To Do"), ["d", "b", "c", "a"])
+
+    def test_close_compacts_only_a_long_log(self):
+        board = self.open(close_compact_every=3)
+        board.add("First")
+        board.close()
+        self.assertFalse(os.path.exists(self.filename))
+        board = self.open(close_compact_every=3)
+        board.add("Second")
+        board.add("Third")
+        board.close()
+        self.assertTrue(os.path.exists(self.filename))
+        self.assertEqual(os.path.getsize(board.log_file), 0)
+
+    def test_change_after_half_written_line(self):
+        board = self.open()
+        board.add("First")
+        board.close()
+        with open(board.log_file, "a", encoding="utf-8") as f:
+            f.write('{"id": 2, "te')  # crash while writing
+        board = self.open()
+        board.add("Second")
+        board.close()
+        self.assertEqual(self.open().texts("To Do"), ["First", "Second"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,11 @@
+import os
 import tkinter as tk
 from tkinter import messagebox
-import json
+
+from task_store import TaskStore, new_task_id
+
+# Folder with the task files; point it at the shared drive to work together
+DATA_DIR = os.environ.get("TODO_DATA_DIR", ".")
 
 # Suppress deprecation warning for older macOS versions
 TK_SILENCE_DEPRECATION = 1
@@ -47,23 +52,24 @@ class LoginSystem:
         code = self.code_entry.get()
 
         if self.authorized_users.get(username) == code:
-            self.launch_todo_app()
+            self.launch_todo_app(username)
         else:
             messagebox.showerror("Login Failed", "Invalid username or code.")
             self.code_entry.delete(0, tk.END)
 
-    def launch_todo_app(self):
+    def launch_todo_app(self, username):
         """Destroys login widgets and launches the main application."""
         self.login_frame.destroy()
+        self.root.unbind('<Return>')
         self.root.resizable(True, True)
         self.root.geometry("")
-        TodoApp(self.root)
+        TodoApp(self.root, username)
 
 class TodoApp:
     """The main To-Do List application."""
-    def __init__(self, root):
+    def __init__(self, root, username):
         self.root = root
-        self.root.title("To-Do Lijst")
+        self.root.title(f"To-Do Lijst - {username}")
 
         # Task entry
         self.task_entry = tk.Entry(root, width=50)
@@ -88,37 +94,117 @@ class TodoApp:
         self.task_list.pack(pady=10, padx=10)
         self.task_list.config(font=('Helvetica', 10))  # Apply font globally
 
+        # Changes are debounced and appended to the user's store on a background thread
+        self.save_delay_ms = 500
+        self.save_job = None
+        self.changes = {}  # task id -> changed task (or deletion) not yet written
+        self.poll_ms = 1000  # how often to look for changes from other instances
+        self.store = TaskStore(username, DATA_DIR)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
         self.load_tasks()
 
     def load_tasks(self):
-        try:
-            with open("tasks.json", "r") as f:
-                self.tasks = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.tasks = []
-
+        # Read on the store thread; the window is usable in the meantime
+        self.tasks = []
+        self.loading = True
+        self.store.load(self.root, self.tasks_loaded)
+
+    def tasks_loaded(self, tasks):
+        # Tasks added while the file was being read go after the stored ones
+        added = self.tasks
+        self.tasks = tasks + added
+        self.loading = False
         self.update_listbox()
-
-    def save_tasks(self):
-        with open("tasks.json", "w") as f:
-            json.dump(self.tasks, f, indent=4)
+        self.root.after(self.poll_ms, self.poll_changes)
+
+    def poll_changes(self):
+        self.store.fetch(self.root, self.apply_changes)
+
+    def apply_changes(self, result):
+        """Applies what other instances changed, row by row."""
+        kind, data = result
+        if kind == "reload":
+            # Another instance compacted the store; keep our unsaved changes on top
+            tasks = {task["id"]: task for task in data}
+            for task_id, change in self.changes.items():
+                if change.get("deleted"):
+                    tasks.pop(task_id, None)
+                else:
+                    tasks[task_id] = change
+            self.tasks = list(tasks.values())
+            self.update_listbox()
+        else:
+            for change in data:
+                if change["id"] not in self.changes:  # our own newer change wins
+                    self.apply_change(change)
+        self.root.after(self.poll_ms, self.poll_changes)
+
+    def apply_change(self, change):
+        index = self.index_of(change["id"])
+        if change.get("deleted"):
+            if index is not None:
+                del self.tasks[index]
+                self.task_list.delete(index)
+        elif index is None:
+            self.tasks.append(change)
+            self.task_list.insert(tk.END, change["text"])
+            self.update_row_color(len(self.tasks) - 1)
+        else:
+            self.tasks[index].update(change)
+            self.task_list.delete(index)
+            self.task_list.insert(index, change["text"])
+            self.update_row_color(index)
+
+    def index_of(self, task_id):
+        for index, task in enumerate(self.tasks):
+            if task["id"] == task_id:
+                return index
+        return None
+
+    def save_task(self, task):
+        """Remembers a copy of a changed task and schedules a save; several changes
+        within the delay become one append."""
+        self.changes[task["id"]] = dict(task)
+        if self.save_job is not None:
+            self.root.after_cancel(self.save_job)
+        self.save_job = self.root.after(self.save_delay_ms, self.write_tasks)
+
+    def write_tasks(self):
+        self.save_job = None
+        # The changes are copies, so the store thread never sees a task that is being edited
+        self.store.submit(list(self.changes.values()))
+        self.changes = {}
+
+    def on_close(self):
+        """Flushes pending changes before the window closes."""
+        if self.save_job is not None:
+            self.root.after_cancel(self.save_job)
+            self.write_tasks()
+        self.store.flush()
+        self.store.close()
+        self.root.destroy()
 
     def update_listbox(self):
+        """Rebuilds the whole list; only used after loading."""
         self.task_list.delete(0, tk.END)
-        for i, task in enumerate(self.tasks):
-            display_text = task["text"]
-            self.task_list.insert(tk.END, display_text)
-            if task["completed"]:
-                self.task_list.itemconfig(i, {'fg': 'gray'})  # Remove 'font' option
-            else:
-                self.task_list.itemconfig(i, {'fg': 'black'})  # Remove 'font' option
+        for task in self.tasks:
+            self.task_list.insert(tk.END, task["text"])
+        for i in range(len(self.tasks)):
+            self.update_row_color(i)
+
+    def update_row_color(self, index):
+        color = 'gray' if self.tasks[index]["completed"] else 'black'
+        self.task_list.itemconfig(index, {'fg': color})
 
     def add_task(self):
         task_text = self.task_entry.get()
         if task_text:
-            self.tasks.append({"text": task_text, "completed": False})
-            self.save_tasks()
-            self.update_listbox()
+            task = {"id": new_task_id(), "text": task_text, "completed": False}
+            self.tasks.append(task)
+            self.save_task(task)
+            self.task_list.insert(tk.END, task_text)
+            self.update_row_color(len(self.tasks) - 1)
             self.task_entry.delete(0, tk.END)
         else:
             messagebox.showwarning("Warning", "You must enter a task.")
@@ -126,18 +212,19 @@ class TodoApp:
     def complete_task(self):
         try:
             selected_task_index = self.task_list.curselection()[0]
-            self.tasks[selected_task_index]["completed"] = not self.tasks[selected_task_index]["completed"]
-            self.save_tasks()
-            self.update_listbox()
+            task = self.tasks[selected_task_index]
+            task["completed"] = not task["completed"]
+            self.save_task(task)
+            self.update_row_color(selected_task_index)
         except IndexError:
             messagebox.showwarning("Warning", "You must select a task to complete.")
 
     def delete_task(self):
         try:
             selected_task_index = self.task_list.curselection()[0]
-            del self.tasks[selected_task_index]
-            self.save_tasks()
-            self.update_listbox()
+            task = self.tasks.pop(selected_task_index)
+            self.save_task({"id": task["id"], "deleted": True})
+            self.task_list.delete(selected_task_index)
         except IndexError:
             messagebox.showwarning("Warning", "You must select a task to delete.")
 
@@ -0,0 +1,266 @@
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def read_tasks(filename):
+    try:
+        with open(filename, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+
+def decode_lines(data):
+    """Entries from complete log lines; a line that is not valid JSON (left by a
+    crash in an older version) is skipped."""
+    entries = []
+    for line in data.splitlines():
+        if line.strip():
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                pass
+    return entries
+
+
+def new_task_id():
+    return uuid.uuid4().hex
+
+
+class FileLock:
+    """Exclusive lock on a separate lock file, shared by every process that
+    opens the same store (lockf also works on NFS and SMB shares)."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.filename, "a+b")
+        if fcntl:
+            fcntl.lockf(self.file, fcntl.LOCK_EX)
+        else:
+            self.file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after 10 seconds
+                    time.sleep(0.1)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl:
+            fcntl.lockf(self.file, fcntl.LOCK_UN)
+        else:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        self.file.close()
+        self.file = None
+
+
+class TaskStore:
+    """Tasks of one user as a snapshot plus a log of record-level changes.
+
+    tasks_<user>.json holds {"generation": n, "tasks": [...]}; tasks_<user>.jsonl
+    starts with {"generation": n} and gets one line per changed task (or
+    {"id": ..., "deleted": true}). Writes append under an exclusive file lock,
+    so several instances, also on other machines, can share the store.
+    Instances follow each other by reading only the new lines of the log.
+
+    When the log grows past compact_bytes it is folded into a new snapshot
+    with the next generation and replaced by an empty log (both via an atomic
+    os.replace). A log whose generation differs from the snapshot's is
+    already contained in it and is ignored, also after a crash in between.
+
+    All file operations run on one background thread, in the order they
+    were submitted.
+    """
+
+    def __init__(self, username, directory=".", legacy_file="tasks.json", compact_bytes=256 * 1024):
+        base = os.path.join(directory, f"tasks_{username}")
+        self.snapshot_file = base + ".json"
+        self.log_file = base + ".jsonl"
+        self.lock = FileLock(base + ".lock")
+        self.legacy_file = os.path.join(directory, legacy_file)
+        self.compact_bytes = compact_bytes
+        self.instance = uuid.uuid4().hex  # own changes are not reported back
+        self.generation = 0
+        self.offset = 0          # how far this instance has read the log
+        self.log_signature = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-store")
+        self.pending = None      # future of the newest write
+
+    # --- Tk side ---
+    def call(self, widget, fn, on_done, poll_ms=20):
+        """Runs fn on the store thread and calls on_done(result) on the Tk thread.
+        Tk may only be used from its own thread, so the result is polled with after()."""
+        future = self.executor.submit(fn)
+
+        def poll():
+            if future.done():
+                on_done(future.result())
+            else:
+                widget.after(poll_ms, poll)
+
+        widget.after(poll_ms, poll)
+
+    def load(self, widget, on_done):
+        self.call(widget, self.read_all, on_done)
+
+    def fetch(self, widget, on_done):
+        """Calls on_done(("changes", entries)) with the changes other instances
+        made since the last fetch, or on_done(("reload", tasks)) after a compaction."""
+        self.call(widget, self.read_changes, on_done)
+
+    def submit(self, entries):
+        self.pending = self.executor.submit(self.append, entries)
+        self.pending.add_done_callback(self._report)
+
+    def _report(self, future):
+        if future.exception() is not None:
+            print("Fout bij opslaan taken:", future.exception())
+
+    def flush(self, timeout=5.0):
+        """Blocks until everything submitted so far is on disk."""
+        if self.pending is not None:
+            wait([self.pending], timeout)
+
+    # --- Store thread ---
+    def read_all(self):
+        """All tasks in order; migrates the old shared tasks.json on first use."""
+        with self.lock:
+            if not os.path.exists(self.snapshot_file) and os.path.exists(self.legacy_file):
+                tasks = [dict(task, id=new_task_id()) for task in read_tasks(self.legacy_file)]
+                self._write_snapshot(tasks, 1)
+            return self._read_state()
+
+    def _read_state(self):
+        snapshot = read_tasks(self.snapshot_file) or {}
+        self.generation = snapshot.get("generation", 0)
+        tasks = {task["id"]: task for task in snapshot.get("tasks", [])}
+        self.offset, self.log_signature = 0, None
+        # None: the log is from another generation (e.g. a crash during
+        # compaction) and is already contained in the snapshot
+        for entry in self._read_log() or []:
+            self._apply(tasks, entry)
+        return list(tasks.values())
+
+    def _read_log(self):
+        """New complete lines of the log since self.offset, or None if the log
+        belongs to another generation than the one this instance has read."""
+        try:
+            stat = os.stat(self.log_file)
+        except FileNotFoundError:
+            return []
+        signature = (stat.st_size, stat.st_mtime_ns)
+        if signature == self.log_signature:
+            return []
+        with open(self.log_file, "rb") as f:
+            try:
+                header = json.loads(f.readline())
+            except json.JSONDecodeError:
+                return []
+            if header.get("generation") != self.generation:
+                return None
+            self.offset = max(self.offset, f.tell())
+            f.seek(self.offset)
+            data = f.read()
+        complete = data[:data.rfind(b"\n") + 1]  # a half-written last line is read next time
+        self.offset += len(complete)
+        self.log_signature = signature if len(complete) == len(data) else None
+        return decode_lines(complete)
+
+    def read_changes(self):
+        # Under the lock, so a compaction is never seen halfway (new snapshot, old log)
+        with self.lock:
+            entries = self._read_log()
+            if entries is None:
+                return "reload", self._read_state()
+        return "changes", [entry for entry in entries if entry.get("by") != self.instance]
+
+    @staticmethod
+    def _apply(tasks, entry):
+        entry = {key: value for key, value in entry.items() if key != "by"}
+        if entry.get("deleted"):
+            tasks.pop(entry["id"], None)
+        elif entry["id"] in tasks:
+            tasks[entry["id"]].update(entry)
+        else:
+            tasks[entry["id"]] = entry
+
+    def append(self, entries):
+        """Appends one line per changed task; compacts when the log is large."""
+        if not entries:
+            return
+        lines = "".join(json.dumps(dict(entry, by=self.instance)) + "\n" for entry in entries)
+        with self.lock:
+            snapshot_generation = (read_tasks(self.snapshot_file) or {}).get("generation", 0)
+            if not os.path.exists(self.log_file) or self._log_generation() != snapshot_generation:
+                self._write_log(snapshot_generation)
+            self._trim_log()
+            with open(self.log_file, "a") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+                size = f.tell()
+            if size > self.compact_bytes:
+                self._compact(snapshot_generation)
+
+    def _trim_log(self):
+        """Cuts off a half-written last line (crash during a write), so the next
+        line does not end up glued to it. Only called under the lock."""
+        with open(self.log_file, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            f.seek(0)
+            f.truncate(f.read().rfind(b"\n") + 1)
+
+    def _log_generation(self):
+        with open(self.log_file, "rb") as f:
+            try:
+                return json.loads(f.readline()).get("generation")
+            except json.JSONDecodeError:
+                return None
+
+    def _compact(self, generation):
+        snapshot = read_tasks(self.snapshot_file) or {}
+        tasks = {task["id"]: task for task in snapshot.get("tasks", [])}
+        with open(self.log_file, "rb") as f:
+            f.readline()
+            data = f.read()
+        for entry in decode_lines(data[:data.rfind(b"\n") + 1]):
+            self._apply(tasks, entry)
+        self._write_snapshot(list(tasks.values()), generation + 1)
+        self._write_log(generation + 1)
+
+    def _write_snapshot(self, tasks, generation):
+        self._replace(self.snapshot_file, json.dumps({"generation": generation, "tasks": tasks}, indent=4))
+
+    def _write_log(self, generation):
+        self._replace(self.log_file, json.dumps({"generation": generation}) + "\n")
+
+    @staticmethod
+    def _replace(filename, text):
+        tmp_file = filename + ".tmp"
+        with open(tmp_file, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, filename)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import unittest
+
+from task_store import TaskStore
+
+
+class TaskStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def store(self, **kwargs):
+        store = TaskStore("test", self.directory, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_round_trip(self):
+        store = self.store()
+        store.append([{"id": "a", "title": "Boodschappen"}, {"id": "b", "title": "Afwas"}])
+        store.append([{"id": "a", "done": True}, {"id": "b", "deleted": True}])
+        self.assertEqual(self.store().read_all(), [{"id": "a", "title": "Boodschappen", "done": True}])
+
+    def test_migrates_legacy_file(self):
+        with open(os.path.join(self.directory, "tasks.json"), "w") as f:
+            json.dump([{"title": "Oud"}], f)
+        tasks = self.store().read_all()
+        self.assertEqual([task["title"] for task in tasks], ["Oud"])
+        self.assertTrue(tasks[0]["id"])
+
+    def test_compaction_keeps_tasks(self):
+        store = self.store(compact_bytes=200)
+        for i in range(20):
+            store.append([{"id": str(i), "title": f"Taak {i}"}])
+        store.append([{"id": "3", "deleted": True}])
+        tasks = self.store().read_all()
+        self.assertEqual(len(tasks), 19)
+        self.assertNotIn("3", [task["id"] for task in tasks])
+
+    def test_crash_between_snapshot_and_log(self):
+        # The snapshot of the next generation is written, the old log is not replaced yet
+        store = self.store()
+        store.append([{"id": "a", "title": "Eerste"}])
+        store._write_snapshot([{"id": "a", "title": "Eerste"}], 1)
+        self.assertEqual(self.store().read_all(), [{"id": "a", "title": "Eerste"}])
+
+    def test_half_written_line_is_read_later(self):
+        store = self.store()
+        store.append([{"id": "a", "title": "Eerste"}])
+        reader = self.store()
+        reader.read_all()
+        with open(store.log_file, "a") as f:
+            f.write('{"id": "b", "title": "Tw')
+        self.assertEqual(reader.read_changes(), ("changes", []))
+        with open(store.log_file, "a") as f:
+            f.write('eede"}\n')
+        self.assertEqual(reader.read_changes(), ("changes", [{"id": "b", "title": "Tweede"}]))
+
+    def test_append_after_half_written_line(self):
+        store = self.store()
+        store.append([{"id": "a", "title": "Eerste"}])
+        with open(store.log_file, "a") as f:
+            f.write('{"id": "b", "title": "Tw')  # crash while writing
+        store.append([{"id": "c", "title": "Derde"}])
+        self.assertEqual([task["id"] for task in self.store().read_all()], ["a", "c"])
+
+    def test_corrupt_line_is_skipped(self):
+        store = self.store(compact_bytes=150)
+        store.append([{"id": "a", "title": "Eerste"}])
+        with open(store.log_file, "a") as f:
+            f.write('{"id": "b", "tit{"id": "c"}\n')  # as left by an older version
+        reader = self.store()
+        self.assertEqual(reader.read_all(), [{"id": "a", "title": "Eerste"}])
+        store.append([{"id": "d", "title": "x" * 100}])  # compacts past the broken line
+        self.assertEqual([task["id"] for task in self.store().read_all()], ["a", "d"])
+        self.assertEqual(reader.read_changes()[0], "reload")
+
+    def test_changes_of_other_instances(self):
+        writer, reader = self.store(compact_bytes=300), self.store()
+        writer.append([{"id": "a", "title": "Eerste"}])
+        self.assertEqual(reader.read_all(), [{"id": "a", "title": "Eerste"}])
+
+        writer.append([{"id": "b", "title": "Tweede"}])
+        kind, entries = reader.read_changes()
+        self.assertEqual(kind, "changes")
+        self.assertEqual([entry["id"] for entry in entries], ["b"])
+        self.assertEqual(writer.read_changes(), ("changes", []))  # own changes are not reported
+
+        # After a compaction the reader gets the whole list again
+        writer.append([{"id": str(i), "title": "x" * 20} for i in range(10)])
+        kind, tasks = reader.read_changes()
+        self.assertEqual(kind, "reload")
+        self.assertEqual(len(tasks), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
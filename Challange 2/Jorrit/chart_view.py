@@ -0,0 +1,55 @@
+from PyQt6.QtCore import QTimer, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+from PyQt6.QtWidgets import QLabel, QSizePolicy
+
+from charts import ChartRenderer
+
+
+class QtChartView(QLabel):
+    """Toont een CategoryChart die off-screen getekend wordt. Aanvragen binnen
+    dezelfde event-loop-ronde worden samengevoegd tot één tekening."""
+
+    image_ready = pyqtSignal(int, QImage)
+    render_failed = pyqtSignal(int, str)
+
+    def __init__(self, chart):
+        super().__init__()
+        self.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+        self.setMinimumSize(400, 300)
+        # Uitgezonden op de render-thread, uitgevoerd op de GUI-thread
+        self.image_ready.connect(self._show)
+        self.render_failed.connect(self._show_error)
+        self.renderer = ChartRenderer(chart, self._on_ready, self._on_error)
+        self.request_args = None
+        self.scheduled = False
+
+    def request(self, data_fn, kind="pie"):
+        self.request_args = (data_fn, kind)
+        if not self.scheduled:
+            self.scheduled = True
+            QTimer.singleShot(0, self._flush)
+
+    def _flush(self):
+        self.scheduled = False
+        data_fn, kind = self.request_args
+        self.renderer.submit(data_fn(), kind, (self.width(), self.height()))
+
+    def _on_ready(self, generation, rgba):
+        height, width = rgba.shape[:2]
+        image = QImage(rgba.tobytes(), width, height, width * 4, QImage.Format.Format_RGBA8888).copy()
+        self.image_ready.emit(generation, image)
+
+    def _on_error(self, generation, error):
+        self.render_failed.emit(generation, str(error))
+
+    def _show(self, generation, image):
+        self.setPixmap(QPixmap.fromImage(image))
+
+    def _show_error(self, generation, message):
+        # Tekeningen komen in volgorde binnen; een latere tekening vervangt deze tekst weer
+        self.setText(f"Fout bij tekenen grafiek: {message}")
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.request_args is not None:
+            self.request(*self.request_args)
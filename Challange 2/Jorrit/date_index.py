@@ -0,0 +1,72 @@
+import datetime
+from array import array
+
+import numpy as np
+
+from columnar import EPOCH, INVALID_DAY
+
+
+class DateIndex:
+    """Datums één keer parsen (bij laden of toevoegen) en per (jaar, maand)
+    bijhouden op welke posities in de transactielijst ze staan.
+
+    De posities staan in compacte array('q')-lijsten, zodat de index ook bij
+    miljoenen transacties weinig geheugen kost.
+    """
+
+    def __init__(self):
+        self.count = 0      # aantal geïndexeerde transacties
+        self.by_month = {}  # (jaar, maand) -> array met posities
+        self.years = set()
+
+    def add(self, date_str):
+        """Indexeert de volgende transactie; geeft de datum terug, of None als die ongeldig is."""
+        position = self.count
+        self.count += 1
+        try:
+            date = datetime.datetime.strptime(date_str, '%d-%m-%Y').date()
+        except (TypeError, ValueError):
+            return None
+
+        self.by_month.setdefault((date.year, date.month), array('q')).append(position)
+        self.years.add(date.year)
+        return date
+
+    def add_records(self, transactions):
+        """Indexeert records met een datumtekst. Geeft de dagnummers (zoals in de
+        kolommen) en de transacties met een ongeldige datum terug."""
+        days, invalid = [], []
+        for t in transactions:
+            date = self.add(t.get("date"))
+            if date is None:
+                invalid.append(t)
+                days.append(INVALID_DAY)
+            else:
+                days.append(date.toordinal() - EPOCH)
+        return days, invalid
+
+    def add_days(self, days):
+        """Indexeert een blok transacties op dagnummer, zonder datums te parsen
+        (bijvoorbeeld de dagkolom uit een snapshot)."""
+        days = np.asarray(days)
+        positions = np.arange(self.count, self.count + len(days), dtype=np.int64)
+        self.count += len(days)
+
+        valid = days != INVALID_DAY
+        months = days[valid].astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        positions = positions[valid]
+        order = np.argsort(months, kind="stable")
+        months, positions = months[order], positions[order]
+        unique, starts = np.unique(months, return_index=True)
+        for month, part in zip(unique.tolist(), np.split(positions, starts[1:])):
+            year = 1970 + month // 12
+            self.by_month.setdefault((year, month % 12 + 1), array('q')).frombytes(part.tobytes())
+            self.years.add(year)
+
+    def positions(self, year=None, month=None):
+        """Posities van transacties in het gegeven jaar en/of maand (None = alles)."""
+        keys = sorted(k for k in self.by_month
+                      if (year is None or k[0] == year) and (month is None or k[1] == month))
+        if not keys:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([np.frombuffer(self.by_month[k], dtype=np.int64) for k in keys])
@@ -0,0 +1,21 @@
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+
+
+class QtDispatcher(QObject):
+    """Dispatcher voor TaskPool (zie workers.py): een signaal met een queued
+    connection, dus er hoeft niets gepolld te worden."""
+
+    posted = pyqtSignal(object)
+
+    def __init__(self):
+        super().__init__()
+        self.posted.connect(self._run, Qt.ConnectionType.QueuedConnection)
+
+    def expect(self):
+        pass
+
+    def post(self, callback):
+        self.posted.emit(callback)
+
+    def _run(self, callback):
+        callback()
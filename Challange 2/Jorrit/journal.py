@@ -0,0 +1,308 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from snapshot import read_snapshot, write_snapshot
+from storage import TransactionStore
+
+
+def write_json(filename, records):
+    """Schrijft records als JSON-lijst (atomisch via os.replace) en geeft het aantal terug.
+    De records worden één voor één weggeschreven, zonder tussenlijst."""
+    tmp_file = filename + ".tmp"
+    count = 0
+    with open(tmp_file, "w") as f:
+        f.write("[")
+        for record in records:
+            f.write(",\n    " if count else "\n    ")
+            f.write(json.dumps(record))
+            count += 1
+        f.write("\n]" if count else "]")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, filename)
+    return count
+
+
+def is_tombstone(entry):
+    return isinstance(entry, dict) and list(entry) == ["deleted"]
+
+
+def record_key(record):
+    """Vergelijkingssleutel van een record; het bedrag in centen, zoals de kolommen het bewaren."""
+    return tuple(sorted((field, round(float(value) * 100) if field == "amount" else value)
+                        for field, value in record.items()))
+
+
+def remove_last(records, record):
+    """Haalt het laatste record gelijk aan record uit de lijst; False als er geen is."""
+    key = record_key(record)
+    for i in range(len(records) - 1, -1, -1):
+        if record_key(records[i]) == key:
+            del records[i]
+            return True
+    return False
+
+
+class JournalStore(TransactionStore):
+    """Opslag als snapshot (de bestaande JSON-lijst) plus een append-only JSON Lines log.
+
+    Elke toevoeging is één regel in de log; fsync gebeurt per batch. Een
+    verwijdering (ongedaan maken) is ook één regel, {"deleted": record}: records
+    hebben geen id, dus die regel haalt het laatste gelijke record weg (gelijke
+    records zijn onderling uitwisselbaar). Na een aantal regels wordt alles in
+    een nieuwe snapshot gezet (atomisch via os.replace) en begint de log
+    opnieuw; pas dan verdwijnen de verwijderde records echt.
+
+    De eerste regel van de log zegt op welke snapshot hij voortbouwt (aantal
+    rijen en bestandskenmerken). Een compactie zet eerst een regel
+    {"compacting": n} in de log; is de snapshot vervangen maar de log nog niet
+    (crash daartussen), dan zitten de regels tot die markering al in de
+    snapshot.
+
+    De store houdt zelf geen records vast: bij compactie levert source() alle
+    records opnieuw aan (bijvoorbeeld uit de kolommen van de app).
+    """
+
+    def __init__(self, snapshot_file, source, sync_every=20, sync_interval=2.0, compact_every=5000):
+        self.snapshot_file = snapshot_file
+        self.source = source
+        self.log_file = os.path.splitext(snapshot_file)[0] + ".jsonl"
+        self.sync_every = sync_every          # fsync na zoveel regels...
+        self.sync_interval = sync_interval    # ...of na zoveel seconden
+        self.compact_every = compact_every
+        self.count = 0  # aantal records in snapshot + log
+        self.log = None
+        self.log_entries = 0
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def load(self):
+        """Leest de snapshot en speelt de log erover af. Een half geschreven laatste
+        regel (crash tijdens schrijven) wordt weggeknipt. Geeft alle records terug."""
+        records = []
+        if os.path.exists(self.snapshot_file):
+            with open(self.snapshot_file, "r") as f:
+                try:
+                    records = json.load(f)
+                except json.JSONDecodeError:
+                    print("Fout bij lezen snapshot, begin met lege lijst:", self.snapshot_file)
+        for entry in self._replay(len(records)):
+            if is_tombstone(entry):
+                remove_last(records, entry["deleted"])
+            else:
+                records.append(entry)
+        return records
+
+    def _snapshot_id(self):
+        """Kenmerken van het snapshotbestand; veranderen bij elke os.replace."""
+        try:
+            stat = os.stat(self.snapshot_file)
+        except FileNotFoundError:
+            return None
+        return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+    def _replay(self, snapshot_count):
+        """Leest de log en geeft de regels (records en verwijderingen) terug die nog
+        niet in de snapshot zitten."""
+        replayed = []
+        header = {"base": snapshot_count}
+        marker = None  # plaats van de laatste {"compacting": n} in replayed
+        good_offset = 0
+        if os.path.exists(self.log_file):
+            with open(self.log_file, "rb") as f:
+                for i, line in enumerate(f):
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    good_offset += len(line)
+                    if i == 0 and isinstance(entry, dict) and "base" in entry:
+                        header = entry
+                    elif isinstance(entry, dict) and list(entry) == ["compacting"]:
+                        marker = len(replayed)
+                    else:
+                        replayed.append(entry)
+
+            if good_offset != os.path.getsize(self.log_file):
+                print("Onvolledige regel in journal hersteld:", self.log_file)
+                with open(self.log_file, "r+b") as f:
+                    f.truncate(good_offset)
+
+        # Regels die al in de snapshot zitten (crash tijdens compactie) overslaan
+        if "snapshot" in header:
+            same = header["snapshot"] == self._snapshot_id()
+            new = replayed if same or marker is None else replayed[marker:]
+        else:
+            # Log van vóór de markeringen: alleen toevoegingen, dus tellen volstaat
+            skip = snapshot_count - header["base"]
+            new = replayed[skip:] if 0 <= skip <= len(replayed) else replayed
+
+        deleted = sum(is_tombstone(entry) for entry in new)
+        self.count = snapshot_count + len(new) - 2 * deleted
+        self.log_entries = len(replayed)
+        if good_offset == 0:
+            self._start_log()
+        else:
+            self.log = open(self.log_file, "ab")
+        return new
+
+    def _start_log(self):
+        if self.log:
+            self.log.close()
+        self.log = open(self.log_file, "wb")
+        self.log.write(json.dumps({"base": self.count, "snapshot": self._snapshot_id()}).encode() + b"\n")
+        self._fsync()
+        self.log_entries = 0
+
+    def _write(self, entry):
+        self.log.write(json.dumps(entry).encode() + b"\n")
+        self.log.flush()
+        self.log_entries += 1
+        self.unsynced += 1
+
+        if self.log_entries >= self.compact_every:
+            self.compact()
+        elif self.unsynced >= self.sync_every or time.monotonic() - self.last_sync >= self.sync_interval:
+            self._fsync()
+
+    def append(self, record):
+        """Voegt één transactie toe; kost één regel schrijven, onafhankelijk van de historie.
+        Het record moet al via source() zichtbaar zijn, want append kan compacteren.
+        De sleutel voor delete() is het record zelf."""
+        self.count += 1
+        self._write(record)
+        return record
+
+    def delete(self, keys):
+        """Eén verwijderregel per record; source() moet ze al niet meer bevatten."""
+        for record in keys:
+            self.count -= 1
+            self._write({"deleted": record})
+
+    def _fsync(self):
+        self.log.flush()
+        os.fsync(self.log.fileno())
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def _mark_compaction(self):
+        # Alles tot hier komt in de nieuwe snapshot; zie _replay
+        if self.log is None:
+            return
+        self.log.write(json.dumps({"compacting": self.count}).encode() + b"\n")
+        self._fsync()
+
+    def compact(self):
+        """Schrijft alle records naar een nieuwe snapshot en begint een lege log."""
+        self._mark_compaction()
+        self.count = write_json(self.snapshot_file, self.source())
+        self._start_log()
+
+    def close(self):
+        if self.log:
+            self._fsync()
+            self.log.close()
+            self.log = None
+
+
+class ColumnJournalStore(JournalStore):
+    """JournalStore met een binaire snapshot (zie snapshot.py) in plaats van JSON.
+
+    De snapshot wordt met mmap direct in de kolommen geladen; alleen de log
+    wordt nog als JSON gelezen. JSON blijft bruikbaar voor import en export
+    via JournalStore en write_json.
+
+    Met background (een functie zoals TaskPool.submit) wordt de snapshot op een
+    andere thread geschreven vanaf een momentopname van de kolommen; de app
+    kan intussen gewoon toevoegen. Pas daarna begint een nieuwe log, met de
+    rijen die tijdens het schrijven zijn bijgekomen.
+    """
+
+    def __init__(self, snapshot_file, columns, background=None, **kwargs):
+        super().__init__(snapshot_file, source=columns.rows, **kwargs)
+        self.columns = columns
+        self.log_file = snapshot_file + ".jsonl"  # los van de log van de JSON-opslag
+        self.background = background
+        self.compacting = False
+
+    def load(self):
+        """Laadt de snapshot in de (lege) kolommen en geeft de log-records terug die
+        de aanroeper daarna nog moet toevoegen. Verwijderregels voor rijen uit de
+        snapshot markeren die rijen als verwijderd in de kolommen."""
+        count = 0
+        if os.path.exists(self.snapshot_file):
+            try:
+                count = read_snapshot(self.snapshot_file, self.columns)
+            except ValueError as e:
+                print("Fout bij lezen snapshot, begin met lege kolommen:", e)
+        records = []
+        for entry in self._replay(count):
+            if not is_tombstone(entry):
+                records.append(entry)
+            elif not remove_last(records, entry["deleted"]):
+                self._delete_row(entry["deleted"])
+        return records
+
+    def _delete_row(self, record):
+        """Markeert de laatste levende rij gelijk aan record als verwijderd. Een
+        vergelijking over alle kolommen, maar alleen bij het laden en alleen voor
+        rijen die na de laatste compactie ongedaan zijn gemaakt."""
+        columns = self.columns
+        n = columns.size
+        mask = ~columns.deleted[:n] & (columns.cents[:n] == round(float(record.get("amount", 0)) * 100))
+        for field in columns.text_fields:
+            code = columns.lookup[field].get(record.get(field, ""))
+            if code is None:
+                return
+            mask &= columns.codes[field][:n] == code
+        rows = np.flatnonzero(mask)
+        if len(rows):
+            columns.delete(rows[-1])
+
+    def compact(self):
+        if self.compacting:
+            return  # er wordt al een snapshot geschreven
+        frozen = self.columns.frozen()
+        if self.background is None:
+            self._mark_compaction()
+            write_snapshot(self.snapshot_file, frozen)
+            self._restart_log(frozen)
+            return
+
+        def on_error(e):
+            self.compacting = False
+            print("Fout bij schrijven snapshot:", e)
+
+        # Tot _restart_log blijft de oude log in gebruik; een crash daartussen
+        # wordt bij het laden opgevangen door de markering
+        self._mark_compaction()
+        self.compacting = True
+        self.background(write_snapshot, self.snapshot_file, frozen,
+                        on_done=lambda _: self._restart_log(frozen), on_error=on_error)
+
+    def _restart_log(self, frozen):
+        self.compacting = False
+        if self.log is None:
+            return  # store is intussen gesloten; de oude log is nog volledig
+        self.count = int((~frozen.deleted).sum())
+        self._start_log()
+        # Rijen die na de momentopname zijn toegevoegd of teruggezet (redo) staan
+        # nog niet in de snapshot
+        n = frozen.size
+        live = ~self.columns.deleted[:self.columns.size]
+        later = np.concatenate([np.flatnonzero(frozen.deleted & live[:n]), n + np.flatnonzero(live[n:])])
+        for record in self.columns.rows(later):
+            self.log.write(json.dumps(record).encode() + b"\n")
+            self.count += 1
+            self.log_entries += 1
+        # Tijdens het schrijven ongedaan gemaakte rijen staan nog in de snapshot
+        for record in self.columns.rows(np.flatnonzero(~frozen.deleted & ~live[:n])):
+            self.log.write(json.dumps({"deleted": record}).encode() + b"\n")
+            self.count -= 1
+            self.log_entries += 1
+        self._fsync()
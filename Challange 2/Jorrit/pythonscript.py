@@ -1,25 +1,66 @@
+import time
+STARTED = time.perf_counter()  # begin van de opstartmeting (--profile)
+
 import sys
-import json
 import os
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QKeySequence, QShortcut
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QLabel,
-    QLineEdit, QPushButton, QComboBox, QHBoxLayout
+    QLineEdit, QPushButton, QComboBox, QHBoxLayout, QMessageBox
 )
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-import matplotlib.pyplot as plt
+import calendar
 import datetime
 
+import numpy as np
+
+# Gedeelde modules (zoals charts.py) staan in de map erboven
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from chart_view import QtChartView
+from charts import CategoryChart, TrendChart
+from columnar import EPOCH, INVALID_DAY, TransactionColumns, to_day
+from date_index import DateIndex
+from dedup import DuplicateIndex
+from history import History
+from dispatch import QtDispatcher
+from journal import ColumnJournalStore, JournalStore, write_json
+from rollup import RollupCube, build_cells, cube_input
+from startup import StartupProfiler
+from storage import SqliteStore
+from workers import TaskPool
+
 
 class BudgetApp(QWidget):
-    def __init__(self):
+    def __init__(self, sqlite=False, profiler=None):
         super().__init__()
         self.setWindowTitle("Budget Tracker")
         self.setMinimumWidth(650)
-        self.transactions = []
+        # Kolommen met numpy-arrays; de oorspronkelijke datumtekst blijft bewaard
+        self.transactions = TransactionColumns(("date", "category"))
         self.json_file = "transacties.json"
+        self.date_index = DateIndex()  # geparste datums en (jaar, maand) -> posities
+        self.tasks = TaskPool(QtDispatcher())  # opslaan en aggregeren buiten de GUI-thread
+        self.history = History()  # ongedaan maken / opnieuw; per stap alleen de transactie
+        if sqlite:
+            # Filters en totalen gaan als SQL naar de database; rijen worden niet ingeladen
+            self.store = SqliteStore("transacties.db", text_fields=("category",), date_format="%d-%m-%Y")
+            self.rollup = RollupCube()
+            self.duplicates = DuplicateIndex(field="category")
+        else:
+            # Binaire snapshot (mmap) + append-only log; JSON alleen nog voor import en export
+            self.store = ColumnJournalStore("transacties.snap", self.transactions, background=self.tasks.submit)
+            self.rollup = RollupCube("transacties.rollup.json")  # maand x categorie totalen voor de trends
+            # Fingerprints (datum, bedrag, categorie) om dubbel toevoegen te herkennen
+            self.duplicates = DuplicateIndex("transacties.dedup.json", field="category")
+
+        self.profiler = profiler or StartupProfiler()  # rapporteert alleen met --profile
 
         self.init_ui()
+        self.chart_view.image_ready.connect(lambda *_: self.profiler.finish("eerste grafiek"))
+        self.profiler.mark("widgets")
         self.load_transactions()
+        self.profiler.mark("data laden")
 
     def init_ui(self):
         layout = QVBoxLayout()
@@ -43,6 +84,22 @@ class BudgetApp(QWidget):
         layout.addLayout(input_layout)
         layout.addWidget(self.add_button)
 
+        undo_layout = QHBoxLayout()
+        self.undo_button = QPushButton("Ongedaan maken")
+        self.undo_button.clicked.connect(self.undo)
+        self.redo_button = QPushButton("Opnieuw")
+        self.redo_button.clicked.connect(self.redo)
+        undo_layout.addWidget(self.undo_button)
+        undo_layout.addWidget(self.redo_button)
+        layout.addLayout(undo_layout)
+        QShortcut(QKeySequence.StandardKey.Undo, self, activated=self.undo)
+        QShortcut(QKeySequence.StandardKey.Redo, self, activated=self.redo)
+        self.update_undo_buttons()
+
+        self.export_button = QPushButton("Exporteer naar JSON")
+        self.export_button.clicked.connect(self.export_json)
+        layout.addWidget(self.export_button)
+
         # Filters
         filter_layout = QHBoxLayout()
         self.month_filter = QComboBox()
@@ -72,7 +129,7 @@ class BudgetApp(QWidget):
         # Grafiekstijl
         graph_style_layout = QHBoxLayout()
         self.graph_style = QComboBox()
-        self.graph_style.addItems(["Staafdiagram", "Taartdiagram"])
+        self.graph_style.addItems(["Staafdiagram", "Taartdiagram", "Maandtrend", "Cumulatief"])
         self.graph_style.currentTextChanged.connect(self.update_graph)
 
         graph_style_layout.addWidget(QLabel("Grafiekstijl:"))
@@ -81,9 +138,17 @@ class BudgetApp(QWidget):
         layout.addLayout(graph_style_layout)
 
         # Grafiek
-        self.figure, self.ax = plt.subplots()
-        self.canvas = FigureCanvas(self.figure)
-        layout.addWidget(self.canvas)
+        # Off-screen getekend; balken/taartpunten worden hergebruikt als de categorieën gelijk blijven
+        chart = CategoryChart("Uitgaven per categorie", "Geen data om te tonen", tight_layout=True)
+        self.chart_view = QtChartView(chart)
+        layout.addWidget(self.chart_view)
+
+        # Trends komen uit de rollup; gebruikt niet de maand/jaar-filter
+        trend_chart = TrendChart({"stacked": "Uitgaven per maand", "balance": "Cumulatieve uitgaven"},
+                                 "Geen data om te tonen", tight_layout=True)
+        self.trend_view = QtChartView(trend_chart)
+        self.trend_view.hide()
+        layout.addWidget(self.trend_view)
 
         self.setLayout(layout)
 
@@ -102,113 +167,220 @@ class BudgetApp(QWidget):
             return
 
         category = self.category_input.currentText()
+        match = self.duplicates.check().find(to_day(date), amount, category)
+        if match and QMessageBox.question(
+                self, "Dubbele transactie",
+                f"Er is al een transactie van €{match.cents / 100:.2f} ({match.text}) "
+                f"op {datetime.date.fromordinal(match.day + EPOCH).strftime('%d-%m-%Y')}.\n\nToch toevoegen?"
+        ) != QMessageBox.StandardButton.Yes:
+            return
+
         transaction = {
             "date": date_str,  # opgeslagen in dd-mm-jjjj formaat
             "amount": amount,
             "category": category
         }
-        self.transactions.append(transaction)
-        self.save_transactions()
-
-        if str(date.year) not in [self.year_filter.itemText(i) for i in range(self.year_filter.count())]:
+        if self.year_filter.findText(str(date.year)) == -1:
             self.year_filter.addItem(str(date.year))
 
+        row = None
+        if not self.store.queryable:
+            # Eerst in de kolommen: een compactie tijdens store.append leest daaruit
+            row = self.transactions.append(to_day(date), amount, date=date_str, category=category)
+            self.date_index.add(date_str)
+        self.rollup.add(to_day(date), category, amount)
+        self.duplicates.add(to_day(date), amount, category)
+        keys = [self.store.append(transaction)]  # sleutel in de store; na opnieuw toevoegen een nieuwe
+        self.history.push("transactie toevoegen",
+                          lambda: self.remove_transaction(row, transaction, keys),
+                          lambda: self.restore_transaction(row, transaction, keys))
+
+        self.update_undo_buttons()
         self.update_graph()
         self.date_input.clear()
         self.amount_input.clear()
 
-    def update_graph(self):
-        selected_month = self.month_filter.currentIndex()
-        selected_year = self.year_filter.currentText()
+    def undo(self):
+        self.history.undo()
+        self.update_undo_buttons()
+
+    def redo(self):
+        self.history.redo()
+        self.update_undo_buttons()
+
+    def update_undo_buttons(self):
+        self.undo_button.setEnabled(self.history.can_undo())
+        self.redo_button.setEnabled(self.history.can_redo())
+
+    def remove_transaction(self, row, transaction, keys):
+        # De rij blijft in de kolommen en de datumindex, maar telt niet meer mee
+        self.tasks.cancel("rollup")  # een kubus die nog wordt opgebouwd, kan de rij nog bevatten
+        if row is not None:
+            self.transactions.delete(row)
+        day = to_day(datetime.datetime.strptime(transaction["date"], '%d-%m-%Y').date())
+        self.rollup.remove(day, transaction["category"], transaction["amount"])
+        self.duplicates.remove(day, transaction["amount"], transaction["category"])
+        self.store.delete(keys)
+        self.update_graph()
 
-        filtered = []
-        for t in self.transactions:
-            try:
-                date = datetime.datetime.strptime(t["date"], '%d-%m-%Y').date()
-            except ValueError:
-                continue
-
-            if selected_year != "Alle jaren" and date.year != int(selected_year):
-                continue
-            if selected_month != 0 and date.month != selected_month:
-                continue
-            filtered.append((t["amount"], t["category"]))
-
-        # Groepeer per categorie
-        data = {}
-        for amount, category in filtered:
-            data[category] = data.get(category, 0) + amount
-
-        self.ax.clear()
-        if data:
-            if self.graph_style.currentText() == "Staafdiagram":
-                categories = list(data.keys())
-                values = list(data.values())
-                n = len(categories)
-                # print(f"Plot staafdiagram met {n} categorieën")  # eventueel voor debuggen
-
-                bar_width = 0.6
-                x_pos = range(n)
-
-                self.ax.bar(x_pos, values, color='skyblue', width=bar_width)
-                self.ax.set_xticks(x_pos)
-                self.ax.set_xticklabels(categories, rotation=30, ha='right')
-                self.ax.set_ylabel("Bedrag (€)")
-
-                # Zorg dat x-limiet net iets groter is dan het aantal balken
-                self.ax.set_xlim(-0.5, n - 0.5)
-
-                # Zet y-limiet iets hoger dan max waarde
-                ymax = max(values)
-                if ymax == 0:
-                    ymax = 1
-                self.ax.set_ylim(0, ymax * 1.1)
+    def restore_transaction(self, row, transaction, keys):
+        self.tasks.cancel("rollup")
+        if row is not None:
+            self.transactions.undelete(row)
+        day = to_day(datetime.datetime.strptime(transaction["date"], '%d-%m-%Y').date())
+        self.rollup.add(day, transaction["category"], transaction["amount"], new_row=False)
+        self.duplicates.add(day, transaction["amount"], transaction["category"], new_row=False)
+        keys[:] = [self.store.append(transaction)]
+        self.update_graph()
 
+    def update_graph(self):
+        # Alleen aanvragen; de grafiek wordt één keer per event-loop-ronde getekend
+        style = self.graph_style.currentText()
+        if style in ("Maandtrend", "Cumulatief"):
+            self.chart_view.hide()
+            self.trend_view.show()
+            if self.rollup.dirty:
+                # Kubus opnieuw opbouwen in een apart proces; daarna opnieuw tekenen
+                rows = len(self.transactions)
+                self.tasks.submit(build_cells, *cube_input(self.transactions), cpu=True, key="rollup",
+                                  on_done=lambda cells: self.rollup_built(cells, rows))
+                return
+            if style == "Maandtrend":
+                self.trend_view.request(lambda: self.rollup.monthly(sign=1), "stacked")
             else:
-                self.ax.pie(data.values(), labels=data.keys(), autopct='%1.1f%%', startangle=90)
-                self.ax.axis('equal')
+                self.trend_view.request(self.rollup.running_balance, "balance")
+            return
 
-        else:
-            # Geen data om te plotten, lege grafiek
-            self.ax.text(0.5, 0.5, "Geen data om te tonen", ha='center', va='center')
-            self.ax.axis('off')
+        self.trend_view.hide()
+        self.chart_view.show()
+        kind = "bar" if style == "Staafdiagram" else "pie"
+        self.chart_view.request(self.category_totals, kind)
+
+    def rollup_built(self, cells, rows):
+        # Alleen gebruiken als er intussen niets is toegevoegd
+        if rows == len(self.transactions):
+            self.rollup.replace(cells, rows)
+        self.update_graph()
+
+    def category_totals(self):
+        month = self.month_filter.currentIndex() or None
+        selected_year = self.year_filter.currentText()
+        year = None if selected_year == "Alle jaren" else int(selected_year)
+
+        if self.store.queryable:
+            # GROUP BY in SQLite; een jaar of maand wordt een bereik op de datumindex
+            if year is None:
+                return self.store.sum_by("category", month_of_year=month)
+            first, last = (1, 12) if month is None else (month, month)
+            start = datetime.date(year, first, 1)
+            end = datetime.date(year, last, calendar.monthrange(year, last)[1])
+            return self.store.sum_by("category", start=start, end=end)
 
-        self.ax.set_title("Uitgaven per categorie")
-        self.figure.tight_layout()  # voorkomt overlappende labels
-        self.canvas.draw()
+        # Opzoeken in de datumindex in plaats van elke datum opnieuw te parsen
+        positions = self.date_index.positions(year=year, month=month)
+        positions = positions[~self.transactions.deleted[positions]]  # ongedaan gemaakte rijen
+
+        # Groeperen per categorie met bincount over de kolommen
+        return self.transactions.sum_by("category", positions)
 
     def save_transactions(self):
+        # Volledige snapshot schrijven (op de achtergrond); normaal gaat alles via de log
         try:
-            with open(self.json_file, "w") as f:
-                json.dump(self.transactions, f, indent=4)
+            self.store.compact()
+            self.rollup.save()
         except Exception as e:
-            print("Fout bij opslaan JSON:", e)
+            print("Fout bij opslaan snapshot:", e)
+
+    def export_json(self):
+        filename = f"transacties_{datetime.date.today().strftime('%Y%m%d')}.json"
+        rows = self.transactions.frozen().rows()  # momentopname; schrijven gebeurt op een worker-thread
+        self.tasks.submit(write_json, filename, rows,
+                          on_done=lambda count: print(f"{count} transacties geëxporteerd naar {filename}"),
+                          on_error=lambda e: print("Fout bij exporteren JSON:", e))
+
+    def read_json(self):
+        # transacties.json met zijn log, zoals de app die vroeger bewaarde
+        journal = JournalStore(self.json_file, source=None)
+        if not (os.path.exists(journal.snapshot_file) or os.path.exists(journal.log_file)):
+            return []
+        try:
+            records = journal.load()
+            journal.close()
+            return records
+        except OSError as e:
+            print("Fout bij lezen JSON:", e)
+            return []
 
     def load_transactions(self):
-        if not os.path.exists(self.json_file):
+        if self.store.queryable:
+            self.load_database()
             return
 
-        with open(self.json_file, "r") as f:
-            try:
-                self.transactions = json.load(f)
-            except json.JSONDecodeError:
-                self.transactions = []
+        # Zonder snapshot: de bestaande JSON-data eenmalig overnemen
+        imported = [] if os.path.exists(self.store.snapshot_file) else self.read_json()
+        try:
+            records = imported + self.store.load()
+        except OSError as e:
+            print("Fout bij laden snapshot:", e)
+            return
+
+        # De snapshot staat al (gemapt) in de kolommen; zijn dagnummers zijn bekend
+        days = self.transactions.days[:len(self.transactions)]
+        self.date_index.add_days(days)
+        ongeldig = list(self.transactions.rows(np.flatnonzero(days == INVALID_DAY)))
+
+        # Alleen records uit JSON en de log hoeven nog geparst te worden
+        days, invalid = self.date_index.add_records(records)
+        ongeldig += invalid
+        if ongeldig:
+            print(f"{len(ongeldig)} transactie(s) met ongeldige datum overgeslagen:")
+            for t in ongeldig:
+                print("  ", t)
+
+        self.transactions.extend(
+            days,
+            [t.get("amount", 0) for t in records],
+            date=[t.get("date", "") for t in records],
+            category=[t.get("category", "") for t in records])
+        if imported:
+            self.store.compact()  # meteen een binaire snapshot, de JSON blijft ongemoeid
+
+        # Opgeslagen rollup gebruiken zolang hij bij het aantal rijen past
+        self.rollup.load(len(self.transactions))
+        self.duplicates.load(len(self.transactions))
+        self.duplicates.ensure(self.transactions)
 
         # Voeg unieke jaren toe aan de jaarfilter
-        jaren = sorted(set(
-            str(datetime.datetime.strptime(t["date"], "%d-%m-%Y").year)
-            for t in self.transactions
-            if t.get("date")
-        ))
-        for jaar in jaren:
-            if jaar not in [self.year_filter.itemText(i) for i in range(self.year_filter.count())]:
-                self.year_filter.addItem(jaar)
+        for jaar in sorted(self.date_index.years):
+            self.year_filter.addItem(str(jaar))
 
         self.update_graph()
 
+    def load_database(self):
+        # Bestaande JSON-data bij de eerste keer overnemen in één transactie
+        if not len(self.store):
+            self.store.extend(self.read_json())
+
+        for jaar in sorted(self.store.years()):
+            self.year_filter.addItem(str(jaar))
+        self.rollup.replace(self.store.rollup_cells())
+        self.duplicates.replace(self.store.fingerprint_counts("category"))
+        self.update_graph()
+
+    def closeEvent(self, event):
+        # Lopende achtergrondtaken afmaken, dan de laatste log-regels naar schijf
+        self.tasks.shutdown()
+        self.store.close()
+        self.rollup.save()
+        self.duplicates.save()
+        super().closeEvent(event)
+
 
 if __name__ == "__main__":
+    profiler = StartupProfiler(STARTED, enabled="--profile" in sys.argv)  # --profile: opstarttijden per fase
+    profiler.mark("imports")
     app = QApplication(sys.argv)
-    window = BudgetApp()
+    window = BudgetApp(sqlite="--sqlite" in sys.argv, profiler=profiler)  # --sqlite: transacties.db in plaats van JSON
     window.show()
+    QTimer.singleShot(0, lambda: profiler.mark("eerste weergave"))
     sys.exit(app.exec())
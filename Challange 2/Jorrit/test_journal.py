@@ -0,0 +1,197 @@
+import datetime
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from columnar import TransactionColumns, to_day
+from journal import ColumnJournalStore, JournalStore
+from snapshot import read_snapshot, write_snapshot
+
+
+def record(day, amount, category):
+    return {"date": f"{day:02d}-06-2025", "amount": amount, "category": category}
+
+
+class JournalStoreTest(unittest.TestCase):
+    """JSON-snapshot plus log; records staan (zoals in de app) in een lijst die source() teruggeeft."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.snapshot_file = os.path.join(tmp.name, "transacties.json")
+        self.records = []
+
+    def open(self, **kwargs):
+        store = JournalStore(self.snapshot_file, source=lambda: self.records, **kwargs)
+        self.addCleanup(store.close)
+        self.records = store.load()
+        return store
+
+    def add(self, store, *records):
+        keys = []
+        for r in records:
+            self.records.append(r)
+            keys.append(store.append(r))
+        return keys
+
+    def test_round_trip(self):
+        store = self.open()
+        self.add(store, record(1, -2.5, "Koffie"), record(2, 100, "Salaris"))
+        store.close()
+        self.open()
+        self.assertEqual(self.records, [record(1, -2.5, "Koffie"), record(2, 100, "Salaris")])
+
+    def test_compaction(self):
+        store = self.open(compact_every=2)
+        self.add(store, *(record(day, -day, "Koffie") for day in range(1, 6)))
+        with open(self.snapshot_file) as f:
+            self.assertEqual(len(json.load(f)), 4)  # de vijfde staat nog alleen in de log
+        store.close()
+        self.open()
+        self.assertEqual(self.records, [record(day, -day, "Koffie") for day in range(1, 6)])
+
+    def test_undo_appends_tombstone(self):
+        store = self.open(compact_every=3)
+        self.add(store, record(1, -2.5, "Koffie"), record(2, 100, "Salaris"), record(3, -40, "Boodschappen"))
+        with open(self.snapshot_file) as f:
+            snapshot = f.read()
+
+        keys = self.add(store, record(4, -2.5, "Koffie"))
+        self.records.remove(keys[0])
+        store.delete(keys)
+        store.close()
+        with open(self.snapshot_file) as f:
+            self.assertEqual(f.read(), snapshot)  # ongedaan maken herschrijft de snapshot niet
+        self.open()
+        self.assertEqual(len(self.records), 3)
+
+    def test_undo_of_compacted_record(self):
+        store = self.open(compact_every=2)
+        keys = self.add(store, record(1, -2.5, "Koffie"), record(2, 100, "Salaris"))
+        self.records.remove(keys[0])
+        store.delete(keys[:1])
+        store.close()
+        self.open()
+        self.assertEqual(self.records, [record(2, 100, "Salaris")])
+
+    def test_equal_records_only_one_undone(self):
+        store = self.open()
+        keys = self.add(store, record(1, -2.5, "Koffie"), record(1, -2.5, "Koffie"))
+        self.records.pop()
+        store.delete(keys[1:])
+        store.close()
+        self.open()
+        self.assertEqual(self.records, [record(1, -2.5, "Koffie")])
+
+    def test_half_written_line(self):
+        store = self.open()
+        self.add(store, record(1, -2.5, "Koffie"))
+        store.close()
+        with open(store.log_file, "ab") as f:
+            f.write(b'{"date": "02-06-2025", "amo')
+        self.open()
+        self.assertEqual(self.records, [record(1, -2.5, "Koffie")])
+        with open(store.log_file, "rb") as f:
+            self.assertTrue(f.read().endswith(b"\n"))
+
+    def test_crash_between_snapshot_and_log(self):
+        store = self.open()
+        self.add(store, record(1, -2.5, "Koffie"), record(2, 100, "Salaris"))
+        # Compactie tot en met de nieuwe snapshot; de log wordt niet meer vervangen
+        store._mark_compaction()
+        with open(self.snapshot_file, "w") as f:
+            json.dump(self.records, f)
+        self.add(store, record(3, -40, "Boodschappen"))
+        store.close()
+        self.open()
+        self.assertEqual(len(self.records), 3)
+
+
+class ColumnJournalStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.snapshot_file = os.path.join(tmp.name, "transacties.snap")
+
+    def open(self, **kwargs):
+        columns = TransactionColumns(("date", "category"))
+        store = ColumnJournalStore(self.snapshot_file, columns, **kwargs)
+        self.addCleanup(store.close)
+        for r in store.load():
+            self.append(columns, r)
+        return columns, store
+
+    @staticmethod
+    def append(columns, r):
+        day = to_day(datetime.datetime.strptime(r["date"], "%d-%m-%Y").date())
+        return columns.append(day, r["amount"], date=r["date"], category=r["category"])
+
+    def add(self, columns, store, r):
+        row = self.append(columns, r)
+        return row, store.append(r)
+
+    def live(self, columns):
+        return sorted((r["date"], r["amount"], r["category"]) for r in columns.rows())
+
+    def test_round_trip_with_compaction(self):
+        columns, store = self.open(compact_every=2)
+        for day in range(1, 6):
+            self.add(columns, store, record(day, -day, "Koffie"))
+        store.close()
+        expected = self.live(columns)
+        self.assertTrue(os.path.exists(self.snapshot_file))
+        self.assertEqual(self.live(self.open()[0]), expected)
+
+    def test_undo_of_snapshot_row(self):
+        columns, store = self.open(compact_every=3)
+        rows = [self.add(columns, store, record(day, -day, "Koffie")) for day in range(1, 4)]
+        row, key = rows[1]
+        columns.delete(row)
+        store.delete([key])
+        store.close()
+        self.assertEqual(self.live(self.open()[0]),
+                         [("01-06-2025", -1.0, "Koffie"), ("03-06-2025", -3.0, "Koffie")])
+
+    def test_undo_and_redo(self):
+        columns, store = self.open()
+        row, key = self.add(columns, store, record(1, -2.5, "Koffie"))
+        columns.delete(row)
+        store.delete([key])
+        columns.undelete(row)
+        store.append(columns.row(row))
+        store.close()
+        self.assertEqual(self.live(self.open()[0]), [("01-06-2025", -2.5, "Koffie")])
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def test_round_trip_skips_deleted_rows(self):
+        columns = TransactionColumns()
+        columns.extend([1, 2, 3], [1.5, -2.25, 10], category=["a", "b", "a"], description=["x", "y", "ü"])
+        columns.delete(1)
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "t.snap")
+            write_snapshot(filename, columns)
+            loaded = TransactionColumns()
+            self.assertEqual(read_snapshot(filename, loaded), 2)
+            self.assertEqual(list(loaded.rows()), list(columns.rows()))
+            loaded.append(4, 1, category="c", description="z")  # gemapte kolommen worden dan gekopieerd
+            self.assertEqual(len(loaded), 3)
+            del loaded
+
+    def test_rejects_other_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "t.snap")
+            with open(filename, "wb") as f:
+                f.write(b"[]" * 20)
+            with self.assertRaises(ValueError):
+                read_snapshot(filename, TransactionColumns())
+
+
+if __name__ == "__main__":
+    unittest.main()
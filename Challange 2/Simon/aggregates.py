@@ -0,0 +1,146 @@
+from datetime import date
+import calendar
+
+
+def to_ordinal(day):
+    """Accepts a date or an ISO 'YYYY-MM-DD' string and returns its day ordinal."""
+    if day is None:
+        return None
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    return day.toordinal()
+
+
+def month_range(month):
+    """Returns (first_day, last_day) for a 'YYYY-MM' string."""
+    year, month_nr = int(month[:4]), int(month[5:7])
+    last = calendar.monthrange(year, month_nr)[1]
+    return date(year, month_nr, 1), date(year, month_nr, last)
+
+
+class FenwickTree:
+    """Binary indexed tree over day ordinals. Grows (and rebuilds once) when a
+    date falls outside the current range, so adds stay O(log n) amortized."""
+
+    def __init__(self):
+        self.base = None   # ordinal of position 0
+        self.values = []   # plain per-day totals, used for rebuilding
+        self.tree = [0.0]  # 1-based
+        self.total = 0.0
+
+    def _grow(self, ordinal):
+        if self.base is None:
+            self.base = ordinal
+            self.values = [0.0] * 32
+        else:
+            first = min(self.base, ordinal)
+            last = max(self.base + len(self.values) - 1, ordinal)
+            size = len(self.values)
+            while size < last - first + 1:
+                size *= 2
+            # Extra ruimte aan de kant waar we groeien
+            if ordinal < self.base:
+                first = last - size + 1
+            values = [0.0] * size
+            offset = self.base - first
+            values[offset:offset + len(self.values)] = self.values
+            self.base, self.values = first, values
+
+        # Lineaire opbouw van de boom
+        n = len(self.values)
+        self.tree = [0.0] + self.values[:]
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                self.tree[parent] += self.tree[i]
+
+    def add(self, ordinal, amount):
+        if self.base is None or not self.base <= ordinal < self.base + len(self.values):
+            self._grow(ordinal)
+        pos = ordinal - self.base
+        self.values[pos] += amount
+        self.total += amount
+        i = pos + 1
+        n = len(self.values)
+        while i <= n:
+            self.tree[i] += amount
+            i += i & -i
+
+    def prefix(self, ordinal):
+        """Sum of all days up to and including ordinal."""
+        if self.base is None or ordinal < self.base:
+            return 0.0
+        i = min(ordinal - self.base + 1, len(self.values))
+        result = 0.0
+        while i > 0:
+            result += self.tree[i]
+            i -= i & -i
+        return result
+
+    def range_sum(self, start=None, end=None):
+        """Sum between two ordinals (inclusive); None means unbounded."""
+        upper = self.total if end is None else self.prefix(end)
+        lower = 0.0 if start is None else self.prefix(start - 1)
+        return upper - lower
+
+
+class AggregateIndex:
+    """Running totals per day and per category, so summaries, graphs and budget
+    checks never have to scan the raw transactions."""
+
+    def __init__(self):
+        self.category_income = {}    # categorie -> FenwickTree
+        self.category_expenses = {}  # categorie -> FenwickTree (negatieve bedragen)
+        self.income = FenwickTree()
+        self.expenses = FenwickTree()
+
+    def add(self, date_str, category, amount):
+        ordinal = to_ordinal(date_str)
+        if amount > 0:
+            self.income.add(ordinal, amount)
+            self.category_income.setdefault(category, FenwickTree()).add(ordinal, amount)
+        elif amount < 0:
+            self.expenses.add(ordinal, amount)
+            self.category_expenses.setdefault(category, FenwickTree()).add(ordinal, amount)
+
+    def remove(self, date_str, category, amount):
+        # Zelfde boom als bij toevoegen, maar met het tegengestelde bedrag
+        ordinal = to_ordinal(date_str)
+        if amount > 0:
+            self.income.add(ordinal, -amount)
+            self.category_income[category].add(ordinal, -amount)
+        elif amount < 0:
+            self.expenses.add(ordinal, -amount)
+            self.category_expenses[category].add(ordinal, -amount)
+
+    def add_many(self, transactions):
+        for t in transactions:
+            self.add(t['date'], t['category'], t['amount'])
+
+    def categories(self):
+        return set(self.category_income) | set(self.category_expenses)
+
+    def totals(self, start=None, end=None, categories=None):
+        """Returns (income, expenses) for a date range, optionally limited to a
+        set of categories. Expenses are negative, like the raw amounts."""
+        start, end = to_ordinal(start), to_ordinal(end)
+        if categories is None:
+            return self.income.range_sum(start, end), self.expenses.range_sum(start, end)
+
+        income = sum(self.category_income[c].range_sum(start, end)
+                     for c in categories if c in self.category_income)
+        expenses = sum(self.category_expenses[c].range_sum(start, end)
+                       for c in categories if c in self.category_expenses)
+        return income, expenses
+
+    def expenses_by_category(self, start=None, end=None, categories=None):
+        """Absolute expenses per category for a date range, skipping empty ones."""
+        start, end = to_ordinal(start), to_ordinal(end)
+        result = {}
+        for category, tree in self.category_expenses.items():
+            if categories is not None and category not in categories:
+                continue
+            total = round(-tree.range_sum(start, end), 2)
+            if total > 0:
+                result[category] = total
+        return result
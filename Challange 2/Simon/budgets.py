@@ -0,0 +1,163 @@
+import json
+import os
+from datetime import date
+
+EVERY_MONTH = "*"
+WINDOWS = (7, 30)
+
+
+class BudgetMonitor:
+    """Budgets with running spend totals, kept up to date per transaction.
+
+    A budget is keyed by (period, category): period is a "YYYY-MM" month,
+    EVERY_MONTH, or a rolling window length in days (7 or 30); category None
+    means all categories. Spend is tracked in cents per month and per day, both
+    per category and in total, so an add is a handful of dict updates.
+
+    Adds only remember which months and days they touched; evaluate() checks
+    the budgets for everything touched since the previous call in one pass, so
+    a bulk import costs one check instead of one per row.
+    """
+
+    def __init__(self, filename="budgetten.json"):
+        self.filename = filename
+        self.budgets = {}      # (periode, categorie) -> bedrag in euro
+        self.month_spend = {}  # (maand, categorie of None) -> uitgaven in centen
+        self.day_spend = {}    # (dagnummer, categorie of None) -> uitgaven in centen
+        self.touched_months = set()  # (maand, categorie) sinds de laatste evaluate()
+        self.touched_days = set()    # (dagnummer, categorie)
+
+    # --- Budgetten ---
+    def set_budget(self, period, category, amount):
+        self.budgets[(period, category or None)] = amount
+        self.save()
+
+    def remove_budget(self, period, category):
+        self.budgets.pop((period, category or None), None)
+        self.save()
+
+    def save(self):
+        tmp_file = self.filename + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump([[period, category, amount] for (period, category), amount in self.budgets.items()],
+                      f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, self.filename)
+
+    def load(self):
+        try:
+            with open(self.filename, "r", encoding="utf-8") as f:
+                self.budgets = {(period, category): amount for period, category, amount in json.load(f)}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError) as e:
+            print("Fout bij laden budgetten:", e)
+
+    # --- Uitgaven bijhouden ---
+    def add(self, date_str, category, amount, sign=1):
+        """Counts one transaction (sign=-1 takes it out again). Income is ignored."""
+        cents = round(amount * 100)
+        if cents >= 0:
+            return
+        spend = -cents * sign
+        month = date_str[:7]
+        day = date.fromisoformat(date_str).toordinal()
+        for key in (category, None):
+            self.month_spend[(month, key)] = self.month_spend.get((month, key), 0) + spend
+            self.day_spend[(day, key)] = self.day_spend.get((day, key), 0) + spend
+        self.touched_months.add((month, category))
+        self.touched_days.add((day, category))
+
+    def add_many(self, transactions):
+        for t in transactions:
+            self.add(t['date'], t['category'], t['amount'])
+
+    def remove(self, date_str, category, amount):
+        self.add(date_str, category, amount, sign=-1)
+
+    def month_total(self, month, category=None):
+        return self.month_spend.get((month, category), 0) / 100
+
+    # --- Controleren ---
+    def clear_pending(self):
+        """Forgets what was touched, e.g. after loading rows that were checked before."""
+        self.touched_months, self.touched_days = set(), set()
+
+    def evaluate(self):
+        """Checks every budget affected since the last call; returns warning texts."""
+        months, days = self.touched_months, self.touched_days
+        self.touched_months, self.touched_days = set(), set()
+        if not self.budgets:
+            return []
+
+        messages = []
+        checked = set()
+        for month, category in sorted(months):
+            for key in ((month, None), (month, category), (EVERY_MONTH, None), (EVERY_MONTH, category)):
+                budget_category = key[1]
+                if key not in self.budgets or (month, budget_category) in checked:
+                    continue
+                checked.add((month, budget_category))
+                spend = self.month_total(month, budget_category)
+                if spend > self.budgets[key]:
+                    messages.append(self._message(self.budgets[key], spend, month, budget_category))
+
+        for (period, category), amount in self.budgets.items():
+            if period in WINDOWS:
+                touched = sorted({day for day, c in days if category is None or c == category})
+                worst = self._worst_window(period, category, touched)
+                if worst and worst[1] / 100 > amount:
+                    end, spend = worst
+                    span = (f"{date.fromordinal(end - period + 1).isoformat()} t/m "
+                            f"{date.fromordinal(end).isoformat()}")
+                    messages.append(self._message(amount, spend / 100, span, category))
+        return messages
+
+    def _worst_window(self, length, category, touched):
+        """(last day, spend) of the costliest window that contains a touched day.
+        Consecutive windows are computed with a running sum."""
+        worst = None
+        i = 0
+        while i < len(touched):
+            # Aaneengesloten stuk van vensters dat een aangeraakte dag bevat
+            first = touched[i]
+            last = first + length - 1
+            while i + 1 < len(touched) and touched[i + 1] <= last + 1:
+                i += 1
+                last = touched[i] + length - 1
+            i += 1
+
+            spend = sum(self.day_spend.get((day, category), 0) for day in range(first - length + 1, first + 1))
+            for end in range(first, last + 1):
+                if end > first:
+                    spend += self.day_spend.get((end, category), 0) - self.day_spend.get((end - length, category), 0)
+                if worst is None or spend > worst[1]:
+                    worst = (end, spend)
+        return worst
+
+    @staticmethod
+    def _message(budget, spend, period, category):
+        subject = f"{period}" if category is None else f"{category} in {period}"
+        return (f"Je hebt het budget van €{budget:.2f} voor {subject} overschreden!\n"
+                f"Huidige uitgaven: €{spend:.2f}")
+
+
+def window_label(period):
+    if period == EVERY_MONTH:
+        return "elke maand"
+    if period in WINDOWS:
+        return f"elke {period} dagen"
+    return period
+
+
+def parse_period(text):
+    """'YYYY-MM', 'elke' / '*' (every month) or '7' / '30' (rolling days) -> period."""
+    text = text.strip().lower()
+    if text in ("*", "elke", "elke maand"):
+        return EVERY_MONTH
+    if text.isdigit():
+        if int(text) not in WINDOWS:
+            raise ValueError(f"lopende budgetten zijn er voor {' of '.join(map(str, WINDOWS))} dagen")
+        return int(text)
+    date.fromisoformat(text + "-01")
+    return text
+
@@ -0,0 +1,92 @@
+import json
+import os
+import re
+
+# Standaard trefwoorden per categorie; de volgorde bepaalt de prioriteit
+DEFAULT_RULES = {
+    "Boodschappen": ["boodschappen", "supermarkt", "albert heijn", "jumbo"],
+    "Huisvesting": ["huur", "hypotheek"],
+    "Salaris": ["salaris", "loon"],
+    "Uit eten": ["restaurant", "cafe", "eten buiten de deur"],
+}
+
+
+def valid_rules(rules):
+    """True for {category: [keyword, ...]} with only strings; a single string as
+    keyword list would otherwise be read letter by letter."""
+    return isinstance(rules, dict) and all(
+        isinstance(category, str) and isinstance(keywords, list) and all(isinstance(k, str) for k in keywords)
+        for category, keywords in rules.items())
+
+
+class Categorizer:
+    """All keyword rules compiled into one regex, with a cache per normalized description.
+
+    Rules are {category: [keywords]}; when a description matches several
+    categories, the one listed first wins (same as the old if-chain).
+    """
+
+    MAX_CACHE = 100000
+
+    def __init__(self, rules=None, default="Overig"):
+        self.rules = dict(rules if rules is not None else DEFAULT_RULES)
+        self.default = default
+        self.categories = list(self.rules)
+        self.cache = {}
+
+        alternatives = []
+        for i, keywords in enumerate(self.rules.values()):
+            if keywords:
+                words = "|".join(re.escape(k.lower()) for k in sorted(keywords, key=len, reverse=True))
+                alternatives.append(f"(?P<r{i}>{words})")
+        # Lookahead: matches are zero-width, so every start position is tried and an
+        # overlapping keyword of a higher-priority rule cannot be skipped
+        self.pattern = re.compile("(?=" + "|".join(alternatives) + ")") if alternatives else None
+
+    @classmethod
+    def from_file(cls, filename, default="Overig"):
+        """Loads rules from a JSON file like {"Vervoer": ["ns", "benzine"]}; falls back to
+        the built-in rules when the file does not exist, cannot be read or has another shape."""
+        if not os.path.exists(filename):
+            return cls(default=default)
+        try:
+            with open(filename, "r", encoding="utf-8") as f:
+                rules = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print("Fout bij lezen categorieën, standaard trefwoorden gebruikt:", e)
+            return cls(default=default)
+        if not valid_rules(rules):
+            print("Categorieën moeten {categorie: [trefwoorden]} zijn, standaard trefwoorden gebruikt:", filename)
+            return cls(default=default)
+        return cls(rules, default=default)
+
+    @staticmethod
+    def normalize(description):
+        return " ".join(description.lower().split())
+
+    def categorize(self, description):
+        key = self.normalize(description)
+        category = self.cache.get(key)
+        if category is None:
+            category = self._match(key)
+            if len(self.cache) >= self.MAX_CACHE:
+                self.cache.clear()
+            self.cache[key] = category
+        return category
+
+    def categorize_many(self, descriptions):
+        """Categorizes a whole list in one pass; repeated descriptions hit the cache."""
+        categorize = self.categorize
+        return [categorize(d) for d in descriptions]
+
+    def _match(self, text):
+        if self.pattern is None:
+            return self.default
+        best = None
+        for match in self.pattern.finditer(text):
+            rule = int(match.lastgroup[1:])
+            if best is None or rule < best:
+                best = rule
+                if rule == 0:
+                    break
+        return self.default if best is None else self.categories[best]
@@ -0,0 +1,62 @@
+import queue
+import tkinter as tk
+
+from charts import ChartRenderer
+
+
+class TkChartView(tk.Label):
+    """Shows a CategoryChart rendered off-screen. Redraw requests are coalesced into
+    one per idle cycle; the data callback is only evaluated for the last one.
+    Generates <<ChartShown>> each time a new image is displayed; if the newest
+    drawing fails, an error text is shown instead."""
+
+    POLL_MS = 30
+
+    def __init__(self, master, chart):
+        super().__init__(master)
+        self.results = queue.Queue()
+        self.renderer = ChartRenderer(chart, self._on_ready, self._on_error)
+        self.image = None
+        self.request_args = None
+        self.idle_id = None
+        self.poll_id = None
+        self.latest = 0  # generatie van de laatst ingediende tekening
+
+    def request(self, data_fn, kind="pie"):
+        self.request_args = (data_fn, kind)
+        if self.idle_id is None:
+            self.idle_id = self.after_idle(self._flush)
+
+    def _flush(self):
+        self.idle_id = None
+        data_fn, kind = self.request_args
+        self.latest = self.renderer.submit(data_fn(), kind)
+        if self.poll_id is None:
+            self.poll_id = self.after(self.POLL_MS, self._poll)
+
+    def _on_ready(self, generation, rgba):
+        # Render-thread: alleen omzetten naar PPM, Tk aanraken mag hier niet
+        height, width = rgba.shape[:2]
+        ppm = b"P6 %d %d 255\n" % (width, height) + rgba[:, :, :3].tobytes()
+        self.results.put((generation, ppm, None))
+
+    def _on_error(self, generation, error):
+        self.results.put((generation, None, error))
+
+    def _poll(self):
+        self.poll_id = None
+        result = None
+        while not self.results.empty():
+            result = self.results.get_nowait()
+        if result is not None:
+            generation, ppm, error = result
+            if error is None:
+                self.image = tk.PhotoImage(data=ppm, format="PPM")
+                self.config(image=self.image, text="")
+                self.event_generate("<<ChartShown>>")
+            elif generation == self.latest:
+                self.image = None
+                self.config(image="", text=f"Fout bij tekenen grafiek: {error}")
+            if generation == self.latest:
+                return
+        self.poll_id = self.after(self.POLL_MS, self._poll)
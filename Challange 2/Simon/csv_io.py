@@ -0,0 +1,189 @@
+import csv
+import datetime
+import os
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk
+
+from columnar import EPOCH
+from virtual_list import VirtualTreeview
+
+FIELDNAMES = ["date", "description", "category", "amount"]
+
+
+def stream_csv(filename, chunk_size=10000):
+    """Yields (rows, bytes_read) per chunk of a 'date,description,category,amount'
+    CSV, so only one chunk of rows is ever held in memory."""
+    with open(filename, 'rb') as f:
+        bytes_read = 0
+
+        def lines():
+            nonlocal bytes_read
+            for line in f:
+                bytes_read += len(line)
+                yield line.decode('utf-8-sig')
+
+        reader = csv.DictReader(lines())
+        chunk = []
+        for row in reader:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk, bytes_read
+                chunk = []
+        if chunk:
+            yield chunk, bytes_read
+
+
+def append_csv(filename, transactions):
+    """Appends rows to an export file, writing the header only for a new file."""
+    new_file = not os.path.exists(filename) or os.path.getsize(filename) == 0
+    with open(filename, 'a', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+        if new_file:
+            writer.writeheader()
+        writer.writerows(transactions)
+
+
+class CsvImportWorker(threading.Thread):
+    """Parses a CSV on a background thread. Chunks go into a bounded queue, so the
+    reader waits for the UI instead of loading the whole file ahead of it."""
+
+    def __init__(self, filename, chunk_size=10000, max_pending=4):
+        super().__init__(daemon=True)
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.total_bytes = os.path.getsize(filename)
+        self.batches = queue.Queue(maxsize=max_pending)
+        self.cancelled = threading.Event()
+        self.error = None
+
+    def run(self):
+        try:
+            for chunk, bytes_read in stream_csv(self.filename, self.chunk_size):
+                while not self.cancelled.is_set():
+                    try:
+                        self.batches.put((chunk, bytes_read), timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if self.cancelled.is_set():
+                    return
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            self.error = e
+        finally:
+            self._put_done()
+
+    def _put_done(self):
+        # None betekent: klaar (of geannuleerd)
+        while True:
+            try:
+                self.batches.put(None, timeout=0.1)
+                return
+            except queue.Full:
+                if self.cancelled.is_set():
+                    return
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+class ImportProgressDialog(tk.Toplevel):
+    """Progress bar with a cancel button. Polls the worker from the Tk event loop
+    and hands every chunk to on_batch on the UI thread."""
+
+    POLL_MS = 50
+
+    def __init__(self, master, worker, on_batch, on_done):
+        super().__init__(master)
+        self.title("Importeren")
+        self.resizable(False, False)
+        self.transient(master)
+        self.worker = worker
+        self.on_batch = on_batch
+        self.on_done = on_done
+        self.rows = 0
+
+        self.status_label = ttk.Label(self, text="Bezig met inlezen...")
+        self.status_label.pack(padx=10, pady=(10, 5))
+        self.progress = ttk.Progressbar(self, length=300, maximum=max(worker.total_bytes, 1))
+        self.progress.pack(padx=10, pady=5)
+        ttk.Button(self, text="Annuleren", command=self.cancel).pack(pady=(5, 10))
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+
+        self.worker.start()
+        self._poll_id = self.after(self.POLL_MS, self.poll)
+
+    def poll(self):
+        # Per tick maximaal een paar chunks verwerken, zodat de UI blijft reageren
+        for _ in range(2):
+            try:
+                item = self.worker.batches.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self.finish(cancelled=self.worker.cancelled.is_set())
+                return
+            rows, bytes_read = item
+            self.on_batch(rows)
+            self.rows += len(rows)
+            self.progress['value'] = bytes_read
+            self.status_label.config(text=f"{self.rows} rijen ingelezen...")
+        self._poll_id = self.after(self.POLL_MS, self.poll)
+
+    def cancel(self):
+        self.worker.cancel()
+        self.finish(cancelled=True)
+
+    def finish(self, cancelled):
+        if not self.winfo_exists():
+            return
+        self.after_cancel(self._poll_id)
+        self.destroy()
+        self.on_done(self.rows, cancelled, self.worker.error)
+
+
+class DuplicateReviewDialog(tk.Toplevel):
+    """Lists the rows an import held back as (possible) duplicates, all at once
+    after the import. on_add(records) is called with the rows to add anyway."""
+
+    def __init__(self, master, collisions, on_add):
+        super().__init__(master)
+        self.title("Mogelijke dubbele transacties")
+        self.transient(master)
+        self.collisions = collisions
+        self.on_add = on_add
+        exact = sum(match.kind == "exact" for _, match in collisions)
+
+        ttk.Label(self, text=f"{len(collisions)} rijen lijken al te bestaan en zijn niet toegevoegd "
+                             f"({exact} exact, {len(collisions) - exact} bijna gelijk).").pack(padx=10, pady=(10, 5))
+        columns = ("Datum", "Beschrijving", "Bedrag", "Soort", "Bestaande transactie")
+        self.tree = VirtualTreeview(self, columns=columns, formatter=self.format_row, selectmode="extended")
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=200 if col == "Bestaande transactie" else 120)
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.tree.set_rows(collisions)
+
+        buttons = ttk.Frame(self)
+        buttons.pack(pady=(5, 10))
+        ttk.Button(buttons, text="Geselecteerde toch toevoegen", command=self.add_selected).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Bijna gelijke toch toevoegen",
+                   command=lambda: self.add([c for c in collisions if c[1].kind == "similar"])).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Alles overslaan", command=self.destroy).pack(side=tk.LEFT, padx=5)
+
+    @staticmethod
+    def format_row(collision):
+        record, match = collision
+        existing = datetime.date.fromordinal(match.day + EPOCH).isoformat()
+        return (record['date'], record['description'], f"€{float(record['amount']):.2f}",
+                "exact" if match.kind == "exact" else "lijkt op",
+                f"{existing}  €{match.cents / 100:.2f}  {match.text}")
+
+    def add_selected(self):
+        self.add(self.tree.selected_rows())
+
+    def add(self, collisions):
+        self.destroy()
+        if collisions:
+            self.on_add([record for record, _ in collisions])
@@ -0,0 +1,34 @@
+import queue
+
+
+class TkDispatcher:
+    """Dispatcher for TaskPool (see workers.py). The queue is only polled while
+    tasks are outstanding, so an idle app has no timer running."""
+
+    POLL_MS = 20
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.queue = queue.Queue()
+        self.outstanding = 0
+        self.poll_id = None
+
+    def expect(self):
+        self.outstanding += 1
+        if self.poll_id is None:
+            self.poll_id = self.widget.after(self.POLL_MS, self._poll)
+
+    def post(self, callback):
+        self.queue.put(callback)
+
+    def _poll(self):
+        self.poll_id = None
+        while True:
+            try:
+                callback = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            self.outstanding -= 1
+            callback()
+        if self.outstanding > 0:
+            self.poll_id = self.widget.after(self.POLL_MS, self._poll)
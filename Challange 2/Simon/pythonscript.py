@@ -1,24 +1,73 @@
+import time
+STARTED = time.perf_counter() # Begin van de opstartmeting (--profile)
+
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
 from datetime import datetime
 import csv
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import re
+import os
+import sys
+
+# Gedeelde modules (zoals charts.py) staan in de map erboven
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from aggregates import AggregateIndex, month_range
+from budgets import BudgetMonitor, parse_period, window_label
+from categorize import Categorizer
+from chart_view import TkChartView
+from charts import CategoryChart, TrendChart
+from columnar import TransactionColumns, to_day
+from csv_io import FIELDNAMES, CsvImportWorker, DuplicateReviewDialog, ImportProgressDialog, append_csv
+from dedup import DuplicateIndex
+from dispatch import TkDispatcher
+from history import History
+from rollup import RollupCube, build_cells, cube_input
+from search import LiveSearch, TrigramIndex
+from startup import StartupProfiler
+from storage import SqliteStore
+from transactions import SortedTransactions
+from virtual_list import VirtualTreeview
+from workers import TaskPool
 
 # --- Main Application Class ---
 class FinanceTracker:
-    def __init__(self, root):
+    RESULT_CAP = 50000 # Maximaal aantal rijen in de lijst bij een zoekopdracht
+
+    def __init__(self, root, db_file=None, profiler=None):
         self.root = root
         self.root.title("Persoonlijke Financiën Tracker")
         self.root.geometry("1200x700")
 
-        self.transactions = []
-        self.budget = {} # Format: {"YYYY-MM": amount}
+        self.columns = TransactionColumns(("category", "description")) # Kolommen met numpy-arrays
+        self.transactions = SortedTransactions(self.columns) # Altijd gesorteerd op datum
+        # Trigram-index over de unieke categorieën en beschrijvingen
+        self.search_index = {field: TrigramIndex(self.columns.values[field]) for field in ("category", "description")}
+        self.live_search = LiveSearch(self.root)
+        self.rollup = RollupCube() # Maand x categorie totalen voor de trendgrafieken
+        self.trend_window = None
+        self.budgets = BudgetMonitor("budgetten.json") # Maand-, categorie- en lopende budgetten
+        self.budgets.load()
+        self.index = AggregateIndex() # Lopende totalen per dag en categorie
+        self.unexported = [] # Rijnummers van transacties sinds de laatste export
+        self.history = History() # Ongedaan maken / opnieuw; per stap alleen de rijnummers
+        self.categorizer = Categorizer.from_file("categorieen.json") # Eigen trefwoorden, anders de standaard
+        self.store = SqliteStore(db_file) if db_file else None # Optionele opslag; zonder database alleen in het geheugen
+        self.store_keys = {} # rijnummer -> id in de database, voor de rijen die ongedaan gemaakt kunnen worden
+        # Fingerprints (datum, bedrag, beschrijving) tegen dubbel toevoegen; met database ook bewaard
+        self.duplicates = DuplicateIndex(os.path.splitext(db_file)[0] + ".dedup.json" if db_file else None)
+        self.profiler = profiler or StartupProfiler() # Meet alleen als het met --profile aan staat
+        self.tasks = TaskPool(TkDispatcher(self.root)) # Filteren, aggregeren en exporteren buiten de GUI-thread
 
         # --- UI Layout ---
         self.create_widgets()
+        self.chart_view.bind("<<ChartShown>>", lambda e: self.profiler.finish("eerste grafiek"), add="+")
+        self.profiler.mark("widgets")
+        self.load_transactions()
         self.update_summary_and_list()
+        self.profiler.mark("data laden")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.bind("<Control-z>", lambda e: self.undo())
+        self.root.bind("<Control-y>", lambda e: self.redo())
 
     def create_widgets(self):
         # Main frame
@@ -64,12 +113,27 @@ class FinanceTracker:
         action_frame = ttk.LabelFrame(left_frame, text="Acties")
         action_frame.pack(fill=tk.X, pady=10)
 
-        budget_button = ttk.Button(action_frame, text="Maandbudget Instellen", command=self.set_monthly_budget)
+        budget_button = ttk.Button(action_frame, text="Budget Instellen", command=self.set_budget)
         budget_button.pack(pady=5, fill=tk.X)
 
+        import_button = ttk.Button(action_frame, text="Importeer CSV", command=self.import_csv)
+        import_button.pack(pady=5, fill=tk.X)
+
         export_button = ttk.Button(action_frame, text="Exporteer naar CSV", command=self.export_to_csv)
         export_button.pack(pady=5, fill=tk.X)
 
+        export_new_button = ttk.Button(action_frame, text="Exporteer nieuwe transacties",
+                                       command=lambda: self.export_to_csv(append=True))
+        export_new_button.pack(pady=5, fill=tk.X)
+
+        trend_button = ttk.Button(action_frame, text="Financiële Trends", command=self.show_trends)
+        trend_button.pack(pady=5, fill=tk.X)
+
+        undo_frame = ttk.Frame(action_frame)
+        undo_frame.pack(pady=5, fill=tk.X)
+        ttk.Button(undo_frame, text="Ongedaan maken", command=self.undo).pack(side=tk.LEFT, expand=True, fill=tk.X)
+        ttk.Button(undo_frame, text="Opnieuw", command=self.redo).pack(side=tk.LEFT, expand=True, fill=tk.X)
+
 
         # Right frame for list and graph
         right_frame = ttk.Frame(main_frame)
@@ -82,10 +146,24 @@ class FinanceTracker:
         ttk.Label(filter_frame, text="Filter op Categorie:").pack(side=tk.LEFT, padx=(0, 5))
         self.filter_category_entry = ttk.Entry(filter_frame)
         self.filter_category_entry.pack(side=tk.LEFT, padx=(0, 10))
+        self.filter_category_entry.bind("<KeyRelease>", self.live_filter)
+
+        ttk.Label(filter_frame, text="Zoek in Beschrijving:").pack(side=tk.LEFT, padx=(0, 5))
+        self.filter_desc_entry = ttk.Entry(filter_frame)
+        self.filter_desc_entry.pack(side=tk.LEFT, padx=(0, 10))
+        self.filter_desc_entry.bind("<KeyRelease>", self.live_filter)
 
         ttk.Label(filter_frame, text="Filter op Maand (YYYY-MM):").pack(side=tk.LEFT, padx=(0, 5))
         self.filter_month_entry = ttk.Entry(filter_frame)
         self.filter_month_entry.pack(side=tk.LEFT, padx=(0, 10))
+
+        ttk.Label(filter_frame, text="Bedrag van:").pack(side=tk.LEFT, padx=(0, 5))
+        self.filter_min_entry = ttk.Entry(filter_frame, width=8)
+        self.filter_min_entry.pack(side=tk.LEFT, padx=(0, 5))
+
+        ttk.Label(filter_frame, text="tot:").pack(side=tk.LEFT, padx=(0, 5))
+        self.filter_max_entry = ttk.Entry(filter_frame, width=8)
+        self.filter_max_entry.pack(side=tk.LEFT, padx=(0, 10))
         
         filter_button = ttk.Button(filter_frame, text="Filter", command=self.apply_filters)
         filter_button.pack(side=tk.LEFT)
@@ -94,11 +172,12 @@ class FinanceTracker:
         reset_button.pack(side=tk.LEFT, padx=5)
 
         # --- Transaction List ---
-        list_frame = ttk.LabelFrame(right_frame, text="Transacties")
+        self.list_frame = list_frame = ttk.LabelFrame(right_frame, text="Transacties")
         list_frame.pack(fill=tk.BOTH, expand=True)
 
         columns = ("Datum", "Beschrijving", "Categorie", "Bedrag")
-        self.tree = ttk.Treeview(list_frame, columns=columns, show="headings")
+        # Alleen de zichtbare rijen worden als Tk-items aangemaakt
+        self.tree = VirtualTreeview(list_frame, columns=columns, formatter=self.format_row)
         for col in columns:
             self.tree.heading(col, text=col)
             self.tree.column(col, width=150)
@@ -108,9 +187,10 @@ class FinanceTracker:
         graph_frame = ttk.LabelFrame(right_frame, text="Uitgaven Grafiek")
         graph_frame.pack(fill=tk.X, pady=10)
         
-        self.fig, self.ax = plt.subplots(figsize=(6, 4))
-        self.canvas = FigureCanvasTkAgg(self.fig, master=graph_frame)
-        self.canvas.get_tk_widget().pack()
+        # Grafiek wordt off-screen getekend; hergebruikt de taartpunten waar mogelijk
+        chart = CategoryChart("Uitgaven per Categorie", "Geen uitgaven om te tonen", size=(6, 4), startangle=140)
+        self.chart_view = TkChartView(graph_frame, chart)
+        self.chart_view.pack()
 
     # --- Core Logic ---
     def add_transaction(self):
@@ -125,10 +205,16 @@ class FinanceTracker:
 
         try:
             amount = float(amount_str)
-            datetime.strptime(date_str, "%Y-%m-%d")
+            date_str = datetime.strptime(date_str, "%Y-%m-%d").strftime("%Y-%m-%d")
         except ValueError:
             messagebox.showerror("Fout", "Ongeldige datum (gebruik YYYY-MM-DD) of bedrag.")
             return
+
+        match = self.duplicates.check().find(to_day(date_str), amount, description)
+        if match and not messagebox.askyesno(
+                "Dubbele transactie", f"Deze transactie lijkt al te bestaan:\n\n{match.text}, €{match.cents / 100:.2f}"
+                                      f"{'' if match.kind == 'exact' else ' (bijna gelijk)'}\n\nToch toevoegen?"):
+            return
             
         # Automatische categorisatie
         if not category:
@@ -140,51 +226,126 @@ class FinanceTracker:
             "category": category,
             "amount": amount
         }
-        self.transactions.append(transaction)
-        
-        # Sorteer transacties op datum
-        self.transactions.sort(key=lambda x: x['date'])
-
-        self.check_budget(date_str)
+        # Gesorteerd invoegen op datum
+        row = self.transactions.add(transaction)
+        if self.store is not None:
+            self.store_keys[row] = self.store.append(transaction)
+        self.index.add(date_str, category, amount)
+        self.budgets.add(date_str, category, amount)
+        self.rollup.add(self.columns.days[row], category, amount)
+        self.duplicates.add(self.columns.days[row], amount, description)
+        self.sync_search_index()
+        self.unexported.append(row)
+        self.push_added("transactie toevoegen", [range(row, row + 1)])
+
+        self.check_budget()
         self.update_summary_and_list()
         self.clear_entries()
 
-    def update_summary_and_list(self, filtered_transactions=None):
+    def add_transactions(self, transactions, refresh=True, check=None):
+        """Adds many transactions at once with one merge, one budget check and one refresh.
+        With refresh=False the caller does the budget check, the refresh and the
+        undo step itself. With a DuplicateCheck, rows that already exist are not
+        added but collected in check.collisions.
+        Returns the rows that could not be parsed."""
+        valid, rejected, uncategorized = [], [], []
+        for t in transactions:
+            try:
+                amount = float(t['amount'])
+                date_str = datetime.strptime(t['date'], "%Y-%m-%d").strftime("%Y-%m-%d")
+            except (KeyError, TypeError, ValueError):
+                rejected.append(t)
+                continue
+            transaction = {
+                "date": date_str,
+                "description": t.get('description') or '',
+                "category": t.get('category'),
+                "amount": amount
+            }
+            if check is not None:
+                # Eén dict-lookup per rij (plus een paar buren voor bijna-duplicaten)
+                match = check.find(to_day(date_str), amount, transaction['description'])
+                if match:
+                    check.collisions.append((transaction, match))
+                    continue
+            if not transaction['category']:
+                uncategorized.append(transaction)
+            valid.append(transaction)
+
+        # Automatische categorisatie in één keer voor de hele batch
+        categories = self.categorizer.categorize_many(t['description'] for t in uncategorized)
+        for transaction, category in zip(uncategorized, categories):
+            transaction['category'] = category
+
+        if valid:
+            rows = self.transactions.update(valid)
+            if self.store is not None:
+                self.store_keys.update(zip(rows, self.store.extend(valid))) # Eén databasetransactie per batch
+            self.index.add_many(valid)
+            self.budgets.add_many(valid) # Alleen tellen; controleren gebeurt in check_budget
+            self.rollup.invalidate() # Wordt pas opnieuw opgebouwd als de trends nodig zijn
+            (check or self.duplicates).add_rows(self.columns, rows)
+            self.sync_search_index()
+            self.unexported.extend(rows)
+            if refresh:
+                self.push_added("transacties toevoegen", [rows])
+                self.check_budget()
+                self.update_summary_and_list()
+        return rejected
+
+    def load_transactions(self):
+        if self.store is None:
+            return
+        # Rijen uit de database zijn al gecontroleerd en gecategoriseerd. De database
+        # is hier alleen opslag: budgetten, zoeken, duplicaten en ongedaan maken
+        # werken op de kolommen, dus alles wordt bij het starten ingelezen.
+        records = self.store.load()
+        self.transactions.update(records)
+        self.index.add_many(records)
+        self.budgets.add_many(records)
+        self.budgets.clear_pending() # Geen waarschuwingen voor wat al opgeslagen was
+        self.rollup.invalidate()
+        self.duplicates.load(len(self.columns)) # Bewaarde index, of opnieuw opbouwen als hij niet past
+        self.duplicates.ensure(self.columns)
+        self.sync_search_index()
+
+    def on_close(self):
+        self.tasks.shutdown()
+        if self.store is not None:
+            self.store.compact()
+            self.store.close()
+        self.duplicates.save()
+        self.root.destroy()
+
+    def update_summary_and_list(self, filtered_transactions=None, start=None, end=None, categories=None, mask=None,
+                                columns=None):
         transactions_to_show = filtered_transactions if filtered_transactions is not None else self.transactions
 
-        income = sum(t['amount'] for t in transactions_to_show if t['amount'] > 0)
-        expenses = sum(t['amount'] for t in transactions_to_show if t['amount'] < 0)
+        # Totalen komen uit de index; met een bedragfilter uit de kolommen (mask)
+        if mask is not None:
+            columns = columns or self.columns # de momentopname waarop de mask berekend is
+            income, expenses = columns.totals(mask)
+            graph_data = lambda: columns.sum_by("category", mask, sign=-1)
+        else:
+            income, expenses = self.index.totals(start, end, categories)
+            graph_data = lambda: self.index.expenses_by_category(start, end, categories)
         balance = income + expenses
 
         summary_text = f"Inkomsten: €{income:.2f}\nUitgaven: €{abs(expenses):.2f}\n\nSaldo: €{balance:.2f}"
         self.summary_label.config(text=summary_text)
 
-        self.tree.delete(*self.tree.get_children())
-        for t in transactions_to_show:
-            amount_formatted = f"€{t['amount']:.2f}"
-            self.tree.insert("", "end", values=(t['date'], t['description'], t['category'], amount_formatted))
+        self.tree.set_rows(transactions_to_show)
+        self.list_frame.config(text="Transacties")
 
-        self.update_graph(transactions_to_show)
+        self.update_graph(graph_data)
+        self.update_trends()
 
-    def update_graph(self, transactions):
-        self.ax.clear()
-        
-        expense_categories = {}
-        for t in transactions:
-            if t['amount'] < 0:
-                category = t['category']
-                amount = abs(t['amount'])
-                expense_categories[category] = expense_categories.get(category, 0) + amount
-
-        if expense_categories:
-            labels = expense_categories.keys()
-            sizes = expense_categories.values()
-            self.ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=140)
-            self.ax.set_title("Uitgaven per Categorie")
-        else:
-            self.ax.text(0.5, 0.5, "Geen uitgaven om te tonen", ha='center', va='center')
-        
-        self.canvas.draw()
+    def format_row(self, t):
+        return (t['date'], t['description'], t['category'], f"€{t['amount']:.2f}")
+
+    def update_graph(self, data_fn):
+        # Meerdere aanvragen vlak na elkaar worden samengevoegd tot één tekening
+        self.chart_view.request(data_fn, kind="pie")
 
     def clear_entries(self):
         self.date_entry.delete(0, tk.END)
@@ -193,83 +354,328 @@ class FinanceTracker:
         self.category_entry.delete(0, tk.END)
         self.amount_entry.delete(0, tk.END)
 
-    def apply_filters(self):
-        category_filter = self.filter_category_entry.get().lower()
+    def sync_search_index(self):
+        # Alleen nieuwe unieke teksten worden toegevoegd
+        for index in self.search_index.values():
+            index.sync()
+
+    def live_filter(self, event=None):
+        """Search-as-you-type: restarts the search after a short pause in typing."""
+        self.apply_filters(live=True)
+
+    def apply_filters(self, live=False):
+        category_filter = self.filter_category_entry.get().strip()
+        desc_filter = self.filter_desc_entry.get().strip()
         month_filter = self.filter_month_entry.get()
+        min_filter = self.filter_min_entry.get()
+        max_filter = self.filter_max_entry.get()
 
-        filtered = self.transactions
-        
-        if category_filter:
-            filtered = [t for t in filtered if category_filter in t['category'].lower()]
+        start = end = min_amount = max_amount = None
         
         if month_filter:
             try:
                 datetime.strptime(month_filter, "%Y-%m")
-                filtered = [t for t in filtered if t['date'].startswith(month_filter)]
+                start, end = month_range(month_filter)
             except ValueError:
-                messagebox.showerror("Fout", "Ongeldige maand-format (gebruik YYYY-MM).")
+                if not live:
+                    messagebox.showerror("Fout", "Ongeldige maand-format (gebruik YYYY-MM).")
                 return
 
-        self.update_summary_and_list(filtered)
+        try:
+            min_amount = float(min_filter) if min_filter else None
+            max_amount = float(max_filter) if max_filter else None
+        except ValueError:
+            if not live:
+                messagebox.showerror("Fout", "Ongeldig bedrag in het bedragfilter.")
+            return
+
+        # Zoeken in de trigram-index; een nieuwe toetsaanslag annuleert de vorige zoekopdracht
+        searches = {}
+        if category_filter:
+            searches["category"] = self.search_index["category"].iter_matches(category_filter)
+        if desc_filter:
+            searches["description"] = self.search_index["description"].iter_matches(desc_filter)
+
+        def on_done(matches):
+            self.show_filtered(matches, start, end, min_amount, max_amount)
+
+        self.live_search.start(searches, on_done, delay_ms=None if live else 0)
+
+    def show_filtered(self, matches, start, end, min_amount, max_amount):
+        categories = None
+        if "category" in matches:
+            values = self.columns.values["category"]
+            categories = {values[code] for code in matches["category"]}
+
+        # Alle filters als één gevectoriseerde mask, op een worker-thread over een
+        # vaste momentopname van de kolommen; een nieuwere filteropdracht vervangt deze
+        columns = self.columns.frozen()
+
+        def compute():
+            mask = columns.mask(start, end, categories, min_amount, max_amount)
+            if "description" in matches:
+                mask &= columns.codes_mask("description", matches["description"])
+            return mask, columns.filtered_rows(mask)
+
+        def on_done(result):
+            mask, filtered = result
+            total = len(filtered)
+            if total > self.RESULT_CAP:
+                filtered = columns.rows(filtered.positions[:self.RESULT_CAP])
+
+            if min_amount is None and max_amount is None and "description" not in matches:
+                self.update_summary_and_list(filtered, start, end, categories)
+            else:
+                self.update_summary_and_list(filtered, mask=mask, columns=columns)
+
+            if total > self.RESULT_CAP:
+                self.list_frame.config(text=f"Transacties ({total} resultaten, eerste {self.RESULT_CAP} getoond)")
+            else:
+                self.list_frame.config(text=f"Transacties ({total} resultaten)")
+
+        self.tasks.submit(compute, on_done=on_done, key="filter")
 
     def reset_filters(self):
+        self.live_search.cancel()
+        self.tasks.cancel("filter")
         self.filter_category_entry.delete(0, tk.END)
+        self.filter_desc_entry.delete(0, tk.END)
         self.filter_month_entry.delete(0, tk.END)
+        self.filter_min_entry.delete(0, tk.END)
+        self.filter_max_entry.delete(0, tk.END)
+        self.update_summary_and_list()
+
+    # --- Trends ---
+    def show_trends(self):
+        if self.trend_window is not None and self.trend_window.winfo_exists():
+            self.trend_window.lift()
+            return
+
+        self.trend_window = tk.Toplevel(self.root)
+        self.trend_window.title("Financiële Trends")
+
+        self.trend_kind = ttk.Combobox(self.trend_window, state="readonly",
+                                       values=["Uitgaven per maand", "Lopend saldo"])
+        self.trend_kind.current(0)
+        self.trend_kind.pack(pady=5)
+        self.trend_kind.bind("<<ComboboxSelected>>", lambda e: self.update_trends())
+
+        chart = TrendChart({"stacked": "Uitgaven per maand per categorie", "balance": "Lopend saldo"},
+                           "Nog geen transacties", size=(8, 4), tight_layout=True)
+        self.trend_view = TkChartView(self.trend_window, chart)
+        self.trend_view.pack(padx=10, pady=(0, 10))
+        self.update_trends()
+
+    def update_trends(self):
+        if self.trend_window is None or not self.trend_window.winfo_exists():
+            return
+        if self.rollup.dirty:
+            # Opnieuw opbouwen in een apart proces; daarna wordt de grafiek aangevraagd
+            rows = len(self.columns)
+            self.tasks.submit(build_cells, *cube_input(self.columns), cpu=True, key="rollup",
+                              on_done=lambda cells: self.rollup_built(cells, rows))
+            return
+        # De kubus is klein (maanden x categorieën), hoe groot de historie ook is
+        if self.trend_kind.current() == 0:
+            self.trend_view.request(lambda: self.rollup.monthly(sign=-1), kind="stacked")
+        else:
+            self.trend_view.request(self.rollup.running_balance, kind="balance")
+
+    def rollup_built(self, cells, rows):
+        # Zijn er intussen rijen bijgekomen, dan klopt de kubus al niet meer
+        if rows == len(self.columns):
+            self.rollup.replace(cells, rows)
+        self.update_trends()
+
+    # --- Ongedaan maken ---
+    def push_added(self, label, ranges):
+        """Puts an add on the undo stack. ranges hold the new row numbers, so a
+        step costs the same for one row as for a whole import."""
+        dropped = [] # rijen die het ongedaan maken uit self.unexported haalde
+
+        def undo():
+            dropped[:] = self.remove_rows(ranges)
+
+        self.history.push(label, undo, lambda: self.restore_rows(ranges, dropped))
+
+    def undo(self):
+        self.cancel_pending_results()
+        self.history.undo()
+
+    def redo(self):
+        self.cancel_pending_results()
+        self.history.redo()
+
+    def cancel_pending_results(self):
+        # Een zoekopdracht, filter of kubus die nog loopt, rekent met de rijen van vóór de stap
+        self.live_search.cancel()
+        self.tasks.cancel("filter")
+        self.tasks.cancel("rollup")
+
+    def remove_rows(self, ranges):
+        """Takes added rows out again; returns the ones that were dropped from the
+        rows still to export."""
+        rows = [row for rows in ranges for row in rows]
+        records = list(self.columns.rows(rows))
+        self.transactions.remove_rows(rows)
+        for t in records:
+            self.index.remove(t['date'], t['category'], t['amount'])
+            self.budgets.remove(t['date'], t['category'], t['amount'])
+        self.budgets.clear_pending()
+        self.duplicates.remove_rows(self.columns, rows)
+        if len(rows) == 1:
+            self.rollup.remove(self.columns.days[rows[0]], records[0]['category'], records[0]['amount'])
+        else:
+            self.rollup.invalidate()
+        if self.store is not None:
+            # Op id, niet de nieuwste: tijdens een import kan er ook met de hand toegevoegd zijn
+            self.store.delete([self.store_keys.pop(row) for row in rows])
+
+        # Niet alleen achteraan: tijdens een import kan er met de hand iets bijgekomen zijn
+        deleted = self.columns.deleted[self.unexported].tolist() if self.unexported else []
+        dropped = [row for row, gone in zip(self.unexported, deleted) if gone]
+        if dropped:
+            self.unexported = [row for row, gone in zip(self.unexported, deleted) if not gone]
+        self.update_summary_and_list()
+        return dropped
+
+    def restore_rows(self, ranges, unexported):
+        rows = [row for rows in ranges for row in rows]
+        self.transactions.restore_rows(rows)
+        records = list(self.columns.rows(rows))
+        self.index.add_many(records)
+        self.budgets.add_many(records)
+        self.duplicates.add_rows(self.columns, rows, new_row=False)
+        if len(rows) == 1:
+            self.rollup.add(self.columns.days[rows[0]], records[0]['category'], records[0]['amount'], new_row=False)
+        else:
+            self.rollup.invalidate()
+        if self.store is not None:
+            self.store_keys.update(zip(rows, self.store.extend(records)))
+        if unexported:
+            # Rijnummers zijn de volgorde van toevoegen, en die houdt de export aan
+            self.unexported = sorted(self.unexported + unexported)
+        self.check_budget()
         self.update_summary_and_list()
 
     # --- Bonus Features ---
-    def set_monthly_budget(self):
-        month = simpledialog.askstring("Budget", "Voer de maand in (YYYY-MM):")
-        if not month: return
+    def set_budget(self):
+        text = simpledialog.askstring("Budget", "Voer de periode in: een maand (YYYY-MM), 'elke' voor elke maand,\n"
+                                                "of 7 / 30 voor een lopend budget over zoveel dagen:")
+        if not text: return
         try:
-            datetime.strptime(month, "%Y-%m")
+            period = parse_period(text)
         except ValueError:
-            messagebox.showerror("Fout", "Ongeldige maand-format (gebruik YYYY-MM).")
+            messagebox.showerror("Fout", "Ongeldige periode (gebruik YYYY-MM, 'elke', 7 of 30).")
             return
 
-        amount = simpledialog.askfloat("Budget", f"Voer het budget in voor {month}:")
-        if amount is not None:
-            self.budget[month] = amount
-            messagebox.showinfo("Succes", f"Budget voor {month} ingesteld op €{amount:.2f}")
+        category = simpledialog.askstring("Budget", "Categorie (leeg laten voor alle uitgaven):")
+        if category is None: return
+        category = category.strip() or None
+        label = window_label(period) + (f" ({category})" if category else "")
 
-    def check_budget(self, date_str):
-        month = date_str[:7]
-        if month in self.budget:
-            monthly_expenses = sum(abs(t['amount']) for t in self.transactions if t['date'].startswith(month) and t['amount'] < 0)
-            if monthly_expenses > self.budget[month]:
-                messagebox.showwarning("Budget Waarschuwing", f"Je hebt het budget van €{self.budget[month]:.2f} voor {month} overschreden!\n"
-                                                           f"Huidige uitgaven: €{monthly_expenses:.2f}")
+        amount = simpledialog.askfloat("Budget", f"Voer het budget in voor {label} (0 = verwijderen):", minvalue=0)
+        if amount is None: return
+        if amount == 0:
+            self.budgets.remove_budget(period, category)
+            messagebox.showinfo("Succes", f"Budget voor {label} verwijderd")
+            return
+        self.budgets.set_budget(period, category, amount)
+        messagebox.showinfo("Succes", f"Budget voor {label} ingesteld op €{amount:.2f}")
+
+    def check_budget(self):
+        """Checks the budgets for everything added since the last check, in one pass."""
+        exceeded = self.budgets.evaluate()
+        if exceeded:
+            messagebox.showwarning("Budget Waarschuwing", "\n\n".join(exceeded))
 
     def auto_categorize(self, description):
-        description = description.lower()
-        if re.search(r'boodschappen|supermarkt|albert heijn|jumbo', description):
-            return "Boodschappen"
-        if re.search(r'huur|hypotheek', description):
-            return "Huisvesting"
-        if re.search(r'salaris|loon', description):
-            return "Salaris"
-        if re.search(r'restaurant|cafe|eten buiten de deur', description):
-            return "Uit eten"
-        return "Overig" # Default category
-
-    def export_to_csv(self):
-        if not self.transactions:
+        return self.categorizer.categorize(description)
+
+    def import_csv(self):
+        filename = filedialog.askopenfilename(filetypes=[("CSV-bestanden", "*.csv"), ("Alle bestanden", "*.*")])
+        if not filename:
+            return
+
+        rejected = 0
+        added = [] # rijnummers per batch; samen één stap om ongedaan te maken
+        check = self.duplicates.check() # overlappende exports: bestaande rijen worden vastgehouden
+
+        def on_batch(rows):
+            nonlocal rejected
+            start = len(self.columns)
+            rejected += len(self.add_transactions(rows, refresh=False, check=check))
+            added.append(range(start, len(self.columns)))
+
+        def on_done(rows, cancelled, error):
+            # Eén budgetcheck, één refresh en één undo-stap voor de hele import
+            if any(added):
+                self.push_added("CSV importeren", added)
+            self.check_budget()
+            self.update_summary_and_list()
+            if error:
+                messagebox.showerror("Fout", f"Kon het bestand niet inlezen: {error}")
+            elif cancelled:
+                messagebox.showinfo("Import", f"Import geannuleerd na {rows} rijen.")
+            elif rejected:
+                messagebox.showwarning("Import", f"{rows - rejected - len(check.collisions)} rijen geïmporteerd, "
+                                                 f"{rejected} ongeldige rijen overgeslagen.")
+            if check.collisions:
+                # Alle botsingen in één keer ter controle; wat toch gewenst is wordt een eigen stap
+                DuplicateReviewDialog(self.root, check.collisions, self.add_transactions)
+
+        try:
+            worker = CsvImportWorker(filename)
+        except OSError as e:
+            messagebox.showerror("Fout", f"Kon het bestand niet openen: {e}")
+            return
+        ImportProgressDialog(self.root, worker, on_batch, on_done)
+
+    def export_to_csv(self, append=False):
+        """Exports all transactions, or with append=True only the ones added since the
+        last export, appended to the existing file (in the order they were added)."""
+        columns = self.columns.frozen() # Het schrijven gebeurt op een worker-thread
+        if append:
+            rows = columns.rows(list(self.unexported))
+        else:
+            rows = columns.filtered_rows(~columns.deleted) # zelfde volgorde als de lijst: op datum
+        if not rows:
             messagebox.showinfo("Info", "Geen transacties om te exporteren.")
             return
             
         filename = f"transacties_{datetime.now().strftime('%Y%m%d')}.csv"
-        try:
-            with open(filename, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.DictWriter(file, fieldnames=["date", "description", "category", "amount"])
-                writer.writeheader()
-                writer.writerows(self.transactions)
-            messagebox.showinfo("Succes", f"Data succesvol geëxporteerd naar {filename}")
-        except IOError as e:
+
+        def write():
+            if append:
+                append_csv(filename, rows)
+            else:
+                with open(filename, 'w', newline='', encoding='utf-8') as file:
+                    writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+                    writer.writeheader()
+                    writer.writerows(rows)
+            return len(rows)
+
+        def on_done(count):
+            # Wat tijdens het schrijven is toegevoegd, staat nog niet in het bestand
+            if append:
+                written = set(rows.positions)
+                self.unexported = [row for row in self.unexported if row not in written]
+            else:
+                self.unexported = [row for row in self.unexported if row >= len(columns)]
+            messagebox.showinfo("Succes", f"{count} transacties succesvol geëxporteerd naar {filename}")
+
+        def on_error(e):
             messagebox.showerror("Fout", f"Kon het bestand niet schrijven: {e}")
 
+        self.tasks.submit(write, on_done=on_done, on_error=on_error)
+
 
 # --- Run the application ---
 if __name__ == "__main__":
+    profiler = StartupProfiler(STARTED, enabled="--profile" in sys.argv) # --profile: opstarttijden per fase
+    profiler.mark("imports")
     root = tk.Tk()
-    app = FinanceTracker(root)
+    # --sqlite: transacties bewaren in transacties.db
+    app = FinanceTracker(root, "transacties.db" if "--sqlite" in sys.argv else None, profiler)
+    root.after_idle(profiler.mark, "eerste weergave")
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,92 @@
+import time
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """Inverted index from trigrams to the codes of distinct texts in one column.
+
+    It indexes the column's dictionary (each distinct category or description
+    once), not the rows; rows are found afterwards with a code mask.
+    """
+
+    def __init__(self, values):
+        self.values = values  # de woordenlijst van de kolom (wordt alleen aangevuld)
+        self.lowered = []
+        self.postings = {}    # trigram -> set met codes
+
+    def sync(self):
+        """Indexes the texts that were added since the last call."""
+        for code in range(len(self.lowered), len(self.values)):
+            text = self.values[code].lower()
+            self.lowered.append(text)
+            for gram in trigrams(text):
+                self.postings.setdefault(gram, set()).add(code)
+
+    def candidates(self, query):
+        grams = trigrams(query)
+        if not grams:
+            return range(len(self.lowered))  # te kort voor trigrammen: alles controleren
+        sets = sorted((self.postings.get(g, set()) for g in grams), key=len)
+        result = set(sets[0])
+        for s in sets[1:]:
+            result &= s
+            if not result:
+                break
+        return sorted(result)
+
+    def iter_matches(self, query, batch=5000):
+        """Yields lists of matching codes in batches, so a slow query can be interrupted."""
+        self.sync()
+        query = query.lower()
+        candidates = self.candidates(query)
+        lowered = self.lowered
+        for i in range(0, len(candidates), batch):
+            yield [c for c in candidates[i:i + batch] if query in lowered[c]]
+
+
+class LiveSearch:
+    """Runs search generators in small time slices on the Tk event loop.
+
+    start() cancels any search that is still running, waits delay_ms (so typing
+    fast only searches once) and calls on_done with {name: [codes]} at the end.
+    """
+
+    def __init__(self, widget, delay_ms=150, budget_ms=15):
+        self.widget = widget
+        self.delay_ms = delay_ms
+        self.budget_ms = budget_ms
+        self.job = None
+        self.generators = {}
+        self.results = {}
+        self.on_done = None
+
+    def cancel(self):
+        if self.job is not None:
+            self.widget.after_cancel(self.job)
+            self.job = None
+        self.generators = {}
+
+    def start(self, generators, on_done, delay_ms=None):
+        self.cancel()
+        self.generators = dict(generators)
+        self.results = {name: [] for name in self.generators}
+        self.on_done = on_done
+        self.job = self.widget.after(self.delay_ms if delay_ms is None else delay_ms, self._step)
+
+    def _step(self):
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        while self.generators and time.perf_counter() < deadline:
+            name, gen = next(iter(self.generators.items()))
+            try:
+                self.results[name].extend(next(gen))
+            except StopIteration:
+                del self.generators[name]
+
+        if self.generators:
+            self.job = self.widget.after(1, self._step)  # rest in de volgende ronde
+        else:
+            self.job = None
+            self.on_done(self.results)
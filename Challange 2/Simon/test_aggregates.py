@@ -0,0 +1,72 @@
+import datetime
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from aggregates import AggregateIndex, FenwickTree
+
+CATEGORIES = ["Boodschappen", "Huisvesting", "Salaris", "Uit eten"]
+
+
+def random_transactions(count, seed=1):
+    rng = random.Random(seed)
+    first = datetime.date(2023, 1, 1).toordinal()
+    return [{"date": datetime.date.fromordinal(first + rng.randrange(900)).isoformat(),
+             "amount": round(rng.uniform(-200, 200), 2),
+             "category": rng.choice(CATEGORIES),
+             "description": f"omschrijving {rng.randrange(50)}"}
+            for _ in range(count)]
+
+
+class FenwickTreeTest(unittest.TestCase):
+
+    def test_range_sums_while_growing_both_ways(self):
+        tree, days = FenwickTree(), {}
+        rng = random.Random(2)
+        for _ in range(500):
+            ordinal, amount = 738000 + rng.randrange(-400, 400), rng.randrange(-50, 50)
+            tree.add(ordinal, amount)
+            days[ordinal] = days.get(ordinal, 0) + amount
+        for start, end in [(None, None), (737700, 738100), (738050, None), (None, 737500), (739000, 739100)]:
+            expected = sum(v for d, v in days.items()
+                           if (start is None or d >= start) and (end is None or d <= end))
+            self.assertEqual(tree.range_sum(start, end), expected)
+
+
+class AggregateIndexTest(unittest.TestCase):
+
+    def test_incremental_equals_rebuild(self):
+        transactions = random_transactions(400)
+        removed = transactions[::7]
+
+        incremental = AggregateIndex()
+        for t in transactions:
+            incremental.add(t["date"], t["category"], t["amount"])
+        for t in removed:
+            incremental.remove(t["date"], t["category"], t["amount"])
+
+        kept = [t for i, t in enumerate(transactions) if i % 7]
+        rebuilt = AggregateIndex()
+        rebuilt.add_many(kept)
+
+        for start, end in [(None, None), ("2023-03-01", "2023-03-31"), ("2024-01-01", None)]:
+            for categories in [None, {"Salaris"}, {"Boodschappen", "Uit eten"}]:
+                for a, b in zip(incremental.totals(start, end, categories), rebuilt.totals(start, end, categories)):
+                    self.assertAlmostEqual(a, b, places=6)
+            self.assertEqual(incremental.expenses_by_category(start, end), rebuilt.expenses_by_category(start, end))
+
+    def test_totals_match_a_scan(self):
+        transactions = random_transactions(200, seed=3)
+        index = AggregateIndex()
+        index.add_many(transactions)
+        in_march = [t["amount"] for t in transactions if t["date"].startswith("2024-03")]
+        income, expenses = index.totals(datetime.date(2024, 3, 1), datetime.date(2024, 3, 31))
+        self.assertAlmostEqual(income, sum(a for a in in_march if a > 0), places=6)
+        self.assertAlmostEqual(expenses, sum(a for a in in_march if a < 0), places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
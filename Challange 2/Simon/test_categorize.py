@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from categorize import Categorizer
+
+
+class CategorizerTest(unittest.TestCase):
+
+    def test_first_rule_wins(self):
+        categorizer = Categorizer()
+        self.assertEqual(categorizer.categorize("Restaurant naast de supermarkt"), "Boodschappen")
+        self.assertEqual(categorizer.categorize("Loon juni, huur eraf"), "Huisvesting")
+
+    def test_overlapping_keyword_of_earlier_rule(self):
+        # "cafe" (regel B) begint eerder in de tekst, maar "afe" (regel A) overlapt ermee
+        categorizer = Categorizer({"A": ["afe"], "B": ["cafe"]})
+        self.assertEqual(categorizer.categorize("cafeest"), "A")
+        self.assertEqual(Categorizer({"A": ["cafe"], "B": ["afe"]}).categorize("cafeest"), "A")
+
+    def test_default_and_normalization(self):
+        categorizer = Categorizer()
+        self.assertEqual(categorizer.categorize("Tandarts"), "Overig")
+        self.assertEqual(categorizer.categorize("  ALBERT   Heijn 1234 "), "Boodschappen")
+        self.assertEqual(Categorizer({}).categorize("huur"), "Overig")
+        self.assertEqual(Categorizer({"Leeg": []}, default="?").categorize("huur"), "?")
+
+    def test_categorize_many_matches_single(self):
+        categorizer = Categorizer()
+        descriptions = ["Jumbo", "Salaris mei", "cafe de Zwaan", "onbekend", "Jumbo"]
+        self.assertEqual(categorizer.categorize_many(descriptions),
+                         [Categorizer().categorize(d) for d in descriptions])
+
+    def test_from_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "categorieen.json")
+            self.assertEqual(Categorizer.from_file(filename).rules, Categorizer().rules)
+
+            with open(filename, "w", encoding="utf-8") as f:
+                f.write('{"Vervoer": ["ns", "benzine"]}')
+            self.assertEqual(Categorizer.from_file(filename).categorize("NS reis"), "Vervoer")
+
+            with open(filename, "w", encoding="utf-8") as f:
+                f.write('{"Vervoer": ["ns", ')
+            self.assertEqual(Categorizer.from_file(filename).rules, Categorizer().rules)
+
+    def test_from_file_with_other_shape(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "categorieen.json")
+            for content in ['{"Vervoer": "ns"}', '["ns", "benzine"]', '42', '{"Vervoer": ["ns", 3]}', 'null']:
+                with open(filename, "w", encoding="utf-8") as f:
+                    f.write(content)
+                with self.subTest(content=content):
+                    categorizer = Categorizer.from_file(filename)
+                    self.assertEqual(categorizer.rules, Categorizer().rules)
+                    self.assertEqual(categorizer.categorize("Tandarts"), "Overig")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from history import History
+
+
+class HistoryTest(unittest.TestCase):
+
+    def test_undo_and_redo_in_order(self):
+        history, log = History(), []
+        for name in "ab":
+            history.push(name, lambda n=name: log.append("undo " + n), lambda n=name: log.append("redo " + n))
+        self.assertEqual(history.undo(), "b")
+        self.assertEqual(history.undo(), "a")
+        self.assertIsNone(history.undo())
+        self.assertEqual(history.redo(), "a")
+        self.assertEqual(log, ["undo b", "undo a", "redo a"])
+        self.assertTrue(history.can_redo())
+
+    def test_new_step_clears_redo(self):
+        history = History()
+        history.push("a", lambda: None, lambda: None)
+        history.undo()
+        history.push("b", lambda: None, lambda: None)
+        self.assertFalse(history.can_redo())
+        self.assertIsNone(history.redo())
+
+    def test_limit_drops_oldest(self):
+        history = History(limit=2)
+        for name in "abc":
+            history.push(name, lambda: None, lambda: None)
+        self.assertEqual([history.undo(), history.undo(), history.undo()], ["c", "b", None])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from columnar import TransactionColumns, to_day
+from rollup import RollupCube
+from test_aggregates import random_transactions
+
+
+def columns_of(transactions):
+    columns = TransactionColumns()
+    columns.extend([to_day(t["date"]) for t in transactions], [t["amount"] for t in transactions],
+                   category=[t["category"] for t in transactions],
+                   description=[t["description"] for t in transactions])
+    return columns
+
+
+class RollupCubeTest(unittest.TestCase):
+
+    def assertSameCube(self, cube, rebuilt):
+        self.assertEqual(cube.rows, rebuilt.rows)
+        self.assertEqual(cube.monthly(), rebuilt.monthly())
+        self.assertEqual(cube.monthly(sign=1), rebuilt.monthly(sign=1))
+        self.assertEqual(cube.running_balance(), rebuilt.running_balance())
+        self.assertEqual({k: v for k, v in cube.cells.items() if v != [0, 0]}, rebuilt.cells)
+
+    def test_incremental_equals_rebuild(self):
+        transactions = random_transactions(300)
+        columns = TransactionColumns()
+        cube = RollupCube()
+        for t in transactions:
+            row = columns.append(to_day(t["date"]), t["amount"], category=t["category"], description=t["description"])
+            cube.add(columns.days[row], t["category"], t["amount"])
+        rebuilt = RollupCube()
+        rebuilt.rebuild(columns)
+        self.assertSameCube(cube, rebuilt)
+
+    def test_undo_and_redo_equal_rebuild(self):
+        transactions = random_transactions(300)
+        columns = columns_of(transactions)
+        cube = RollupCube()
+        cube.rebuild(columns)
+        for row in range(0, 300, 5):
+            columns.delete(row)
+            cube.remove(columns.days[row], transactions[row]["category"], transactions[row]["amount"])
+        for row in range(0, 300, 10):
+            columns.undelete(row)
+            cube.add(columns.days[row], transactions[row]["category"], transactions[row]["amount"], new_row=False)
+        rebuilt = RollupCube()
+        rebuilt.rebuild(columns)
+        self.assertSameCube(cube, rebuilt)
+
+    def test_running_balance(self):
+        cube = RollupCube()
+        cube.rebuild(columns_of([
+            {"date": "2024-01-15", "amount": 100, "category": "Salaris", "description": ""},
+            {"date": "2024-03-02", "amount": -30.5, "category": "Uit eten", "description": ""},
+        ]))
+        self.assertEqual(cube.running_balance(), (["2024-01", "2024-02", "2024-03"], [100.0, 100.0, 69.5]))
+        self.assertEqual(cube.monthly(), (["2024-01", "2024-02", "2024-03"], {"Uit eten": [0.0, 0.0, 30.5]}))
+
+    def test_saved_cube_only_used_for_same_rows(self):
+        columns = columns_of(random_transactions(50))
+        with tempfile.TemporaryDirectory() as tmp:
+            cube = RollupCube(os.path.join(tmp, "rollup.json"))
+            cube.rebuild(columns)
+            cube.save()
+
+            loaded = RollupCube(cube.filename)
+            loaded.load(len(columns))
+            self.assertFalse(loaded.dirty)
+            self.assertEqual(loaded.cells, cube.cells)
+
+            loaded.load(len(columns) + 1)
+            self.assertTrue(loaded.dirty)
+            loaded.ensure(columns)
+            self.assertEqual(loaded.cells, cube.cells)
+
+
+if __name__ == "__main__":
+    unittest.main()
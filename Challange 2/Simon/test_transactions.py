@@ -0,0 +1,69 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from columnar import TransactionColumns
+from test_aggregates import random_transactions
+from transactions import SortedTransactions
+
+
+class SortedTransactionsTest(unittest.TestCase):
+
+    def setUp(self):
+        SortedTransactions.CHUNK_SIZE = 8  # veel kleine chunks, zodat splitsen en samenvoegen meedoen
+        self.addCleanup(setattr, SortedTransactions, "CHUNK_SIZE", 1000)
+        self.transactions = SortedTransactions(TransactionColumns())
+
+    def assertOrdered(self, expected):
+        # Op datum, bij gelijke datum in volgorde van toevoegen (sorted is stabiel)
+        expected = sorted(expected, key=lambda t: t["date"])
+        self.assertEqual(len(self.transactions), len(expected))
+        actual = list(self.transactions)
+        self.assertEqual([(t["date"], t["amount"], t["description"]) for t in actual],
+                         [(t["date"], t["amount"], t["description"]) for t in expected])
+        self.assertEqual(self.transactions[5:17], actual[5:17])
+        self.assertEqual(self.transactions[-1], actual[-1])
+
+    def test_add_keeps_date_order(self):
+        transactions = random_transactions(100, seed=4)
+        for t in transactions:
+            self.transactions.add(t)
+        self.assertOrdered(transactions)
+
+    def test_update_merges_into_existing(self):
+        first, second = random_transactions(100, seed=4), random_transactions(60, seed=5)
+        for t in first:
+            self.transactions.add(t)
+        self.transactions.update(second)
+        self.assertOrdered(first + second)
+
+    def test_undo_and_redo_of_import(self):
+        existing, imported = random_transactions(80, seed=6), random_transactions(40, seed=7)
+        self.transactions.update(existing)
+        rows = self.transactions.update(imported)
+
+        self.transactions.remove_rows(rows)
+        self.assertOrdered(existing)
+        self.assertEqual(len(self.transactions.columns.rows()), len(existing))
+
+        self.transactions.restore_rows(rows)
+        self.assertOrdered(existing + imported)
+
+    def test_undo_of_single_rows(self):
+        existing = random_transactions(50, seed=8)
+        rows = [self.transactions.add(t) for t in existing]
+        self.transactions.remove_rows([rows[3]])
+        self.transactions.remove_rows([rows[40], rows[10]])
+        self.assertOrdered([t for i, t in enumerate(existing) if i not in (3, 10, 40)])
+
+    def test_index_out_of_range(self):
+        self.transactions.update(random_transactions(3))
+        with self.assertRaises(IndexError):
+            self.transactions[3]
+        self.assertEqual(self.transactions[2:10], list(self.transactions)[2:])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+from bisect import bisect_left, bisect_right, insort
+from heapq import merge
+
+from columnar import to_day
+
+DAY_OFFSET = 1 << 20  # houdt de sleutel positief, ook voor datums voor 1970
+ROW_BITS = 32
+ROW_MASK = (1 << ROW_BITS) - 1
+
+
+class SortedTransactions:
+    """Transactions kept in date order on top of a TransactionColumns store.
+
+    The order is a list of small sorted chunks of int keys (day << 32 | row), so
+    a single insert only shifts one chunk (O(log n) search plus a short memmove)
+    and bulk inserts are merged in one pass. Rows with the same date keep their
+    insertion order. Row dicts are only built when they are accessed.
+    """
+
+    CHUNK_SIZE = 1000
+
+    def __init__(self, columns):
+        self.columns = columns
+        self._chunks = []     # gesorteerde lijsten met sleutels
+        self._maxes = []      # hoogste sleutel per chunk
+        self._offsets = None  # cumulatieve lengtes, lui opgebouwd voor indexering
+        self._len = 0
+
+    def _key(self, row):
+        return ((int(self.columns.days[row]) + DAY_OFFSET) << ROW_BITS) | row
+
+    def add(self, transaction):
+        """Stores one transaction dict and returns its row number."""
+        row = self.columns.append(to_day(transaction['date']), transaction['amount'],
+                                  description=transaction['description'], category=transaction['category'])
+        self._insert(self._key(row))
+        return row
+
+    def _insert(self, key):
+        self._len += 1
+        self._offsets = None
+        if not self._chunks:
+            self._chunks.append([key])
+            self._maxes.append(key)
+            return
+
+        pos = min(bisect_right(self._maxes, key), len(self._chunks) - 1)
+        chunk = self._chunks[pos]
+        insort(chunk, key)
+        self._maxes[pos] = chunk[-1]
+
+        # Te grote chunk in tweeën splitsen
+        if len(chunk) > 2 * self.CHUNK_SIZE:
+            half = len(chunk) // 2
+            self._chunks[pos:pos + 1] = [chunk[:half], chunk[half:]]
+            self._maxes[pos:pos + 1] = [chunk[half - 1], chunk[-1]]
+
+    def update(self, transactions):
+        """Stores many transaction dicts with one merge; returns their row numbers."""
+        transactions = list(transactions)
+        rows = self.columns.extend(
+            [to_day(t['date']) for t in transactions],
+            [t['amount'] for t in transactions],
+            description=[t['description'] for t in transactions],
+            category=[t['category'] for t in transactions])
+        self._merge(sorted(self._key(row) for row in rows))
+        return rows
+
+    def restore_rows(self, rows):
+        """Puts removed rows back (redo), with one merge like update()."""
+        self.columns.undelete(rows)
+        self._merge(sorted(self._key(row) for row in rows))
+
+    def _merge(self, new_keys):
+        if not new_keys:
+            return
+        # Alleen de chunks vanaf de eerste overlap hoeven opnieuw; bij een
+        # bankafschrift dat na de bestaande data valt is dat niets.
+        pos = bisect_right(self._maxes, new_keys[0])
+        existing = (key for chunk in self._chunks[pos:] for key in chunk)
+        self._rechunk(pos, list(merge(existing, new_keys)))
+        self._len += len(new_keys)
+
+    def _rechunk(self, pos, keys):
+        chunks = [keys[i:i + self.CHUNK_SIZE] for i in range(0, len(keys), self.CHUNK_SIZE)]
+        self._chunks[pos:] = chunks
+        self._maxes[pos:] = [chunk[-1] for chunk in chunks]
+        self._offsets = None
+
+    def remove_rows(self, rows):
+        """Takes many rows out at once (undo of update()) and marks them deleted;
+        like update() it only rebuilds the chunks from the first affected key."""
+        removed = sorted(self._key(row) for row in rows)
+        if not removed:
+            return
+        pos = bisect_left(self._maxes, removed[0])
+        removed_set = set(removed)
+        kept = [key for chunk in self._chunks[pos:] for key in chunk if key not in removed_set]
+        self._len -= sum(len(chunk) for chunk in self._chunks[pos:]) - len(kept)
+        self._rechunk(pos, kept)
+        self.columns.delete(rows)
+
+    def _locate(self, index):
+        if self._offsets is None:
+            self._offsets = []
+            total = 0
+            for chunk in self._chunks:
+                self._offsets.append(total)
+                total += len(chunk)
+        pos = bisect_right(self._offsets, index) - 1
+        return pos, index - self._offsets[pos]
+
+    def __getitem__(self, index):
+        row = self.columns.row
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            result = []
+            if start >= stop:
+                return result
+            pos, i = self._locate(start)
+            while len(result) < stop - start and pos < len(self._chunks):
+                chunk = self._chunks[pos]
+                result.extend(row(key & ROW_MASK) for key in chunk[i:i + stop - start - len(result)])
+                pos, i = pos + 1, 0
+            return result
+
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("transaction index out of range")
+        pos, i = self._locate(index)
+        return row(self._chunks[pos][i] & ROW_MASK)
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        row = self.columns.row
+        for chunk in self._chunks:
+            for key in chunk:
+                yield row(key & ROW_MASK)
@@ -0,0 +1,97 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualTreeview(ttk.Frame):
+    """Treeview that only holds Tk items for the visible rows plus a small buffer.
+
+    The rows themselves stay in a plain Python sequence; scrolling just moves a
+    window over that sequence and rewrites the values of the existing items, so
+    refreshing 100k+ rows costs the same as refreshing a screenful.
+    """
+
+    def __init__(self, master, columns, formatter=tuple, buffer=10, **kwargs):
+        super().__init__(master)
+        self.formatter = formatter  # rij -> tuple met kolomwaarden
+        self.buffer = buffer
+        self.rows = []
+        self.offset = 0
+        self.visible = 20
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", **kwargs)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))  # Linux scroll omhoog
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))   # Linux scroll omlaag
+        self.tree.bind("<Prior>", lambda e: self.scroll(-self.visible))
+        self.tree.bind("<Next>", lambda e: self.scroll(self.visible))
+
+    # --- Treeview passthrough ---
+    def heading(self, column, **kwargs):
+        return self.tree.heading(column, **kwargs)
+
+    def column(self, column, **kwargs):
+        return self.tree.column(column, **kwargs)
+
+    def selected_rows(self):
+        """Returns the underlying row objects for the current selection."""
+        children = self.tree.get_children()
+        return [self.rows[self.offset + children.index(iid)] for iid in self.tree.selection()]
+
+    # --- Data ---
+    def set_rows(self, rows):
+        self.rows = rows
+        self.offset = max(0, min(self.offset, len(rows) - self.visible))
+        self.refresh()
+
+    def refresh(self):
+        """Reuses the existing items and only adds/removes the difference."""
+        window = self.rows[self.offset:self.offset + self.visible + self.buffer]
+        children = self.tree.get_children()
+
+        if len(children) > len(window):
+            self.tree.delete(*children[len(window):])
+            children = children[:len(window)]
+        for iid, row in zip(children, window):
+            self.tree.item(iid, values=self.formatter(row))
+        for row in window[len(children):]:
+            self.tree.insert("", "end", values=self.formatter(row))
+
+        self.tree.yview_moveto(0)
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = len(self.rows)
+        if total <= self.visible:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + self.visible) / total)
+
+    # --- Scrolling ---
+    def scroll(self, delta):
+        new_offset = max(0, min(self.offset + delta, len(self.rows) - self.visible))
+        if new_offset != self.offset:
+            self.offset = new_offset
+            self.refresh()
+        return "break"  # voorkom dat de Treeview zelf ook scrollt
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.scroll(int(float(args[1]) * len(self.rows)) - self.offset)
+        elif args[0] == "scroll":
+            step = self.visible if args[2] == "pages" else 1
+            self.scroll(int(args[1]) * step)
+
+    def _on_mousewheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def _on_resize(self, event):
+        row_height = ttk.Style().lookup("Treeview", "rowheight") or 20
+        visible = max(1, (event.height - 25) // int(row_height))  # 25px voor de kolomkoppen
+        if visible != self.visible:
+            self.visible = visible
+            self.set_rows(self.rows)
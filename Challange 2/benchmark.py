@@ -0,0 +1,298 @@
+"""Headless benchmarks for FinanceTracker (Simon) and BudgetApp (Jorrit).
+
+Usage:
+    python benchmark.py --sizes 10000 100000 1000000 --output bench.json
+
+Every app/size combination runs in its own subprocess (both apps have a
+pythonscript.py and sibling modules with the same names). Tk runs with a
+withdrawn root, Qt with the offscreen platform. Results are written as JSON so
+runs from different commits can be compared.
+"""
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+CATEGORIES = ["Boodschappen", "Huisvesting", "Salaris", "Uit eten", "Vervoer", "Abonnementen", "Overig"]
+DESCRIPTIONS = ["Albert Heijn", "Jumbo", "Huur", "Salaris", "NS reis", "Restaurant", "Cafe",
+                "Spotify", "Benzine", "Bol.com", "Apotheek", "Hypotheek"]
+
+
+# --- Synthetische data ---
+def generate_transactions(size, seed=42, years=10, iso_dates=True):
+    """Random but reproducible transactions spread over the given number of years."""
+    rng = random.Random(seed)
+    start = datetime.date.today().toordinal() - years * 365
+    fmt = "%Y-%m-%d" if iso_dates else "%d-%m-%Y"
+    rows = []
+    for _ in range(size):
+        day = datetime.date.fromordinal(start + rng.randrange(years * 365))
+        income = rng.random() < 0.1
+        rows.append({
+            "date": day.strftime(fmt),
+            "description": rng.choice(DESCRIPTIONS),
+            "category": rng.choice(CATEGORIES),
+            "amount": round(rng.uniform(500, 3000) if income else -rng.uniform(1, 200), 2),
+        })
+    return rows
+
+
+# --- Meten ---
+def measure(func, repeat=3):
+    """Runs func repeat times and returns min/median seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"min_s": min(times), "median_s": statistics.median(times), "runs": repeat}
+
+
+def load_app_module(folder, name):
+    """Imports <folder>/pythonscript.py under a unique module name."""
+    app_dir = os.path.join(HERE, folder)
+    sys.path.insert(0, app_dir)
+    spec = importlib.util.spec_from_file_location(name, os.path.join(app_dir, "pythonscript.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def bench_tracker(size, repeat):
+    import tkinter as tk
+
+    module = load_app_module("Simon", "financetracker")
+    # Dialogen zouden headless blijven hangen; een duplicaatvraag wordt met ja beantwoord
+    for name in ("showinfo", "showwarning", "showerror"):
+        setattr(module.messagebox, name, lambda *args, **kwargs: None)
+    module.messagebox.askyesno = lambda *args, **kwargs: True
+
+    from csv_io import stream_csv
+
+    rows = generate_transactions(size)
+    root = tk.Tk()
+    root.withdraw()
+    results = {}
+
+    def fresh_app():
+        for child in root.winfo_children():
+            child.destroy()
+        return module.FinanceTracker(root)
+
+    def bulk_add():
+        app = fresh_app()
+        app.add_transactions(rows)
+        root.update()
+        return app
+
+    def settle(app):
+        # Zoeken, filteren en exporteren lopen via after() en de taakpool; wachten tot alles terug is
+        root.update()
+        while app.live_search.job is not None or app.tasks.dispatcher.outstanding:
+            root.update()
+            time.sleep(0.001)
+
+    results["bulk_add"] = measure(bulk_add, repeat)
+    app = bulk_add()
+
+    # Per run nieuwe rijen: de rijen uit bulk_add opnieuw toevoegen zijn duplicaten
+    batches = iter([generate_transactions(100, seed=1000 + i) for i in range(repeat)])
+
+    def single_adds():
+        for t in next(batches):
+            app.date_entry.delete(0, tk.END)
+            app.date_entry.insert(0, t["date"])
+            app.desc_entry.insert(0, t["description"])
+            app.category_entry.insert(0, t["category"])
+            app.amount_entry.insert(0, str(t["amount"]))
+            app.add_transaction()
+        root.update()
+
+    results["add_100_single"] = measure(single_adds, repeat)
+
+    month = rows[0]["date"][:7]
+
+    def apply_filter():
+        app.filter_category_entry.delete(0, tk.END)
+        app.filter_category_entry.insert(0, "boodschap")
+        app.filter_month_entry.delete(0, tk.END)
+        app.filter_month_entry.insert(0, month)
+        app.apply_filters()
+        settle(app)
+
+    results["filter_category_month"] = measure(apply_filter, repeat)
+    results["summary_all"] = measure(lambda: (app.reset_filters(), root.update()), repeat)
+
+    # Eigen grafiek, zodat we niet tegelijk met de render-thread van de app tekenen
+    chart = module.CategoryChart("Uitgaven per Categorie", "Geen uitgaven om te tonen", size=(6, 4))
+    data = app.index.expenses_by_category()
+    results["graph_rebuild"] = measure(lambda: (chart.render({}, "pie"), chart.render(data, "pie")), repeat)
+    results["graph_inplace"] = measure(lambda: chart.render(data, "pie"), repeat)
+
+    results["csv_export"] = measure(lambda: (app.export_to_csv(), settle(app)), repeat)
+    export_file = f"transacties_{datetime.datetime.now().strftime('%Y%m%d')}.csv"
+
+    def csv_load():
+        new_app = fresh_app()
+        for chunk, _ in stream_csv(export_file):
+            new_app.add_transactions(chunk, refresh=False)
+        new_app.update_summary_and_list()
+        root.update()
+
+    results["csv_load"] = measure(csv_load, repeat)
+    app.tasks.shutdown()
+    root.destroy()
+    return results
+
+
+def bench_budgetapp(size, repeat):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    module = load_app_module("Jorrit", "budgetapp")
+    from PyQt6.QtWidgets import QApplication
+
+    qt_app = QApplication.instance() or QApplication(sys.argv)
+    # Een duplicaatvraag zou headless blijven hangen; die wordt met ja beantwoord
+    module.QMessageBox.question = lambda *args, **kwargs: module.QMessageBox.StandardButton.Yes
+    rows = [{"date": t["date"], "amount": abs(t["amount"]), "category": t["category"]}
+            for t in generate_transactions(size, iso_dates=False)]
+    with open("transacties.json", "w") as f:
+        json.dump(rows, f)
+
+    results = {}
+    windows = []
+
+    def open_window():
+        window = module.BudgetApp()
+        qt_app.processEvents()
+        windows.append(window)
+
+    def import_json():
+        # Eerste start: JSON inlezen en omzetten naar de binaire snapshot
+        for name in ("transacties.jsonl", "transacties.snap", "transacties.snap.jsonl", "transacties.rollup.json"):
+            if os.path.exists(name):
+                os.remove(name)
+        open_window()
+
+    results["import_json"] = measure(import_json, repeat)
+    results["load"] = measure(open_window, repeat)
+    window = windows[-1]
+
+    # Per run nieuwe rijen: de rijen uit transacties.json opnieuw toevoegen zijn duplicaten
+    batches = iter([[{"date": t["date"], "amount": abs(t["amount"]), "category": t["category"]}
+                     for t in generate_transactions(100, seed=1000 + i, iso_dates=False)]
+                    for i in range(repeat)])
+
+    def single_adds():
+        for t in next(batches):
+            window.date_input.setText(t["date"])
+            window.amount_input.setText(str(t["amount"]))
+            window.add_transaction()
+        qt_app.processEvents()
+
+    results["add_100_single"] = measure(single_adds, repeat)
+
+    year = window.year_filter.itemText(window.year_filter.count() - 1)
+
+    def apply_filter():
+        window.month_filter.blockSignals(True)
+        window.year_filter.blockSignals(True)
+        window.month_filter.setCurrentIndex(3)
+        window.year_filter.setCurrentText(year)
+        window.month_filter.blockSignals(False)
+        window.year_filter.blockSignals(False)
+        window.category_totals()
+
+    results["filter_month_year"] = measure(apply_filter, repeat)
+
+    chart = module.CategoryChart("Uitgaven per categorie", "Geen data om te tonen", tight_layout=True)
+    data = window.category_totals()
+    results["graph_rebuild"] = measure(lambda: (chart.render({}, "bar"), chart.render(data, "bar")), repeat)
+    results["graph_inplace"] = measure(lambda: chart.render(data, "bar"), repeat)
+
+    def save_snapshot():
+        # De snapshot wordt op de achtergrond geschreven; wachten tot hij klaar is
+        window.save_transactions()
+        while window.store.compacting:
+            qt_app.processEvents()
+            time.sleep(0.001)
+
+    results["save_snapshot"] = measure(save_snapshot, repeat)
+
+    for w in windows:
+        w.tasks.shutdown()
+        w.store.close()
+    return results
+
+
+BENCHMARKS = {"tracker": bench_tracker, "budgetapp": bench_budgetapp}
+
+
+def run_worker(app, size, repeat):
+    """Runs one benchmark in a scratch directory and prints its results as JSON."""
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        results = BENCHMARKS[app](size, repeat)
+    print(json.dumps(results))
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmarks for the finance apps")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--apps", nargs="+", choices=sorted(BENCHMARKS), default=sorted(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="JSON file for the results (default: stdout)")
+    parser.add_argument("--worker", nargs=2, metavar=("APP", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker[0], int(args.worker[1]), args.repeat)
+        return
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [],
+    }
+    for app in args.apps:
+        for size in args.sizes:
+            print(f"{app} @ {size} transacties...", file=sys.stderr)
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", app, str(size), "--repeat", str(args.repeat)],
+                capture_output=True, text=True)
+            entry = {"app": app, "size": size}
+            if proc.returncode == 0:
+                entry["timings"] = json.loads(proc.stdout.strip().splitlines()[-1])
+            else:
+                entry["error"] = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "unknown error"
+            report["results"].append(entry)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Shared chart layer for the finance apps.
+
+Charts are drawn on an off-screen Agg figure by a background thread; the apps
+only receive finished pixel buffers. When the category set stays the same the
+existing wedges/bars are updated in place instead of rebuilding the axes.
+
+matplotlib is only imported when the first chart is drawn, on the render
+thread, so it does not delay the window from appearing.
+"""
+import math
+import threading
+
+import numpy as np
+
+
+class OffscreenChart:
+    """Figure with an Agg canvas that is never shown directly."""
+
+    def __init__(self, size=(6, 4), dpi=100, ylabel="Bedrag (€)", tight_layout=False):
+        self.size = size
+        self.dpi = dpi
+        self.figure = self.canvas = self.ax = None  # pas bij de eerste tekening aangemaakt
+        self.ylabel = ylabel
+        self.tight_layout = tight_layout
+
+    def load(self):
+        """Creates the figure on first use; returns True if it was just created."""
+        if self.figure is not None:
+            return False
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(figsize=self.size, dpi=self.dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+        return True
+
+    def resize(self, size):
+        """Sets the figure size in pixels; returns True if it changed."""
+        if size is None:
+            return False
+        width, height = size
+        dpi = self.figure.get_dpi()
+        if (width, height) == tuple(self.canvas.get_width_height()):
+            return False
+        self.figure.set_size_inches(width / dpi, height / dpi)
+        return True
+
+    def pixels(self, layout_changed=True):
+        if self.tight_layout and layout_changed:
+            self.figure.tight_layout()  # voorkomt overlappende labels
+        self.canvas.draw()
+        return np.asarray(self.canvas.buffer_rgba())
+
+
+class CategoryChart(OffscreenChart):
+    """Pie or bar chart of {category: amount} on an off-screen figure."""
+
+    def __init__(self, title, empty_text, size=(6, 4), dpi=100, startangle=90,
+                 ylabel="Bedrag (€)", tight_layout=False):
+        super().__init__(size, dpi, ylabel, tight_layout)
+        self.title = title
+        self.empty_text = empty_text
+        self.startangle = startangle
+
+        self.kind = None        # soort grafiek die nu getekend is
+        self.categories = None  # categorieën waarvoor de artists nu bestaan
+        self.artists = None
+
+    def render(self, data, kind="pie", size=None):
+        """Draws the chart and returns the RGBA pixels as a (height, width, 4) array."""
+        self.load()
+        layout_changed = self.resize(size)
+
+        categories = tuple(data)
+        values = list(data.values())
+        if data and kind == self.kind and categories == self.categories:
+            if kind == "pie":
+                self._update_pie(values)
+            else:
+                self._update_bar(values)
+        else:
+            self._rebuild(categories, values, kind)
+            layout_changed = True
+        return self.pixels(layout_changed)
+
+    def _rebuild(self, categories, values, kind):
+        self.ax.clear()
+        self.ax.axis('on')
+        if not values:
+            self.ax.text(0.5, 0.5, self.empty_text, ha='center', va='center')
+            self.ax.axis('off')
+            self.kind = self.categories = self.artists = None
+        elif kind == "pie":
+            self.artists = self.ax.pie(values, labels=categories, autopct='%1.1f%%',
+                                       startangle=self.startangle)
+            self.ax.axis('equal')
+            self.kind, self.categories = kind, categories
+        else:
+            n = len(categories)
+            x_pos = range(n)
+            self.artists = self.ax.bar(x_pos, values, color='skyblue', width=0.6)
+            self.ax.set_xticks(x_pos)
+            self.ax.set_xticklabels(categories, rotation=30, ha='right')
+            self.ax.set_ylabel(self.ylabel)
+            self.ax.set_xlim(-0.5, n - 0.5)
+            self._set_ylim(values)
+            self.kind, self.categories = kind, categories
+        self.ax.set_title(self.title)
+
+    def _update_pie(self, values):
+        # Zelfde berekening als Axes.pie, maar op de bestaande wedges en teksten
+        wedges, texts, autotexts = self.artists
+        total = sum(values)
+        theta1 = self.startangle
+        for wedge, text, autotext, value in zip(wedges, texts, autotexts, values):
+            frac = value / total if total else 0
+            theta2 = theta1 + 360 * frac
+            wedge.set_theta1(theta1)
+            wedge.set_theta2(theta2)
+            mid = math.radians((theta1 + theta2) / 2)
+            x, y = math.cos(mid), math.sin(mid)
+            text.set_position((1.1 * x, 1.1 * y))
+            text.set_horizontalalignment('left' if x > 0 else 'right')
+            autotext.set_position((0.6 * x, 0.6 * y))
+            autotext.set_text(f"{100 * frac:.1f}%")
+            theta1 = theta2
+
+    def _update_bar(self, values):
+        for bar, value in zip(self.artists, values):
+            bar.set_height(value)
+        self._set_ylim(values)
+
+    def _set_ylim(self, values):
+        # Zet y-limiet iets hoger dan max waarde
+        ymax = max(values)
+        if ymax == 0:
+            ymax = 1
+        self.ax.set_ylim(0, ymax * 1.1)
+
+
+class TrendChart(OffscreenChart):
+    """Monthly trends from a RollupCube: stacked bars per category ("stacked") or a
+    running balance line ("balance"). Data is (labels, series) with one value per
+    month, so drawing cost does not depend on the number of transactions."""
+
+    MAX_TICKS = 12
+
+    def __init__(self, titles, empty_text, size=(6, 4), dpi=100, ylabel="Bedrag (€)", tight_layout=False):
+        super().__init__(size, dpi, ylabel, tight_layout)
+        self.titles = titles  # {"stacked": ..., "balance": ...}
+        self.empty_text = empty_text
+
+    def render(self, data, kind="stacked", size=None):
+        self.load()
+        self.resize(size)
+        labels, series = data
+        self.ax.clear()
+        self.ax.axis('on')
+
+        if not labels:
+            self.ax.text(0.5, 0.5, self.empty_text, ha='center', va='center')
+            self.ax.axis('off')
+        elif kind == "stacked":
+            x_pos = np.arange(len(labels))
+            bottom = np.zeros(len(labels))
+            for category, values in series.items():
+                self.ax.bar(x_pos, values, bottom=bottom, label=category, width=0.8)
+                bottom += values
+            if series:
+                self.ax.legend(fontsize='small', loc='upper left')
+        else:
+            self.ax.plot(range(len(labels)), series, color='tab:blue')
+            self.ax.axhline(0, color='gray', linewidth=0.8)
+
+        if labels:
+            # Niet elke maand een label, anders lopen ze over elkaar
+            step = max(1, len(labels) // self.MAX_TICKS)
+            ticks = list(range(0, len(labels), step))
+            self.ax.set_xticks(ticks)
+            self.ax.set_xticklabels([labels[i] for i in ticks], rotation=30, ha='right')
+            self.ax.set_ylabel(self.ylabel)
+        self.ax.set_title(self.titles.get(kind, ""))
+        return self.pixels()
+
+
+class ChartRenderer(threading.Thread):
+    """Renders a CategoryChart or TrendChart on a background thread. Only the
+    newest request is drawn; requests that arrive while it is busy replace each
+    other.
+
+    on_ready(generation, rgba), or on_error(generation, exception) when the
+    chart could not be drawn, is called on the render thread; the caller is
+    responsible for handing the result to its own UI thread.
+    """
+
+    def __init__(self, chart, on_ready, on_error):
+        super().__init__(daemon=True)
+        self.chart = chart
+        self.on_ready = on_ready
+        self.on_error = on_error
+        self.pending = None
+        self.generation = 0
+        self.condition = threading.Condition()
+        self.start()
+
+    def submit(self, data, kind="pie", size=None):
+        """Queues a redraw and returns its generation number."""
+        with self.condition:
+            self.generation += 1
+            self.pending = (self.generation, data, kind, size)
+            self.condition.notify()
+            return self.generation
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None:
+                    self.condition.wait()
+                generation, data, kind, size = self.pending
+                self.pending = None
+            try:
+                rgba = self.chart.render(data, kind, size)
+            except Exception as e:
+                self.on_error(generation, e)
+                continue
+            self.on_ready(generation, rgba)
@@ -0,0 +1,221 @@
+"""Columnar transaction storage shared by the finance apps.
+
+Each row is a day number (int32), an amount in cents (int64) and one int32
+code per text field; the texts themselves are stored once in a dictionary.
+Filters are boolean masks over the columns and group-bys use np.bincount, so
+nothing iterates over Python objects per row.
+"""
+import datetime
+
+import numpy as np
+
+EPOCH = datetime.date(1970, 1, 1).toordinal()
+INVALID_DAY = np.iinfo(np.int32).min  # voor rijen met een onleesbare datum
+
+
+def to_day(value):
+    """date, ISO string or ordinal -> days since 1970-01-01."""
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value)
+    if isinstance(value, datetime.date):
+        value = value.toordinal()
+    return value - EPOCH
+
+
+class TransactionColumns:
+    """Append-only columns with dictionary-encoded text fields.
+
+    Deleted rows stay in the arrays but are excluded from every mask.
+    If "date" is not one of the text fields, rows get an ISO date built from
+    the day column.
+    """
+
+    def __init__(self, text_fields=("category", "description"), capacity=1024):
+        self.size = 0
+        self.text_fields = tuple(text_fields)
+        self.days = np.zeros(capacity, dtype=np.int32)
+        self.cents = np.zeros(capacity, dtype=np.int64)
+        self.deleted = np.zeros(capacity, dtype=bool)
+        self.codes = {field: np.zeros(capacity, dtype=np.int32) for field in self.text_fields}
+        self.values = {field: [] for field in self.text_fields}  # code -> tekst
+        self.lookup = {field: {} for field in self.text_fields}  # tekst -> code
+
+    def __len__(self):
+        return self.size
+
+    def load_arrays(self, days, cents, codes, values):
+        """Replaces the contents of an empty store with existing arrays, e.g. read-only
+        views on a memory-mapped snapshot. They are only copied on the first append."""
+        self.size = len(days)
+        self.days, self.cents = days, cents
+        self.deleted = np.zeros(self.size, dtype=bool)
+        self.codes = dict(codes)
+        for field in self.text_fields:
+            self.values[field][:] = values[field]  # zelfde lijst, want zoekindexen verwijzen ernaar
+            self.lookup[field] = {text: code for code, text in enumerate(values[field])}
+
+    def frozen(self):
+        """Read-only view on the current rows for use on another thread. Later
+        appends and deletes in this store do not change it."""
+        n = self.size
+        view = TransactionColumns.__new__(TransactionColumns)
+        view.size = n
+        view.text_fields = self.text_fields
+        view.days, view.cents = self.days[:n], self.cents[:n]
+        view.deleted = self.deleted[:n].copy()
+        view.codes = {field: codes[:n] for field, codes in self.codes.items()}
+        view.values, view.lookup = self.values, self.lookup  # worden alleen aangevuld
+        return view
+
+    def _reserve(self, extra):
+        needed = self.size + extra
+        if needed <= len(self.days) and self.days.flags.writeable:
+            return
+        capacity = max(len(self.days), 1)  # read-only (gemapte) kolommen worden hier gekopieerd
+        while capacity < needed:
+            capacity *= 2
+        self.days = np.resize(self.days, capacity)
+        self.cents = np.resize(self.cents, capacity)
+        self.deleted = np.resize(self.deleted, capacity)
+        self.deleted[self.size:] = False
+        for field in self.text_fields:
+            self.codes[field] = np.resize(self.codes[field], capacity)
+
+    def encode(self, field, text):
+        code = self.lookup[field].get(text)
+        if code is None:
+            code = len(self.values[field])
+            self.values[field].append(text)
+            self.lookup[field][text] = code
+        return code
+
+    def append(self, day, amount, **texts):
+        """Adds one row and returns its row number."""
+        self._reserve(1)
+        row = self.size
+        self.days[row] = day
+        self.cents[row] = round(amount * 100)
+        for field in self.text_fields:
+            self.codes[field][row] = self.encode(field, texts.get(field, ""))
+        self.size += 1
+        return row
+
+    def extend(self, days, amounts, **texts):
+        """Adds many rows at once; returns the range of new row numbers."""
+        count = len(days)
+        if not count:
+            return range(self.size, self.size)
+        self._reserve(count)
+        start = self.size
+        self.days[start:start + count] = days
+        self.cents[start:start + count] = np.round(np.asarray(amounts, dtype=np.float64) * 100)
+        encode = self.encode
+        for field in self.text_fields:
+            self.codes[field][start:start + count] = [encode(field, t) for t in texts.get(field, [""] * count)]
+        self.size += count
+        return range(start, start + count)
+
+    def delete(self, row):
+        """Marks a row, or an array/range of rows, deleted."""
+        self.deleted[row] = True
+
+    def undelete(self, row):
+        self.deleted[row] = False
+
+    # --- Rijen als dicts (alleen voor weergave en export) ---
+    def row(self, row):
+        result = {field: self.values[field][self.codes[field][row]] for field in self.text_fields}
+        if "date" not in result:
+            result["date"] = datetime.date.fromordinal(int(self.days[row]) + EPOCH).isoformat()
+        result["amount"] = int(self.cents[row]) / 100
+        return result
+
+    def rows(self, positions=None):
+        """Lazy sequence of row dicts for the given positions (default: all live rows)."""
+        if positions is None:
+            positions = np.flatnonzero(~self.deleted[:self.size])
+        return RowView(self, positions)
+
+    # --- Filters ---
+    def mask(self, start=None, end=None, categories=None, min_amount=None, max_amount=None):
+        """Boolean mask over all rows. start/end are dates (inclusive), categories a
+        set of category names, min/max_amount bounds in euros."""
+        n = self.size
+        mask = ~self.deleted[:n]
+        days = self.days[:n]
+        if start is not None:
+            mask &= days >= to_day(start)
+        if end is not None:
+            mask &= days <= to_day(end)
+        if categories is not None:
+            mask &= self.in_mask("category", categories)
+        if min_amount is not None:
+            mask &= self.cents[:n] >= round(min_amount * 100)
+        if max_amount is not None:
+            mask &= self.cents[:n] <= round(max_amount * 100)
+        return mask
+
+    def in_mask(self, field, texts):
+        return self.codes_mask(field, [self.lookup[field][t] for t in texts if t in self.lookup[field]])
+
+    def codes_mask(self, field, codes):
+        """Rows whose code is in codes; uses a lookup table over the dictionary, so
+        the cost stays linear in the rows however many codes match."""
+        hit = np.zeros(len(self.values[field]), dtype=bool)
+        hit[np.asarray(codes, dtype=np.intp)] = True
+        return hit[self.codes[field][:self.size]]
+
+    def order_by_date(self, positions):
+        """Sorts row positions by date, keeping insertion order within a day."""
+        positions = np.asarray(positions, dtype=np.intp)
+        return positions[np.argsort(self.days[positions], kind="stable")]
+
+    def filtered_rows(self, mask):
+        """Date-ordered RowView of the rows selected by a mask."""
+        return self.rows(self.order_by_date(np.flatnonzero(mask)))
+
+    # --- Aggregaties ---
+    def totals(self, selection=None):
+        """(income, expenses) for a mask or array of positions; expenses are negative."""
+        cents = self._select(self.cents, selection)
+        return int(cents[cents > 0].sum()) / 100, int(cents[cents < 0].sum()) / 100
+
+    def sum_by(self, field, selection=None, sign=None):
+        """{text: total} grouped by a text field. sign=-1 only sums expenses (as
+        positive numbers), sign=1 only income."""
+        cents = self._select(self.cents, selection)
+        codes = self._select(self.codes[field], selection)
+        if sign is not None:
+            keep = cents * sign > 0
+            cents, codes = cents[keep] * sign, codes[keep]
+        sums = np.bincount(codes, weights=cents, minlength=len(self.values[field]))
+        present = np.bincount(codes, minlength=len(self.values[field])) > 0
+        return {self.values[field][code]: round(float(sums[code]) / 100, 2) for code in np.flatnonzero(present)}
+
+    def _select(self, column, selection):
+        if selection is None:
+            return column[:self.size][~self.deleted[:self.size]]
+        selection = np.asarray(selection)
+        if selection.dtype == bool:
+            return column[:self.size][selection]
+        return column[selection.astype(np.intp, copy=False)]
+
+
+class RowView:
+    """Sequence over selected rows that only builds dicts for the rows accessed."""
+
+    def __init__(self, columns, positions):
+        self.columns = columns
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.columns.row(p) for p in self.positions[index]]
+        return self.columns.row(self.positions[index])
+
+    def __iter__(self):
+        for p in self.positions:
+            yield self.columns.row(p)
@@ -0,0 +1,214 @@
+"""Duplicate detection for added and imported transactions.
+
+A transaction's fingerprint is (day, amount in cents, normalized text). The
+index keeps a count per fingerprint, grouped in buckets per (day, cents), so
+an exact check is one dict lookup. Near-duplicates (the same amount a few days
+apart, or a description that differs in punctuation or a reference number)
+only look in the 2 * window + 1 buckets around the day; those hold a handful
+of texts at most, so every check costs the same however large the history is.
+
+Counts rather than a set: an export that overlaps the data twice holds every
+shared row twice, and two identical rows in one statement (two coffees on one
+day) stay two rows. A DuplicateCheck matches each new row against at most one
+existing row, and rows it added itself never count as existing.
+"""
+import difflib
+import functools
+import json
+import os
+import re
+import unicodedata
+
+import numpy as np
+
+from columnar import INVALID_DAY
+
+REFERENCE = re.compile(r"\d{6,}")  # transactie- en pasnummers verschillen per export
+WORD = re.compile(r"\w+")
+
+
+@functools.lru_cache(maxsize=100000)
+def normalize(text):
+    """Lower case without accents, punctuation and long reference numbers."""
+    text = str(text or "").lower()
+    if not text.isascii():
+        text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return " ".join(WORD.findall(REFERENCE.sub(" ", text)))
+
+
+class Match:
+    __slots__ = ("kind", "day", "cents", "text")
+
+    def __init__(self, kind, day, cents, text):
+        self.kind = kind  # "exact" of "similar"
+        self.day = day
+        self.cents = cents
+        self.text = text
+
+
+class DuplicateIndex:
+
+    def __init__(self, filename=None, field="description", window=3, threshold=0.85):
+        self.filename = filename
+        self.field = field          # tekstveld in de fingerprint
+        self.window = window        # dagen voor- en achteruit voor bijna-duplicaten
+        self.threshold = threshold  # minimale gelijkenis van de teksten (0-1)
+        self.buckets = {}   # (dag, centen) -> {genormaliseerde tekst: [aantal, originele tekst]}
+        self.rows = 0       # aantal rijen (len van de kolommen) waaruit de index is opgebouwd
+        self.dirty = False
+
+    # --- Bijwerken ---
+    def add(self, day, amount, text, new_row=True):
+        """Counts one transaction. new_row=False is for a row that was already
+        counted in rows and comes back (redo)."""
+        if new_row:
+            self.rows += 1
+        if day != INVALID_DAY:
+            self._count(int(day), round(amount * 100), normalize(text), text, 1)
+
+    def _count(self, day, cents, norm, text, count):
+        self.buckets.setdefault((day, cents), {}).setdefault(norm, [0, text])[0] += count
+
+    def remove(self, day, amount, text):
+        """Takes a transaction out again (undo); rows stays the same."""
+        key = (int(day), round(amount * 100))
+        bucket = self.buckets.get(key)
+        entry = bucket and bucket.get(normalize(text))
+        if not entry:
+            return
+        entry[0] -= 1
+        if not entry[0]:
+            del bucket[normalize(text)]
+            if not bucket:
+                del self.buckets[key]
+
+    def add_rows(self, columns, rows, new_row=True):
+        if new_row:
+            self.rows += len(rows)
+        for day, cents, text in self._fingerprints(columns, rows):
+            if day != INVALID_DAY:
+                self._count(day, cents, normalize(text), text, 1)
+
+    def remove_rows(self, columns, rows):
+        for day, cents, text in self._fingerprints(columns, rows):
+            self.remove(day, cents / 100, text)
+
+    def _fingerprints(self, columns, rows):
+        rows = np.asarray(rows, dtype=np.intp)
+        values = columns.values[self.field]
+        return zip(columns.days[rows].tolist(), columns.cents[rows].tolist(),
+                   (values[code] for code in columns.codes[self.field][rows].tolist()))
+
+    def rebuild(self, columns):
+        """Builds the index from all live rows, with one np.unique over the
+        (day, cents, text code) triples instead of a dict update per row."""
+        n = columns.size
+        keep = ~columns.deleted[:n] & (columns.days[:n] != INVALID_DAY)
+        triples = np.stack([columns.days[:n][keep].astype(np.int64), columns.cents[:n][keep],
+                            columns.codes[self.field][:n][keep].astype(np.int64)], axis=1)
+        unique, counts = np.unique(triples, axis=0, return_counts=True)
+        values = columns.values[self.field]
+        norms = {code: normalize(values[code]) for code in np.unique(unique[:, 2]).tolist()}  # één keer per tekst
+        self.buckets, self.rows, self.dirty = {}, n, False
+        for (day, cents, code), count in zip(unique.tolist(), counts.tolist()):
+            self._count(day, cents, norms[code], values[code], count)
+
+    def replace(self, fingerprints, rows=None):
+        """Uses (day, cents, text, count) tuples computed elsewhere, e.g. by
+        SqliteStore.fingerprint_counts()."""
+        self.buckets, self.dirty = {}, False
+        for day, cents, text, count in fingerprints:
+            self._count(day, cents, normalize(text), text, count)
+        if rows is not None:
+            self.rows = rows
+
+    def ensure(self, columns):
+        if self.dirty:
+            self.rebuild(columns)
+
+    # --- Zoeken ---
+    def check(self):
+        """A DuplicateCheck for one import (or one single add)."""
+        return DuplicateCheck(self)
+
+    def similar(self, a, b):
+        matcher = difflib.SequenceMatcher(None, a, b)
+        return matcher.quick_ratio() >= self.threshold and matcher.ratio() >= self.threshold
+
+    # --- Opslaan ---
+    def save(self):
+        if not self.filename or self.dirty:
+            return
+        tmp_file = self.filename + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump({"rows": self.rows,
+                       "entries": [[day, cents, norm, text, count]
+                                   for (day, cents), bucket in self.buckets.items()
+                                   for norm, (count, text) in bucket.items()]}, f)
+        os.replace(tmp_file, self.filename)
+
+    def load(self, rows):
+        """Loads a saved index. If it was built from a different number of rows than
+        the data now has, it is marked dirty and ensure() rebuilds it."""
+        self.buckets, self.rows, self.dirty = {}, 0, True
+        if not self.filename or not os.path.exists(self.filename):
+            return
+        try:
+            with open(self.filename, "r") as f:
+                data = json.load(f)
+            buckets = {}
+            for day, cents, norm, text, count in data["entries"]:
+                buckets.setdefault((day, cents), {})[norm] = [count, text]
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        if data.get("rows") == rows:
+            self.buckets, self.rows, self.dirty = buckets, rows, False
+
+
+class DuplicateCheck:
+    """Matches the rows of one import against the index.
+
+    Every existing row matches at most one new row, and rows added during the
+    check (add_rows) are not existing rows for the rest of it. Both are kept in
+    one counter of used fingerprints. Collisions are collected in batch for
+    review afterwards.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.used = {}  # (dag, centen, genormaliseerde tekst) -> al gebruikt
+        self.collisions = []  # (record, Match)
+
+    def _available(self, day, cents, norm, entry):
+        return entry[0] - self.used.get((day, cents, norm), 0)
+
+    def _claim(self, day, cents, norm):
+        key = (day, cents, norm)
+        self.used[key] = self.used.get(key, 0) + 1
+
+    def find(self, day, amount, text):
+        """The existing row this one duplicates, or None. A match is claimed."""
+        if day == INVALID_DAY:
+            return None
+        day, cents, norm = int(day), round(amount * 100), normalize(text)
+        buckets = self.index.buckets
+
+        entry = buckets.get((day, cents), {}).get(norm)
+        if entry and self._available(day, cents, norm, entry) > 0:
+            self._claim(day, cents, norm)
+            return Match("exact", day, cents, entry[1])
+
+        # Bijna-duplicaat: zelfde bedrag, een paar dagen verschil of een iets andere tekst
+        for offset in sorted(range(-self.index.window, self.index.window + 1), key=abs):
+            for other, entry in buckets.get((day + offset, cents), {}).items():
+                if ((offset or other != norm) and self._available(day + offset, cents, other, entry) > 0
+                        and (other == norm or self.index.similar(norm, other))):
+                    self._claim(day + offset, cents, other)
+                    return Match("similar", day + offset, cents, entry[1])
+        return None
+
+    def add_rows(self, columns, rows):
+        """Adds rows to the index without making them candidates for this check."""
+        self.index.add_rows(columns, rows)
+        for day, cents, text in self.index._fingerprints(columns, rows):
+            self._claim(day, cents, normalize(text))
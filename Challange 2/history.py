@@ -0,0 +1,59 @@
+"""Undo/redo history as a log of operations with their inverse.
+
+A step stores what changed, not the state: for adding transactions that is
+the range of new row numbers. The rows stay in the append-only columns and
+are only marked deleted while undone, so neither undo nor redo copies them.
+A bulk import of 100k rows is one step holding a range object.
+
+Steps are undone in reverse order. A new step clears the redo stack.
+"""
+from collections import deque
+
+
+class Step:
+    __slots__ = ("label", "undo", "redo")
+
+    def __init__(self, label, undo, redo):
+        self.label = label
+        self.undo = undo
+        self.redo = redo
+
+
+class History:
+
+    def __init__(self, limit=100):
+        self.done = deque(maxlen=limit)  # oudste stappen vallen er vanzelf af
+        self.undone = []
+
+    def push(self, label, undo, redo):
+        """Records an operation that has just been done, with the callables that
+        revert and repeat it."""
+        self.done.append(Step(label, undo, redo))
+        self.undone.clear()
+
+    def can_undo(self):
+        return bool(self.done)
+
+    def can_redo(self):
+        return bool(self.undone)
+
+    def undo(self):
+        """Reverts the latest step; returns its label, or None if there is none."""
+        if not self.done:
+            return None
+        step = self.done.pop()
+        step.undo()
+        self.undone.append(step)
+        return step.label
+
+    def redo(self):
+        if not self.undone:
+            return None
+        step = self.undone.pop()
+        step.redo()
+        self.done.append(step)
+        return step.label
+
+    def clear(self):
+        self.done.clear()
+        self.undone.clear()
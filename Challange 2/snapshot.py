@@ -0,0 +1,96 @@
+"""Binary snapshot of a TransactionColumns store, opened with mmap.
+
+Layout (little-endian, every block aligned to 8 bytes):
+
+    header       magic "FINSNAP1", row count (u64), number of text fields (u32), padding
+    days         int32 per row
+    cents        int64 per row
+    codes        int32 per row, one block per text field
+    strings      per text field: name length (u32) + name, number of strings (u64),
+                 end offsets (u64 per string) and the UTF-8 bytes
+
+Loading only decodes the string tables (one entry per distinct text); the
+numeric columns are numpy views on the mapped file, so the OS reads pages in
+when rows are displayed or aggregated.
+"""
+import mmap
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"FINSNAP1"
+HEADER = struct.Struct("<8sQI4x")
+
+
+def _pad(f):
+    f.write(b"\0" * (-f.tell() % 8))
+
+
+def write_snapshot(filename, columns):
+    """Writes the live rows of columns atomically (tmp file, fsync, os.replace)."""
+    live = np.flatnonzero(~columns.deleted[:columns.size])
+    tmp_file = filename + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(live), len(columns.text_fields)))
+        f.write(columns.days[live].astype("<i4").tobytes())
+        _pad(f)
+        f.write(columns.cents[live].astype("<i8").tobytes())
+        for field in columns.text_fields:
+            f.write(columns.codes[field][live].astype("<i4").tobytes())
+            _pad(f)
+
+        for field in columns.text_fields:
+            name = field.encode()
+            encoded = [text.encode() for text in columns.values[field]]
+            f.write(struct.pack("<I", len(name)) + name)
+            _pad(f)
+            f.write(struct.pack("<Q", len(encoded)))
+            f.write(np.cumsum([len(b) for b in encoded], dtype="<u8").tobytes())
+            f.write(b"".join(encoded))
+            _pad(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, filename)
+
+
+def read_snapshot(filename, columns):
+    """Loads a snapshot into an empty TransactionColumns store; returns the row count."""
+    with open(filename, "rb") as f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            raise ValueError(f"{filename} is geen snapshot")
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)  # blijft open zolang de views bestaan
+
+    magic, rows, field_count = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{filename} is geen snapshot")
+
+    offset = HEADER.size
+
+    def take(dtype, count):
+        nonlocal offset
+        array = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+        offset += array.nbytes + (-array.nbytes % 8)
+        return array
+
+    days = take("<i4", rows)
+    cents = take("<i8", rows)
+    codes = [take("<i4", rows) for _ in range(field_count)]
+
+    values = {}
+    for _ in range(field_count):
+        (length,) = struct.unpack_from("<I", buffer, offset)
+        name = bytes(buffer[offset + 4:offset + 4 + length]).decode()
+        offset += 4 + length + (-(4 + length) % 8)
+        (count,) = struct.unpack_from("<Q", buffer, offset)
+        offset += 8
+        ends = take("<u8", count).tolist()
+        blob = buffer[offset:offset + (ends[-1] if ends else 0)]
+        starts = [0] + ends[:-1]
+        values[name] = [blob[s:e].decode() for s, e in zip(starts, ends)]
+        offset += len(blob) + (-len(blob) % 8)
+
+    if list(values) != list(columns.text_fields):
+        raise ValueError(f"{filename} heeft andere tekstvelden: {list(values)}")
+    columns.load_arrays(days, cents, dict(zip(values, codes)), values)
+    return rows
@@ -0,0 +1,43 @@
+"""Startup profiler for the finance apps.
+
+Start an app with --profile to print how long each startup phase took:
+imports, widget construction, data load, first paint and first chart. For a
+breakdown of the imports per module use python -X importtime.
+"""
+import sys
+import time
+
+
+class StartupProfiler:
+    """Records the time between consecutive marks. When disabled, marks are still
+    cheap to call but nothing is reported."""
+
+    def __init__(self, started=None, enabled=False):
+        self.started = time.perf_counter() if started is None else started
+        self.enabled = enabled
+        self.last = self.started
+        self.phases = {}  # fase -> seconden, in volgorde van afronden
+
+    def mark(self, phase):
+        """Ends a phase; only the first mark of a phase counts."""
+        if phase in self.phases:
+            return
+        now = time.perf_counter()
+        self.phases[phase] = now - self.last
+        self.last = now
+
+    def finish(self, phase):
+        """Marks the last phase and prints the report."""
+        first = phase not in self.phases
+        self.mark(phase)
+        if first:
+            self.report()
+
+    def report(self, file=None):
+        if not self.enabled:
+            return
+        file = file or sys.stderr
+        print("Opstarttijden:", file=file)
+        for phase, seconds in self.phases.items():
+            print(f"  {phase:<18} {seconds * 1000:8.1f} ms", file=file)
+        print(f"  {'totaal':<18} {(self.last - self.started) * 1000:8.1f} ms", file=file)
@@ -0,0 +1,193 @@
+"""Storage backends for the finance apps.
+
+Every backend has the same small interface: load(), append(record),
+extend(records), delete(keys), compact() and close(). Records are dicts with a
+date, an amount and text fields such as category and description. append and
+extend return a key per record, which delete takes to remove exactly those
+records again (undo).
+
+SqliteStore additionally answers category totals, years and the month x
+category rollup with SQL (queryable is True); BudgetApp uses that to show a
+multi-year history without reading all rows into Python. FinanceTracker only
+uses it for persistence: its budgets, search, duplicate check and undo work on
+the in-memory columns, so it still loads every row at start-up.
+"""
+import datetime
+import sqlite3
+
+from columnar import EPOCH
+
+
+class TransactionStore:
+    """Base class of the storage backends."""
+
+    queryable = False  # True als de store zelf filters en totalen kan berekenen
+
+    def load(self):
+        """Returns all stored records."""
+        raise NotImplementedError
+
+    def append(self, record):
+        """Stores one record and returns its key."""
+        raise NotImplementedError
+
+    def extend(self, records):
+        return [self.append(record) for record in records]
+
+    def delete(self, keys):
+        """Removes the records with these keys again (undo). Redo adds them
+        back with append or extend, which gives them new keys."""
+        raise NotImplementedError
+
+    def compact(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class SqliteStore(TransactionStore):
+    """Transactions in an SQLite database (WAL mode).
+
+    Besides the original date text each row stores the day number and a month
+    index (year * 12 + month - 1), so date filters use the index on day and
+    trends can be grouped per month in SQL. Rows with an unreadable date get
+    NULL there and only show up in load().
+    """
+
+    queryable = True
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY,
+            date TEXT NOT NULL,
+            day INTEGER,
+            month INTEGER,
+            cents INTEGER NOT NULL,
+            category TEXT NOT NULL DEFAULT '',
+            description TEXT NOT NULL DEFAULT ''
+        );
+        CREATE INDEX IF NOT EXISTS idx_transactions_day ON transactions (day);
+        CREATE INDEX IF NOT EXISTS idx_transactions_category_day ON transactions (category, day);
+    """
+    INSERT = ("INSERT INTO transactions (id, date, day, month, cents, category, description) "
+              "VALUES (?, ?, ?, ?, ?, ?, ?)")
+
+    def __init__(self, filename, text_fields=("category", "description"), date_format="%Y-%m-%d", batch_size=10000):
+        self.filename = filename
+        self.text_fields = tuple(text_fields)
+        self.date_format = date_format
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(filename)
+        # WAL: schrijven blokkeert lezen niet en een commit is één append aan de WAL
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def _params(self, record):
+        date_str = record.get("date", "")
+        try:
+            date = datetime.datetime.strptime(date_str, self.date_format).date()
+            day, month = date.toordinal() - EPOCH, date.year * 12 + date.month - 1
+        except (TypeError, ValueError):
+            day = month = None
+        return (date_str, day, month, round(float(record.get("amount", 0)) * 100),
+                record.get("category") or "", record.get("description") or "")
+
+    def _record(self, date, cents, *texts):
+        record = {"date": date, "amount": cents / 100}
+        record.update(zip(self.text_fields, texts))
+        return record
+
+    # --- Schrijven ---
+    def append(self, record):
+        """Inserts one record; the key is its id."""
+        return self.extend([record])[0]
+
+    def extend(self, records):
+        """Inserts all records in one transaction, in batches of batch_size rows.
+        Returns their ids: the ids are assigned here, so executemany can be used
+        and the ids are known without reading them back."""
+        batch = []
+        with self.conn:
+            first = next_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM transactions").fetchone()[0]
+            for record in records:
+                batch.append((next_id,) + self._params(record))
+                next_id += 1
+                if len(batch) >= self.batch_size:
+                    self.conn.executemany(self.INSERT, batch)
+                    batch = []
+            if batch:
+                self.conn.executemany(self.INSERT, batch)
+        return range(first, next_id)
+
+    def delete(self, keys):
+        with self.conn:
+            self.conn.executemany("DELETE FROM transactions WHERE id = ?", ((key,) for key in keys))
+
+    def compact(self):
+        # De WAL terugschrijven naar het databasebestand
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    # --- Lezen ---
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def load(self):
+        return list(self.rows())
+
+    def rows(self):
+        """All records in date order."""
+        sql = f"SELECT date, cents, {', '.join(self.text_fields)} FROM transactions ORDER BY day, id"
+        for row in self.conn.execute(sql):
+            yield self._record(*row)
+
+    def _where(self, start=None, end=None, month_of_year=None):
+        """WHERE clause for a date range; month_of_year (1-12) selects one calendar
+        month in every year."""
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("day >= ?")
+            params.append(datetime.date.fromisoformat(str(start)).toordinal() - EPOCH)
+        if end is not None:
+            clauses.append("day <= ?")
+            params.append(datetime.date.fromisoformat(str(end)).toordinal() - EPOCH)
+        if month_of_year is not None:
+            clauses.append("month % 12 = ?")
+            params.append(month_of_year - 1)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def sum_by(self, field, sign=None, **filters):
+        """{text: total} grouped by a text field, like TransactionColumns.sum_by."""
+        if field not in ("category", "description"):
+            raise ValueError(f"cannot group by {field!r}")
+        where, params = self._where(**filters)
+        if sign is not None:
+            where += (" AND " if where else " WHERE ") + ("cents > 0" if sign > 0 else "cents < 0")
+        rows = self.conn.execute(
+            f"SELECT {field}, SUM(cents) FROM transactions{where} GROUP BY {field} ORDER BY MIN(id)", params)
+        return {text: round(abs(cents) / 100 if sign else cents / 100, 2) for text, cents in rows}
+
+    def years(self):
+        rows = self.conn.execute("SELECT DISTINCT month / 12 FROM transactions WHERE month IS NOT NULL")
+        return {year for year, in rows}
+
+    def rollup_cells(self):
+        """Month x category totals in the format of RollupCube.cells."""
+        rows = self.conn.execute(
+            "SELECT month, category, TOTAL(CASE WHEN cents > 0 THEN cents END), "
+            "TOTAL(CASE WHEN cents < 0 THEN cents END) "
+            "FROM transactions WHERE month IS NOT NULL GROUP BY month, category")
+        return {(month, category): [int(inc), int(exp)] for month, category, inc, exp in rows}
+
+    def fingerprint_counts(self, field):
+        """(day, cents, text, count) per distinct row, the input of DuplicateIndex.replace."""
+        if field not in ("category", "description"):
+            raise ValueError(f"cannot fingerprint {field!r}")
+        return self.conn.execute(
+            f"SELECT day, cents, {field}, COUNT(*) FROM transactions WHERE day IS NOT NULL "
+            f"GROUP BY day, cents, {field}").fetchall()
@@ -0,0 +1,83 @@
+"""Background tasks for the finance apps.
+
+TaskPool runs file I/O on a thread pool and CPU-bound aggregation on a process
+pool (concurrent.futures). Results reach the UI thread through a dispatcher
+supplied by the app: TkDispatcher polls a queue with after(), QtDispatcher
+uses a queued signal. Both have expect() (called on submit, on the UI thread)
+and post(callback) (callable from any thread).
+
+A task submitted with a key supersedes the previous task with the same key,
+e.g. a filter replaced by a newer one: the old task is cancelled if it has not
+started yet and its result is dropped if it has.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+class TaskPool:
+
+    def __init__(self, dispatcher, io_workers=2, cpu_workers=None):
+        self.dispatcher = dispatcher
+        self.io = ThreadPoolExecutor(io_workers, thread_name_prefix="io")
+        self.cpu = None  # procespool, pas gestart bij de eerste cpu-taak
+        self.cpu_workers = cpu_workers
+        self.latest = {}  # sleutel -> future van de nieuwste taak
+
+    def submit(self, fn, *args, on_done=None, on_error=None, key=None, cpu=False):
+        """Runs fn(*args) in the background and calls on_done(result) or
+        on_error(exception) on the UI thread. With cpu=True fn and its arguments
+        must be picklable, because it runs in another process."""
+        if cpu and self.cpu is None:
+            self.cpu = self._process_pool()
+        if key is not None:
+            self.cancel(key)
+
+        if cpu:
+            try:
+                future = self.cpu.submit(fn, *args)
+            except BrokenProcessPool:
+                # Een worker-proces is gecrasht; met een nieuwe pool verder
+                self.cpu = self._process_pool()
+                future = self.cpu.submit(fn, *args)
+        else:
+            future = self.io.submit(fn, *args)
+        if key is not None:
+            self.latest[key] = future
+        self.dispatcher.expect()
+        future.add_done_callback(
+            lambda f: self.dispatcher.post(lambda: self._finish(f, key, on_done, on_error)))
+        return future
+
+    def _process_pool(self):
+        # spawn: een fork van een proces met GUI- en render-threads is niet veilig
+        return ProcessPoolExecutor(self.cpu_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def cancel(self, key):
+        """Cancels the task with this key, or drops its result if it is already running."""
+        future = self.latest.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def _finish(self, future, key, on_done, on_error):
+        if key is not None:
+            if self.latest.get(key) is not future:
+                return  # vervangen door een nieuwere taak
+            del self.latest[key]
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            if on_error is not None:
+                on_error(error)
+            else:
+                print("Fout in achtergrondtaak:", error)
+        elif on_done is not None:
+            on_done(future.result())
+
+    def shutdown(self, wait=True):
+        """Stops the pools; queued tasks are cancelled, running ones finish if wait."""
+        self.latest.clear()
+        self.io.shutdown(wait=wait, cancel_futures=True)
+        if self.cpu is not None:
+            self.cpu.shutdown(wait=wait, cancel_futures=True)
@@ -1,10 +1,37 @@
+import os
 import tkinter as tk
 
+from derived_stats import ABILITIES, SKILLS, character_graph, signed
+from library import CharacterLibrary
+from simulation import attack_chunk, combine, encounter_chunk, percentage_bars, process_pool, save_chunk, submit
+
+LIBRARY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "characters")
+
+# Velden uit character_data.json die ook invoer van de graaf zijn
+GRAPH_INPUTS = {"Klasse & Level": "Class & Level", **{ability: ability for ability in ABILITIES}}
+
 class CharacterSheetApp:
     def __init__(self, root):
         self.root = root
         self.root.title("D&D 5e Character Sheet")
 
+        # Afgeleide waarden (modifiers, saves, skills...) komen uit de graaf
+        self.stats = character_graph()
+        self.derived_labels = {}  # veldnaam -> Label dat de waarde toont
+        self.pending = {}         # invoer die sinds de laatste update is gewijzigd
+        self.update_job = None
+
+        # Personages in de bibliotheek; opslaan per gewijzigd veld
+        self.library = CharacterLibrary(LIBRARY_DIR)
+        self.character_id = None  # nog niet opgeslagen personage
+        self.record = dict.fromkeys(self.library.fields, "")  # velden zonder invoerveld blijven bewaard
+        self.field_vars = {}        # veld uit character_data.json -> StringVar
+        self.proficiency_vars = {}  # save of skill -> BooleanVar
+        self.changed_fields = set()
+        self.save_job = None
+        self.loading = False
+        self.pool = None  # processen voor de simulator, pas bij de eerste simulatie gestart
+
         # Kopbanner (bovenaan) inclusief 2x3 grid
         self.header_frame = tk.Frame(root, borderwidth=2, relief="ridge")
         self.header_frame.pack(fill="x", padx=5, pady=5)
@@ -13,6 +40,8 @@ class CharacterSheetApp:
         tk.Label(self.header_frame, text="Character Name", font=("Arial", 12, "bold")).grid(row=0, column=0, padx=10, sticky="w")
         self.character_name_entry = tk.Entry(self.header_frame, width=20)
         self.character_name_entry.grid(row=0, column=1, padx=10, pady=5, sticky="w")
+        tk.Button(self.header_frame, text="Characters...", command=self.open_picker).grid(row=0, column=5, padx=10, sticky="e")
+        tk.Button(self.header_frame, text="Simulate...", command=self.open_simulator).grid(row=0, column=6, padx=10, sticky="e")
 
         # 2x3 grid voor basisinformatie
         info_labels = ["Class & Level", "Background", "Player Name", "Race", "Alignment", "XP"]
@@ -29,11 +58,16 @@ class CharacterSheetApp:
         self.middle_top_frame = tk.Frame(root, borderwidth=2, relief="ridge")
         self.middle_top_frame.pack(fill="x", padx=5, pady=5)
         
-        stats = ["Armor Class", "Initiative", "Speed"]
+        stats = ["Armor Class", "Initiative", "Speed", "Proficiency Bonus"]
         self.stat_entries = {}
         
         for i, stat in enumerate(stats):
             tk.Label(self.middle_top_frame, text=stat).grid(row=0, column=i, padx=10, pady=5, sticky="w")
+            if stat in self.stats.formulas:
+                # Berekend, dus geen invoerveld
+                label = self.derived_label(self.middle_top_frame, stat)
+                label.grid(row=1, column=i, padx=10, pady=5)
+                continue
             entry = tk.Entry(self.middle_top_frame, width=10)
             entry.grid(row=1, column=i, padx=10, pady=5)  # Invoervelden direct onder labels
             self.stat_entries[stat] = entry
@@ -43,16 +77,25 @@ class CharacterSheetApp:
         self.left_frame.pack(side="left", fill="y", padx=5, pady=5)
         tk.Label(self.left_frame, text="Ability Scores", font=("Arial", 12, "bold")).pack()
         
-        abilities = ["Strength", "Dexterity", "Constitution", "Intelligence", "Wisdom", "Charisma"]
         self.ability_entries = {}
-        for ability in abilities:
+        for ability in ABILITIES:
             row = tk.Frame(self.left_frame)
             row.pack(fill="x")
             tk.Label(row, text=f"{ability}:", width=15, anchor="w").pack(side="left")
             entry = tk.Entry(row, width=10)
             entry.pack(side="left")
+            self.derived_label(row, f"{ability} Modifier").pack(side="left", padx=5)
             self.ability_entries[ability] = entry
 
+        # Saving Throws en Skills: vinkje = proficient
+        tk.Label(self.left_frame, text="Saving Throws", font=("Arial", 12, "bold")).pack(pady=(10, 0))
+        for ability in ABILITIES:
+            self.proficiency_row(self.left_frame, ability, f"{ability} Save", "Saving Throws")
+
+        tk.Label(self.left_frame, text="Skills", font=("Arial", 12, "bold")).pack(pady=(10, 0))
+        for skill, ability in SKILLS.items():
+            self.proficiency_row(self.left_frame, f"{skill} ({ability[:3]})", skill, "Skills")
+
         # Hit Points & Death Saves
         self.middle_frame = tk.Frame(root, borderwidth=2, relief="ridge")
         self.middle_frame.pack(fill="x", padx=5, pady=5)
@@ -88,7 +131,333 @@ class CharacterSheetApp:
         self.passive_frame = tk.Frame(root, borderwidth=2, relief="ridge")
         self.passive_frame.pack(fill="x", padx=5, pady=5)
         tk.Label(self.passive_frame, text="Passive Wisdom").pack()
+        self.derived_label(self.passive_frame, "Passive Wisdom", sign=False).pack()
+
+        # Velden van character_data.json -> invoerveld op het blad
+        field_entries = {
+            "Naam": self.character_name_entry,
+            "Klasse & Level": self.info_entries["Class & Level"],
+            "Achtergrond": self.info_entries["Background"],
+            "Spelernaam": self.info_entries["Player Name"],
+            "Ras": self.info_entries["Race"],
+            "Alignement": self.info_entries["Alignment"],
+            "Ervaring": self.info_entries["XP"],
+            "Armor Class": self.stat_entries["Armor Class"],
+            "Snelheid": self.stat_entries["Speed"],
+            **self.ability_entries,
+        }
+        for field, entry in field_entries.items():
+            self.bind_field(field, entry)
+
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def derived_label(self, parent, name, sign=True):
+        label = tk.Label(parent, width=4, anchor="e", relief="sunken")
+        label.sign = sign  # met + of - ervoor tonen
+        self.derived_labels[name] = label
+        self.show(name, self.stats[name])
+        return label
+
+    def proficiency_row(self, parent, text, name, field):
+        row = tk.Frame(parent)
+        row.pack(fill="x")
+        proficient = tk.BooleanVar(value=False)
+        tk.Checkbutton(row, variable=proficient).pack(side="left")
+        self.derived_label(row, name).pack(side="left")
+        tk.Label(row, text=text, anchor="w").pack(side="left", padx=5)
+        self.proficiency_vars[name] = proficient
+
+        def changed(*_):
+            self.input_changed(f"{name} Proficient", proficient.get())
+            self.field_changed(field)
+
+        proficient.trace_add("write", changed)
+
+    def bind_field(self, field, entry):
+        var = tk.StringVar()
+        entry.config(textvariable=var)
+        self.field_vars[field] = var
+
+        def changed(*_):
+            if field in GRAPH_INPUTS:
+                self.input_changed(GRAPH_INPUTS[field], var.get())
+            self.field_changed(field)
+
+        var.trace_add("write", changed)
+
+    def input_changed(self, name, value):
+        # Wijzigingen verzamelen; één herberekening en één update als Tk idle is
+        self.pending[name] = value
+        if self.update_job is None:
+            self.update_job = self.root.after_idle(self.update_derived)
+
+    def update_derived(self):
+        self.update_job = None
+        pending, self.pending = self.pending, {}
+        for name, value in self.stats.set_many(pending).items():
+            if name in self.derived_labels:
+                self.show(name, value)
+
+    def show(self, name, value):
+        label = self.derived_labels[name]
+        if label.sign:
+            label.config(text=signed(value))
+        else:
+            label.config(text="—" if value is None else str(value))
+
+    # --- Bibliotheek ---
+    def get_field(self, field):
+        if field == "Saving Throws":
+            return ", ".join(a for a in ABILITIES if self.proficiency_vars[f"{a} Save"].get())
+        if field == "Skills":
+            return ", ".join(s for s in SKILLS if self.proficiency_vars[s].get())
+        if field in self.field_vars:
+            return self.field_vars[field].get()
+        return self.record.get(field, "")
+
+    def set_field(self, field, value):
+        if field in ("Saving Throws", "Skills"):
+            chosen = {name.strip() for name in value.split(",")}
+            names = [f"{a} Save" for a in ABILITIES] if field == "Saving Throws" else list(SKILLS)
+            for name in names:
+                self.proficiency_vars[name].set(name.removesuffix(" Save") in chosen)
+        elif field in self.field_vars:
+            self.field_vars[field].set(value)
+
+    def field_changed(self, field):
+        # Niet opslaan wat er net uit de bibliotheek is geladen
+        if self.loading:
+            return
+        self.changed_fields.add(field)
+        if self.save_job is not None:
+            self.root.after_cancel(self.save_job)
+        self.save_job = self.root.after(500, self.save_changes)
+
+    def save_changes(self):
+        """Slaat alleen de velden op die sinds de vorige keer zijn gewijzigd."""
+        if self.save_job is not None:
+            self.root.after_cancel(self.save_job)
+            self.save_job = None
+        changes = {field: self.get_field(field) for field in self.changed_fields}
+        self.changed_fields = set()
+        if not changes:
+            return
+        self.record.update(changes)
+        if self.character_id is None:
+            self.character_id = self.library.create(self.record)
+        else:
+            self.library.update(self.character_id, changes)
+
+    def open_character(self, character_id):
+        self.save_changes()
+        record = self.library.load(character_id) if character_id else dict.fromkeys(self.library.fields, "")
+        self.character_id, self.record = character_id, record
+        self.loading = True
+        try:
+            for field in self.library.fields:
+                self.set_field(field, record.get(field, ""))
+        finally:
+            self.loading = False
+
+    def open_picker(self):
+        self.save_changes()  # de index toont dan ook de laatste naam
+        CharacterPicker(self.root, self.library, self.open_character)
+
+    # --- Simulator ---
+    def open_simulator(self):
+        if self.pool is None:
+            self.pool = process_pool()
+        saves = {ability: self.stats[f"{ability} Save"] or 0 for ability in ABILITIES}
+        SimulationWindow(self.root, self.pool, self.hero(), saves)
+
+    def hero(self):
+        """Het personage als strijder, met waarden van het blad waar die bekend zijn."""
+        mods = [self.stats[f"{a} Modifier"] for a in ("Strength", "Dexterity")]
+        mod = max((m for m in mods if m is not None), default=0)
+        ac = self.field_vars["Armor Class"].get().strip()
+        hp = str(self.record.get("Hit Point Maximum", "")).strip()
+        return {
+            "hp": int(hp) if hp.isdigit() else 10,
+            "ac": int(ac) if ac.isdigit() else 10 + mod,
+            "attack_bonus": mod + (self.stats["Proficiency Bonus"] or 2),
+            "damage": f"1d8{mod:+d}",
+            "attacks": 1,
+            "initiative": self.stats["Initiative"] or 0,
+        }
+
+    def on_close(self):
+        self.save_changes()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+
+class CharacterPicker(tk.Toplevel):
+    """Kiest een personage uit de index; het blad zelf wordt pas bij openen geladen."""
+
+    def __init__(self, master, library, on_open):
+        super().__init__(master)
+        self.title("Characters")
+        self.library = library
+        self.on_open = on_open
+        self.ids = []
+
+        self.search_var = tk.StringVar()
+        search = tk.Entry(self, textvariable=self.search_var, width=40)
+        search.pack(fill="x", padx=5, pady=5)
+        search.focus_set()
+        self.search_var.trace_add("write", lambda *_: self.refresh())
+
+        self.listbox = tk.Listbox(self, width=60, height=20)
+        self.listbox.pack(fill="both", expand=True, padx=5)
+        self.listbox.bind("<Double-Button-1>", lambda e: self.open_selected())
+
+        buttons = tk.Frame(self)
+        buttons.pack(fill="x", padx=5, pady=5)
+        tk.Button(buttons, text="Open", command=self.open_selected).pack(side="left")
+        tk.Button(buttons, text="New", command=self.new_character).pack(side="left", padx=5)
+        tk.Button(buttons, text="Delete", command=self.delete_selected).pack(side="right")
+        self.refresh()
+
+    def refresh(self):
+        results = self.library.search(self.search_var.get())
+        self.ids = [character_id for character_id, _ in results]
+        self.listbox.delete(0, tk.END)
+        rows = [f"{e['Naam'] or '(naamloos)'}  -  {e['Klasse & Level']}  -  {e['Ras']}" for _, e in results]
+        if rows:
+            self.listbox.insert(tk.END, *rows)
+
+    def selected(self):
+        selection = self.listbox.curselection()
+        return self.ids[selection[0]] if selection else None
+
+    def open_selected(self):
+        character_id = self.selected()
+        if character_id:
+            self.on_open(character_id)
+            self.destroy()
+
+    def new_character(self):
+        self.on_open(None)
+        self.destroy()
+
+    def delete_selected(self):
+        character_id = self.selected()
+        if character_id:
+            self.library.delete(character_id)
+            self.refresh()
+
+class SimulationWindow(tk.Toplevel):
+    """Monte-Carlo simulatie van het personage tegen een monster, plus één saving
+    throw tegen een DC. De blokken draaien in de procespool; het venster vraagt
+    de resultaten op met after()."""
+
+    FIELDS = ["hp", "ac", "attack_bonus", "damage", "attacks", "initiative"]
+    MONSTER = {"hp": 59, "ac": 13, "attack_bonus": 5, "damage": "2d8+3", "attacks": 1, "initiative": 1}
+
+    def __init__(self, master, pool, hero, saves):
+        super().__init__(master)
+        self.title("Combat Simulator")
+        self.pool = pool
+        self.saves = saves  # vaardigheid -> save-bonus van het blad
+        self.futures = []
+
+        form = tk.Frame(self)
+        form.pack(padx=5, pady=5)
+        tk.Label(form, text="Character", font=("Arial", 10, "bold")).grid(row=0, column=1)
+        tk.Label(form, text="Monster", font=("Arial", 10, "bold")).grid(row=0, column=2)
+        self.vars = {}
+        for row, field in enumerate(self.FIELDS, start=1):
+            tk.Label(form, text=field.replace("_", " ").title()).grid(row=row, column=0, sticky="w")
+            for column, (side, values) in enumerate((("hero", hero), ("monster", self.MONSTER)), start=1):
+                var = tk.StringVar(value=str(values[field]))
+                tk.Entry(form, textvariable=var, width=10).grid(row=row, column=column, padx=5, pady=2)
+                self.vars[(side, field)] = var
+
+        save = tk.Frame(self)
+        save.pack(padx=5, pady=5)
+        self.save_ability = tk.StringVar(value="Dexterity")
+        self.save_bonus = tk.StringVar(value=str(saves["Dexterity"]))
+        self.save_dc = tk.StringVar(value="15")
+        # Andere vaardigheid gekozen: de bonus van het blad invullen
+        self.save_ability.trace_add("write", lambda *_: self.save_bonus.set(str(self.saves[self.save_ability.get()])))
+        tk.Label(save, text="Save").pack(side="left")
+        tk.OptionMenu(save, self.save_ability, *ABILITIES).pack(side="left", padx=5)
+        tk.Label(save, text="Bonus").pack(side="left")
+        tk.Entry(save, textvariable=self.save_bonus, width=5).pack(side="left", padx=5)
+        tk.Label(save, text="DC").pack(side="left")
+        tk.Entry(save, textvariable=self.save_dc, width=5).pack(side="left", padx=5)
+
+        options = tk.Frame(self)
+        options.pack(padx=5, pady=5)
+        self.trials = tk.StringVar(value="1000000")
+        self.seed = tk.StringVar(value="")
+        tk.Label(options, text="Trials").pack(side="left")
+        tk.Entry(options, textvariable=self.trials, width=10).pack(side="left", padx=5)
+        tk.Label(options, text="Seed").pack(side="left")
+        tk.Entry(options, textvariable=self.seed, width=8).pack(side="left", padx=5)
+        self.run_button = tk.Button(options, text="Run", command=self.run)
+        self.run_button.pack(side="left", padx=5)
+
+        self.result = tk.Label(self, font=("Courier", 10), justify="left", anchor="w")
+        self.result.pack(fill="both", padx=5, pady=5)
+
+    def combatant(self, side):
+        values = {field: self.vars[(side, field)].get().strip() for field in self.FIELDS}
+        return {field: value if field == "damage" else int(value) for field, value in values.items()}
+
+    def run(self):
+        try:
+            hero, monster = self.combatant("hero"), self.combatant("monster")
+            trials = int(self.trials.get())
+            seed = int(self.seed.get()) if self.seed.get().strip() else None
+            save_bonus, dc = int(self.save_bonus.get()), int(self.save_dc.get())
+        except ValueError:
+            self.result.config(text="Invalid number in the form.")
+            return
+        self.run_button.config(state="disabled")
+        self.result.config(text=f"Simulating {trials:,} trials...")
+        # Zelfde seed = zelfde uitkomst, hoeveel processen er ook zijn
+        attacks = submit(self.pool, attack_chunk, trials, seed, attacker=hero, target_ac=monster["ac"])
+        fights = submit(self.pool, encounter_chunk, trials, seed, hero=hero, monster=monster)
+        saves = submit(self.pool, save_chunk, trials, seed, save_bonus=save_bonus, dc=dc)
+        self.futures = attacks + fights + saves
+        self.save_label = f"{self.save_ability.get()[:3]} save DC {dc}"
+        self.after(50, self.poll, attacks, fights, saves)
+
+    def poll(self, attacks, fights, saves):
+        if not all(future.done() for future in self.futures):
+            self.after(50, self.poll, attacks, fights, saves)
+            return
+        self.run_button.config(state="normal")
+        try:
+            attack = combine(future.result() for future in attacks)
+            fight = combine(future.result() for future in fights)
+            save = combine(future.result() for future in saves)
+        except Exception as e:  # ongeldige dobbelstenen of een afgebroken proces
+            self.result.config(text=f"Simulation failed: {e}")
+            return
+        self.show(attack, fight, save)
+
+    def show(self, attack, fight, save):
+        trials = attack["trials"]
+        damage = attack["damage"]
+        average = (damage * range(len(damage))).sum() / trials
+        lines = [
+            f"Hit chance   {attack['hits'] / trials:7.2%}   crit {attack['crits'] / trials:.2%}",
+            f"Avg damage   {average:7.2f} per attack",
+            f"Win chance   {fight['wins'] / trials:7.2%}   loss {fight['losses'] / trials:.2%}",
+            f"Save chance  {save['successes'] / trials:7.2%}   {self.save_label}",
+            "",
+            "Monster defeated in round:",
+        ]
+        rounds = len(fight["kill_round"])
+        lines += percentage_bars(fight["kill_round"], trials, [f"{r + 1}" for r in range(rounds)])
+        lines += ["", "Character down in round:"]
+        lines += percentage_bars(fight["death_round"], trials, [f"{r + 1}" for r in range(rounds)])
+        self.result.config(text="\n".join(lines))
 
-root = tk.Tk()
-app = CharacterSheetApp(root)
-root.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    # De guard is nodig: de simulatorprocessen importeren dit bestand opnieuw
+    root = tk.Tk()
+    app = CharacterSheetApp(root)
+    root.mainloop()
\ No newline at end of file
@@ -0,0 +1,155 @@
+import heapq
+import re
+
+ABILITIES = ["Strength", "Dexterity", "Constitution", "Intelligence", "Wisdom", "Charisma"]
+
+SKILLS = {
+    "Acrobatics": "Dexterity", "Animal Handling": "Wisdom", "Arcana": "Intelligence",
+    "Athletics": "Strength", "Deception": "Charisma", "History": "Intelligence",
+    "Insight": "Wisdom", "Intimidation": "Charisma", "Investigation": "Intelligence",
+    "Medicine": "Wisdom", "Nature": "Intelligence", "Perception": "Wisdom",
+    "Performance": "Charisma", "Persuasion": "Charisma", "Religion": "Intelligence",
+    "Sleight of Hand": "Dexterity", "Stealth": "Dexterity", "Survival": "Wisdom",
+}
+
+
+class StatGraph:
+    """Afhankelijkheidsgraaf voor afgeleide waarden op het karakterblad.
+
+    Invoer zet je met set() of set_many(); een afgeleid veld declareert met
+    derive() van welke velden het afhangt. Een wijziging herberekent alleen de
+    velden die er (via via) van afhangen, in topologische volgorde, en stopt
+    bij een veld waarvan de waarde gelijk blijft (memoisatie). Omdat een veld
+    alleen van eerder gedeclareerde velden kan afhangen, is de
+    declaratievolgorde meteen een topologische volgorde en zijn cycli
+    onmogelijk.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.formulas = {}    # naam -> (functie, invoervelden)
+        self.dependents = {}  # naam -> afgeleide velden die ervan afhangen
+        self.order = {}       # naam -> plaats in de topologische volgorde
+
+    def input(self, name, value=None):
+        self._declare(name)
+        self.values[name] = value
+
+    def derive(self, name, inputs, fn):
+        for source in inputs:
+            if source not in self.order:
+                raise KeyError(f"{name} hangt af van onbekend veld {source!r}")
+        self._declare(name)
+        self.formulas[name] = (fn, tuple(inputs))
+        for source in inputs:
+            self.dependents[source].append(name)
+        self.values[name] = fn(*(self.values[source] for source in inputs))
+
+    def _declare(self, name):
+        if name in self.order:
+            raise KeyError(f"veld {name!r} bestaat al")
+        self.order[name] = len(self.order)
+        self.dependents[name] = []
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+    def set(self, name, value):
+        return self.set_many({name: value})
+
+    def set_many(self, updates):
+        """Zet invoervelden en herberekent wat ervan afhangt, elk veld hooguit
+        één keer. Geeft {veld: nieuwe waarde} terug van alles wat veranderde."""
+        changed = {}
+        queue = []
+        queued = set()
+
+        def schedule(name):
+            for dependent in self.dependents[name]:
+                if dependent not in queued:
+                    queued.add(dependent)
+                    heapq.heappush(queue, (self.order[dependent], dependent))
+
+        for name, value in updates.items():
+            if name in self.formulas:
+                raise KeyError(f"{name} is een afgeleid veld")
+            if self.values[name] != value:
+                self.values[name] = changed[name] = value
+                schedule(name)
+
+        while queue:
+            _, name = heapq.heappop(queue)
+            fn, inputs = self.formulas[name]
+            value = fn(*(self.values[source] for source in inputs))
+            if value != self.values[name]:
+                self.values[name] = changed[name] = value
+                schedule(name)
+        return changed
+
+
+def optional(fn):
+    """Geeft None zolang een van de invoerwaarden nog ontbreekt."""
+    def wrapper(*args):
+        return None if any(arg is None for arg in args) else fn(*args)
+    return wrapper
+
+
+def parse_int(text):
+    try:
+        return int(str(text).strip())
+    except ValueError:
+        return None
+
+
+def parse_level(text):
+    """Het level uit "Klasse & Level", bijvoorbeeld "Fighter 5" -> 5."""
+    numbers = re.findall(r"\d+", str(text))
+    return int(numbers[-1]) if numbers else None
+
+
+@optional
+def modifier(score):
+    return (score - 10) // 2
+
+
+@optional
+def proficiency_bonus(level):
+    return 2 + (max(level, 1) - 1) // 4
+
+
+def proficient_bonus(mod, bonus, proficient):
+    if mod is None:
+        return None
+    return mod + ((bonus or 0) if proficient else 0)
+
+
+def character_graph():
+    """De graaf met de 5e-regels: modifiers, proficiency bonus, saving throws,
+    skills, initiative en passive Wisdom."""
+    graph = StatGraph()
+    graph.input("Class & Level", "")
+    graph.derive("Level", ["Class & Level"], parse_level)
+    graph.derive("Proficiency Bonus", ["Level"], proficiency_bonus)
+
+    for ability in ABILITIES:
+        graph.input(ability, "")
+        graph.derive(f"{ability} Score", [ability], parse_int)
+        graph.derive(f"{ability} Modifier", [f"{ability} Score"], modifier)
+        graph.input(f"{ability} Save Proficient", False)
+        graph.derive(f"{ability} Save",
+                     [f"{ability} Modifier", "Proficiency Bonus", f"{ability} Save Proficient"], proficient_bonus)
+
+    for skill, ability in SKILLS.items():
+        graph.input(f"{skill} Proficient", False)
+        graph.derive(skill, [f"{ability} Modifier", "Proficiency Bonus", f"{skill} Proficient"], proficient_bonus)
+
+    graph.derive("Initiative", ["Dexterity Modifier"], lambda mod: mod)
+    graph.derive("Passive Wisdom", ["Perception"], optional(lambda perception: 10 + perception))
+    return graph
+
+
+def signed(value):
+    """+3 / -1 voor weergave; een streepje zolang de waarde onbekend is."""
+    if value is None:
+        return "—"
+    return f"{value:+d}"
@@ -0,0 +1,154 @@
+import json
+import os
+import re
+import uuid
+
+from derived_stats import parse_level
+
+TEMPLATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "character_data.json")
+
+
+def read_json(filename, default):
+    try:
+        with open(filename, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+def write_json(filename, data):
+    """Schrijft atomisch: eerst naar een tijdelijk bestand, dan os.replace."""
+    tmp_file = filename + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, filename)
+
+
+class CharacterLibrary:
+    """Map met één record per personage plus een kleine index.
+
+    <id>.json is een volledig karakterblad (de velden van character_data.json);
+    wijzigingen komen als regels {veld: waarde} in <id>.jsonl, zodat opslaan
+    alleen de gewijzigde velden kost. Bij het laden wordt de log over het blad
+    gelegd en, als hij lang is, ermee samengevoegd.
+
+    index.json bevat per personage alleen naam, klasse, level en ras. De
+    kiezer leest alleen de index; een blad wordt pas geladen als het gekozen
+    wordt. De index wordt alleen herschreven als een van die velden verandert.
+    """
+
+    INDEX_FIELDS = ("Naam", "Klasse & Level", "Ras")
+
+    def __init__(self, directory="characters", compact_every=50):
+        self.directory = directory
+        self.compact_every = compact_every
+        self.fields = list(read_json(TEMPLATE_FILE, {}))
+        os.makedirs(directory, exist_ok=True)
+        self.index_file = os.path.join(directory, "index.json")
+        self.index = read_json(self.index_file, None)
+        if self.index is None:
+            self.rebuild_index()
+
+    def _path(self, character_id, suffix=".json"):
+        return os.path.join(self.directory, character_id + suffix)
+
+    # --- Index ---
+    def summary(self, record):
+        """Indexregel: de geïndexeerde velden plus klasse en level apart."""
+        entry = {field: record.get(field, "") for field in self.INDEX_FIELDS}
+        entry["Klasse"] = re.sub(r"\d+", "", entry["Klasse & Level"]).strip()
+        entry["Level"] = parse_level(entry["Klasse & Level"])
+        return entry
+
+    def rebuild_index(self):
+        """Bouwt de index opnieuw op uit alle bladen (alleen als index.json ontbreekt)."""
+        self.index = {}
+        for filename in os.listdir(self.directory):
+            character_id, ext = os.path.splitext(filename)
+            if ext == ".json" and filename != "index.json":
+                self.index[character_id] = self.summary(self.load(character_id))
+        write_json(self.index_file, self.index)
+
+    def search(self, text="", klasse=None, ras=None, level=None):
+        """(id, samenvatting) uit de index, gesorteerd op naam. text zoekt in
+        naam, klasse & level en ras."""
+        text = text.lower()
+        result = []
+        for character_id, entry in self.index.items():
+            if text and not any(text in entry[field].lower() for field in self.INDEX_FIELDS):
+                continue
+            if klasse is not None and entry["Klasse"] != klasse:
+                continue
+            if ras is not None and entry["Ras"] != ras:
+                continue
+            if level is not None and entry["Level"] != level:
+                continue
+            result.append((character_id, entry))
+        result.sort(key=lambda item: item[1]["Naam"].lower())
+        return result
+
+    # --- Bladen ---
+    def create(self, record=None):
+        character_id = uuid.uuid4().hex[:12]
+        record = dict(dict.fromkeys(self.fields, ""), **(record or {}))
+        write_json(self._path(character_id), record)
+        self.index[character_id] = self.summary(record)
+        write_json(self.index_file, self.index)
+        return character_id
+
+    def load(self, character_id):
+        record = dict.fromkeys(self.fields, "")
+        record.update(read_json(self._path(character_id), {}))
+        log_file = self._path(character_id, ".jsonl")
+        changes = good_offset = 0
+        try:
+            with open(log_file, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        record.update(json.loads(line))
+                    except json.JSONDecodeError:
+                        break
+                    good_offset += len(line)
+                    changes += 1
+        except FileNotFoundError:
+            pass
+        else:
+            # Half geschreven laatste regel (crash): wegknippen, anders komt de
+            # volgende wijziging erachter en gaat die bij het laden verloren
+            if good_offset != os.path.getsize(log_file):
+                with open(log_file, "r+b") as f:
+                    f.truncate(good_offset)
+        if changes >= self.compact_every:
+            self._compact(character_id, record)
+        return record
+
+    def update(self, character_id, changes):
+        """Slaat alleen de gewijzigde velden op (één regel in de log)."""
+        if not changes or character_id not in self.index:
+            return  # niets gewijzigd, of het personage is intussen verwijderd
+        with open(self._path(character_id, ".jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(changes, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if any(field in changes for field in self.INDEX_FIELDS):
+            record = dict(self.index[character_id])
+            record.update(changes)
+            self.index[character_id] = self.summary(record)
+            write_json(self.index_file, self.index)
+
+    def _compact(self, character_id, record):
+        write_json(self._path(character_id), record)
+        open(self._path(character_id, ".jsonl"), "w").close()
+
+    def delete(self, character_id):
+        for suffix in (".json", ".jsonl"):
+            try:
+                os.remove(self._path(character_id, suffix))
+            except FileNotFoundError:
+                pass
+        self.index.pop(character_id, None)
+        write_json(self.index_file, self.index)
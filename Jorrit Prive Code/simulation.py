@@ -0,0 +1,140 @@
+"""Monte-Carlo simulatie van aanvallen, saving throws en gevechten.
+
+Alle worpen van een blok proeven zijn één NumPy-array (proeven x rondes x
+aanvallen), dus een miljoen proeven kost een paar array-bewerkingen in plaats
+van een miljoen keer random. De proeven worden in blokken verdeeld; elk blok
+krijgt een eigen kind van np.random.SeedSequence(seed), zodat dezelfde seed
+altijd dezelfde uitkomst geeft, ook als de blokken over meerdere processen
+verdeeld worden.
+
+Een strijder is een dict met "hp", "ac", "attack_bonus", "damage" (zoals
+"1d8+3"), "attacks" (per ronde) en "initiative".
+"""
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+CHUNK_SIZE = 200_000
+
+
+def parse_dice(text):
+    """"2d6+3" -> (2, 6, 3); een los getal is vaste schade."""
+    text = str(text).replace(" ", "")
+    if re.fullmatch(r"[+-]?\d+", text):
+        return 0, 0, int(text)
+    match = re.fullmatch(r"(\d*)d(\d+)([+-]\d+)?", text)
+    if not match:
+        raise ValueError(f"ongeldige dobbelstenen: {text!r}")
+    return int(match.group(1) or 1), int(match.group(2)), int(match.group(3) or 0)
+
+
+def d20(rng, shape, advantage=0):
+    """advantage 1 = voordeel, -1 = nadeel."""
+    if not advantage:
+        return rng.integers(1, 21, size=shape, dtype=np.int16)
+    rolls = rng.integers(1, 21, size=(2,) + shape, dtype=np.int16)
+    return rolls.max(0) if advantage > 0 else rolls.min(0)
+
+
+def attack_rolls(rng, shape, attacker, target_ac, advantage=0):
+    """Schade per aanval (0 bij een misser) en de maskers voor raak en kritiek."""
+    count, sides, bonus = parse_dice(attacker["damage"])
+    roll = d20(rng, shape, advantage)
+    crit = roll == 20
+    hit = crit | ((roll != 1) & (roll + attacker["attack_bonus"] >= target_ac))
+    damage = np.full(shape, bonus, dtype=np.int32)
+    if count:
+        damage += rng.integers(1, sides + 1, size=(count,) + shape, dtype=np.int16).sum(0, dtype=np.int32)
+        # Bij een kritieke treffer tellen de dobbelstenen dubbel; alleen die extra worpen trekken
+        extra = rng.integers(1, sides + 1, size=(count, int(crit.sum())), dtype=np.int16)
+        damage[crit] += extra.sum(0, dtype=np.int32)
+    return np.where(hit, np.maximum(damage, 0), 0), hit, crit
+
+
+# --- Blokken (draaien ook in een ander proces) ---
+def attack_chunk(seed, trials, attacker, target_ac, advantage=0):
+    rng = np.random.default_rng(seed)
+    damage, hit, crit = attack_rolls(rng, (trials,), attacker, target_ac, advantage)
+    return {"trials": trials, "hits": int(hit.sum()), "crits": int(crit.sum()),
+            "damage": np.bincount(damage)}
+
+
+def save_chunk(seed, trials, save_bonus, dc, advantage=0):
+    rng = np.random.default_rng(seed)
+    success = d20(rng, (trials,), advantage) + save_bonus >= dc
+    return {"trials": trials, "successes": int(success.sum())}
+
+
+def _kill_round(rng, trials, rounds, attacker, defender):
+    """Ronde (0-based) waarin attacker defender neerslaat, of rounds als dat niet lukt."""
+    damage, _, _ = attack_rolls(rng, (trials, rounds, attacker.get("attacks", 1)), attacker, defender["ac"])
+    dead = damage.sum(2).cumsum(1) >= defender["hp"]
+    return np.where(dead.any(1), dead.argmax(1), rounds)
+
+
+def encounter_chunk(seed, trials, hero, monster, rounds=20):
+    """Gevecht van hero tegen monster, tot één van beiden valt of rounds voorbij is.
+    Wie in dezelfde ronde als eerste aan de beurt is (initiatief), wint."""
+    rng = np.random.default_rng(seed)
+    hero_kills = _kill_round(rng, trials, rounds, hero, monster)
+    monster_kills = _kill_round(rng, trials, rounds, monster, hero)
+    hero_first = (d20(rng, (trials,)) + hero.get("initiative", 0)
+                  >= d20(rng, (trials,)) + monster.get("initiative", 0))
+    wins = (hero_kills < monster_kills) | ((hero_kills == monster_kills) & (hero_kills < rounds) & hero_first)
+    losses = (monster_kills < rounds) & ~wins
+    return {"trials": trials, "wins": int(wins.sum()), "losses": int(losses.sum()),
+            "kill_round": np.bincount(hero_kills[wins], minlength=rounds),
+            "death_round": np.bincount(monster_kills[losses], minlength=rounds)}
+
+
+# --- Aansturing ---
+def chunk_seeds(trials, seed, chunk_size=CHUNK_SIZE):
+    """(seed, aantal proeven) per blok; hangt alleen af van trials, seed en chunk_size."""
+    sizes = [min(chunk_size, trials - start) for start in range(0, trials, chunk_size)]
+    return list(zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes))
+
+
+def combine(results):
+    """Telt de uitkomsten van de blokken op; histogrammen worden even lang gemaakt."""
+    total = {}
+    for result in results:
+        for key, value in result.items():
+            if key not in total:
+                total[key] = value
+            elif isinstance(value, np.ndarray):
+                size = max(len(total[key]), len(value))
+                total[key] = np.pad(total[key], (0, size - len(total[key]))) + np.pad(value, (0, size - len(value)))
+            else:
+                total[key] += value
+    return total
+
+
+def simulate(chunk_fn, trials, seed=None, executor=None, chunk_size=CHUNK_SIZE, **params):
+    """Draait chunk_fn over alle blokken, in dit proces of via executor."""
+    blocks = chunk_seeds(trials, seed, chunk_size)
+    if executor is None:
+        return combine(chunk_fn(block_seed, size, **params) for block_seed, size in blocks)
+    futures = submit(executor, chunk_fn, trials, seed, chunk_size, **params)
+    return combine(future.result() for future in futures)
+
+
+def submit(executor, chunk_fn, trials, seed=None, chunk_size=CHUNK_SIZE, **params):
+    """Zet alle blokken op de executor; geeft de futures terug (volgorde = blokvolgorde)."""
+    return [executor.submit(chunk_fn, block_seed, size, **params)
+            for block_seed, size in chunk_seeds(trials, seed, chunk_size)]
+
+
+def process_pool(workers=None):
+    # spawn: een fork van een proces met een Tk-hoofdlus is niet veilig
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def percentage_bars(counts, total, labels, width=30):
+    """Tekstregels met een balk per waarde, voor weergave in de app."""
+    lines = []
+    for label, count in zip(labels, counts):
+        share = count / total if total else 0
+        lines.append(f"{label:>10} {share:7.2%} {'█' * round(share * width)}")
+    return lines
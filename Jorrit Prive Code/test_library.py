@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+
+from library import CharacterLibrary
+
+
+class CharacterLibraryTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+
+    def test_update_with_compaction(self):
+        library = CharacterLibrary(self.directory, compact_every=2)
+        character_id = library.create({"Naam": "Aragorn"})
+        for level in range(1, 6):
+            library.load(character_id)
+            library.update(character_id, {"Level": level})
+        record = CharacterLibrary(self.directory).load(character_id)
+        self.assertEqual((record["Naam"], record["Level"]), ("Aragorn", 5))
+
+    def test_update_after_half_written_line(self):
+        library = CharacterLibrary(self.directory)
+        character_id = library.create({"Naam": "Aragorn"})
+        library.update(character_id, {"Ras": "Mens"})
+        with open(library._path(character_id, ".jsonl"), "a", encoding="utf-8") as f:
+            f.write('{"Level": "3')  # crash tijdens het schrijven
+        library = CharacterLibrary(self.directory)
+        self.assertEqual(library.load(character_id)["Ras"], "Mens")
+        library.update(character_id, {"Level": 4})
+        record = CharacterLibrary(self.directory).load(character_id)
+        self.assertEqual((record["Ras"], record["Level"]), ("Mens", 4))
+
+
+if __name__ == "__main__":
+    unittest.main()